@@ -52,70 +52,13 @@ class RoomieSplitApp:
         Initialize database and load sample data including:
         - Roommates table with sample roommates
         - Expenses table with dataset
-        - Random assignment of payers and participants to expenses
+        - Random assignment of payers and participants to expenses (once per database)
+
+        See utils.startup.initialize_app_data(); the time taken is printed.
         """
         try:
-            from models.database.db_connection import initialize_database
-            from models.database.roomate_db import get_all_roommates, add_roommate, assign_random_payer, assign_random_participants
-            from models.database.expense_db import get_all_expenses
-            
-            # Initialize database tables
-            initialize_database()
-            
-            # Check if we need to add sample roommates
-            roommates = get_all_roommates()
-            if not roommates:
-                # Add sample roommates with full information
-                sample_roommates = [
-                    ("Alice Johnson", "alice@example.com", "2023-09-01"),
-                    ("Bob Smith", "bob@example.com", "2023-09-15"), 
-                    ("Charlie Brown", "charlie@example.com", "2023-10-01"),
-                    ("David Wilson", "david@example.com", "2023-10-15")
-                ]
-                for name, email, join_date in sample_roommates:
-                    add_roommate(name, email, join_date)
-                print(f"Added {len(sample_roommates)} sample roommates")
-            else:
-                print(f"Database already has {len(roommates)} roommates")
-            
-            # Load expenses dataset if not already loaded
-            expenses = get_all_expenses()
-            if not expenses:  # Only load if no expenses exist
-                try:
-                    from utils.load_dataset import load_dataset
-                    load_dataset("assets/data/dataset.csv")
-                    print("Expense dataset loaded successfully")
-                    
-                    # Verify expenses were loaded
-                    expenses = get_all_expenses()
-                    
-                except FileNotFoundError:
-                    print("Warning: Expense dataset file not found")
-                except Exception as e:
-                    print(f"Warning: Could not load expense dataset: {e}")
-            else:
-                print(f"Database already has {len(expenses)} expenses")
-            
-            # Process expenses: assign random payers and participants
-            expenses = get_all_expenses()
-            if expenses:
-                # Assign random payers to expenses without payers
-                expenses_without_payers = [e for e in expenses if e[6] is None]  # payer_id at index 6
-                if expenses_without_payers:
-                    expense_ids = [e[0] for e in expenses_without_payers]
-                    assign_random_payer(expense_ids)
-                    print(f"Assigned random payers to {len(expense_ids)} expenses")
-                else:
-                    print("All expenses already have payers assigned")
-                
-                # Assign random participants to all expenses
-                all_expense_ids = [e[0] for e in expenses]
-                assign_random_participants(all_expense_ids)
-                print(f"Assigned random participants to {len(all_expense_ids)} expenses")
-                    
-            else:
-                print("No expenses to assign roommates to")
-                
+            from utils.startup import initialize_app_data
+            initialize_app_data()
         except Exception as e:
             print("Error during initialization:", str(e))
 
@@ -214,7 +157,13 @@ class RoomieSplitApp:
         self.show_frame("Report")
 
 if __name__ == "__main__":
+    from models.database.db_connection import close_connections
+
     # Create and run the application
     root = tk.Tk()
     app = RoomieSplitApp(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        # Release the long-lived database connections on exit
+        close_connections()
@@ -1,74 +1,384 @@
 # models/calculator.py
+import heapq
+import time
 
-def calculate_settlements(expenses: list[tuple], roommates: list[tuple]) -> list[dict]:
+from models.money import to_cents, from_cents, split_cents, allocate_cents
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; compute_balance_vectors falls back to pure Python
+    np = None
+
+# Settlement strategies accepted by settle_balances() / calculate_settlements()
+SETTLEMENT_MODES = ("greedy", "optimal")
+
+# Wall-clock budget of the optimiser before it falls back to the greedy matcher
+DEFAULT_OPTIMIZER_BUDGET_MS = 200.0
+
+# Largest number of non-zero balances searched exhaustively (2^n subsets)
+OPTIMIZER_EXACT_LIMIT = 14
+
+
+def _scan_expenses(expenses: list[tuple], index: dict) -> dict:
+    """
+    Reads every expense row once and collects all that the aggregations need.
+
+    Participants are flattened into a sparse (COO) layout: expenses whose
+    rows carry participant IDs (index 8, as returned by get_expense_history())
+    use them, with the split weights at index 10 (1 each if absent); all
+    other expenses are shared equally by every roommate and are summed
+    separately instead of being expanded. The same pass sums the total, the
+    per-category totals and each payer's per-category spending.
+
+    Args:
+        expenses (list[tuple]): Expense tuples or history rows
+        index (dict): Mapping of roommate ID to column position
+
+    Returns:
+        dict: amounts, offsets and payer_positions (one entry per expense,
+              -1 for an unknown payer); rows/cols/ranks/weights (one entry per
+              participation: expense position, roommate position, position by
+              roommate ID within the expense, split weight); counts (the
+              participant count per expense, 0 = shared by all);
+              shared_by_all (positions of expenses split among all roommates);
+              total, categories {category: cents} and budgets
+              {payer_id: {category: cents}}, all in cents
+    """
+    amounts = []
+    offsets = []
+    payer_positions = []
+    rows = []
+    cols = []
+    ranks = []
+    weights = []
+    counts = [0] * len(expenses)
+    shared_by_all = []
+    categories = {}
+    budgets = {}
+
+    for row, exp in enumerate(expenses):
+        cents = to_cents(exp[4])
+        category = exp[3]
+        amounts.append(cents)
+        offsets.append(exp[0] or 0)
+        # Expenses paid by an unknown roommate (or nobody) add to no one's paid total
+        payer_positions.append(index.get(exp[6], -1))
+        categories[category] = categories.get(category, 0) + cents
+        budget = budgets.setdefault(exp[6], {})
+        budget[category] = budget.get(category, 0) + cents
+
+        participant_ids = exp[8] if len(exp) > 8 else None
+        if not participant_ids:
+            shared_by_all.append(row)
+            continue
+        participant_weights = exp[10] if len(exp) > 10 and exp[10] else [1] * len(participant_ids)
+        weight_of = {}
+        for p, weight in zip(participant_ids, participant_weights):
+            weight_of.setdefault(p, weight)
+        members = [p for p in sorted(weight_of) if p in index]
+        if not members:
+            shared_by_all.append(row)
+            continue
+        rows.extend([row] * len(members))
+        cols.extend(index[p] for p in members)
+        ranks.extend(range(len(members)))
+        weights.extend(weight_of[p] for p in members)
+        counts[row] = len(members)
+
+    return {
+        "amounts": amounts, "offsets": offsets, "payer_positions": payer_positions,
+        "rows": rows, "cols": cols, "ranks": ranks, "weights": weights, "counts": counts,
+        "shared_by_all": shared_by_all, "total": sum(amounts),
+        "categories": categories, "budgets": budgets,
+    }
+
+
+def allocate_shares(amounts: list, offsets: list, rows: list, ranks: list,
+                    weights: list, counts: list) -> list:
+    """
+    Splits every expense among its participants in one batched pass.
+
+    The batched form of models.money.allocate_cents(): each participation
+    row gets floor(amount * weight / total weight) and the leftover cents of
+    an expense go to its rows with the largest remainders, ties broken by
+    rank rotated by the expense's offset. Equal, percent, share-count and
+    exact splits are all just weights, so mixed split types need no
+    per-expense branching; with NumPy every step is one array operation
+    over all rows. Matches the expense_shares view in the database.
+
+    Args:
+        amounts (list): Amount of each expense, in cents
+        offsets (list): Rotation offset of each expense (its ID)
+        rows (list): Expense position of each participation row, grouped
+                     by expense in increasing order (see _participant_index)
+        ranks (list): Position of the row within its expense
+        weights (list): Positive integer weight of each row
+        counts (list): Number of participation rows per expense
+
+    Returns:
+        list: The share in cents of each participation row (an int64 array
+              with NumPy), in the order of rows
+    """
+    if np is None:
+        shares = []
+        start = 0
+        while start < len(rows):
+            row = rows[start]
+            n = counts[row]
+            shares.extend(allocate_cents(amounts[row], weights[start:start + n], offsets[row]))
+            start += n
+        return shares
+
+    cents = np.asarray(amounts, dtype=np.int64)
+    rows_arr = np.asarray(rows, dtype=np.int64)
+    weights_arr = np.asarray(weights, dtype=np.int64)
+    counts_arr = np.asarray(counts, dtype=np.int64)
+
+    total_weight = np.zeros(len(cents), dtype=np.int64)
+    np.add.at(total_weight, rows_arr, weights_arr)
+    base, remainder = np.divmod(np.abs(cents)[rows_arr] * weights_arr, total_weight[rows_arr])
+    leftover = np.abs(cents)
+    np.subtract.at(leftover, rows_arr, base)
+
+    # Order the rows by expense, then largest remainder, then rotated rank,
+    # and hand one leftover cent to each of the first `leftover` rows
+    n = counts_arr[rows_arr]
+    turn = (np.asarray(ranks, dtype=np.int64) - np.asarray(offsets, dtype=np.int64)[rows_arr]) % n
+    order = np.lexsort((turn, -remainder, rows_arr))
+    first_row = np.cumsum(counts_arr) - counts_arr
+    position = np.empty_like(order)
+    position[order] = np.arange(len(order)) - first_row[rows_arr[order]]
+    return np.sign(cents)[rows_arr] * (base + (position < leftover[rows_arr]))
+
+
+def compute_balance_vectors(expenses: list[tuple], roommates: list[tuple]) -> tuple:
+    """
+    Computes how much each roommate paid and owes, in integer cents.
+
+    The participation of roommates in expenses is treated as a sparse
+    expense x roommate matrix built from the real participant rows. Every
+    expense with participants is split by their weights in one batched
+    allocate_shares() call; with equal weights the leftover cents go to
+    consecutive participants (ordered by roommate ID) starting at expense
+    ID % participants, the same rule as the expense_shares view in the
+    database. Expenses without participants are split equally among all
+    roommates. With NumPy available the shares and sums are computed on int64
+    arrays; without it the same sums are done in plain Python. Either way
+    every expense's shares add up to its amount.
+
+    Args:
+        expenses (list[tuple]): Expense tuples (id, date, account, category,
+                                amount, note, payer_id), optionally with
+                                participant IDs at index 8 and their split
+                                weights at index 10
+        roommates (list[tuple]): List of roommate tuples (id, name, ...)
+
+    Returns:
+        tuple: (roommate_ids, paid, owed) where paid[i] and owed[i] are the
+               cents paid and owed by roommate_ids[i]. Net balance = paid - owed.
+    """
+    roommate_ids = [rm[0] for rm in roommates]
+    scan = _scan_expenses(expenses, {rm_id: i for i, rm_id in enumerate(roommate_ids)})
+    paid, owed = _balance_vectors(scan, roommate_ids)
+    return roommate_ids, paid, owed
+
+
+def _balance_vectors(scan: dict, roommate_ids: list) -> tuple:
+    """
+    Sums the paid and owed cents of every roommate from a _scan_expenses() result.
+
+    Args:
+        scan (dict): Result of _scan_expenses()
+        roommate_ids (list): Roommate IDs in column order
+
+    Returns:
+        tuple: (paid, owed) vectors aligned with roommate_ids (int64 arrays
+               with NumPy, lists otherwise)
+    """
+    amounts, offsets, payer_positions = scan["amounts"], scan["offsets"], scan["payer_positions"]
+    rows, cols, shared_by_all = scan["rows"], scan["cols"], scan["shared_by_all"]
+    n_roommates = len(roommate_ids)
+    # Roommate positions in roommate ID order, for expenses shared by all
+    by_id = sorted(range(n_roommates), key=lambda i: roommate_ids[i])
+    shares = allocate_shares(amounts, offsets, rows, scan["ranks"], scan["weights"], scan["counts"]) if rows else []
+
+    if np is not None:
+        cents = np.asarray(amounts, dtype=np.int64)
+        expense_ids = np.asarray(offsets, dtype=np.int64)
+        payers = np.asarray(payer_positions, dtype=np.int64)
+        known = payers >= 0
+        paid = np.zeros(n_roommates, dtype=np.int64)
+        np.add.at(paid, payers[known], cents[known])
+
+        owed = np.zeros(n_roommates, dtype=np.int64)
+        if rows:
+            np.add.at(owed, np.asarray(cols, dtype=np.int64), shares)
+        if shared_by_all and n_roommates:
+            shared = np.asarray(shared_by_all, dtype=np.int64)
+            sign = np.sign(cents[shared])
+            base, remainder = np.divmod(np.abs(cents[shared]), n_roommates)
+            owed += int((sign * base).sum())
+            # Leftover cents cover a wrapping window of ranks per expense;
+            # mark the windows in a doubled difference array and fold it back
+            first = expense_ids[shared] % n_roommates
+            window = np.zeros(2 * n_roommates + 1, dtype=np.int64)
+            np.add.at(window, first, sign)
+            np.add.at(window, first + remainder, -sign)
+            window = np.cumsum(window[:-1])
+            owed[by_id] += window[:n_roommates] + window[n_roommates:]
+        return paid, owed
+
+    paid = [0] * n_roommates
+    owed = [0] * n_roommates
+    for cents, position in zip(amounts, payer_positions):
+        if position >= 0:
+            paid[position] += cents
+    for col, share in zip(cols, shares):
+        owed[col] += share
+    if n_roommates:
+        for row in shared_by_all:
+            for rank, share in enumerate(split_cents(amounts[row], n_roommates, offsets[row])):
+                owed[by_id[rank]] += share
+    return paid, owed
+
+
+def aggregate_expenses(expenses: list[tuple], roommates: list[tuple]) -> dict:
+    """
+    Computes every report figure from one pass over the expenses.
+
+    The summary, settlement and personal budget reports all start from this
+    result instead of walking the expense list once per figure: a single
+    _scan_expenses() pass collects amounts, payers, categories and
+    participants, and the shares of all expenses are then split in one
+    batched allocate_shares() call.
+
+    Args:
+        expenses (list[tuple]): Expense tuples or history rows (see compute_balance_vectors)
+        roommates (list[tuple]): List of roommate tuples (id, name, ...)
+
+    Returns:
+        dict: All amounts in integer cents:
+              - "total": sum of all expenses
+              - "contributions": {roommate_id: cents paid}
+              - "fair_shares": {roommate_id: cents owed for the expenses
+                                they take part in (all, without participants)}
+              - "net": {roommate_id: paid - owed}; positive = is owed money
+              - "categories": {category: total}
+              - "budgets": {payer_id: {category: total}} for every payer ID seen
+    """
+    roommate_ids = [rm[0] for rm in roommates]
+    scan = _scan_expenses(expenses, {rm_id: i for i, rm_id in enumerate(roommate_ids)})
+    paid, owed = _balance_vectors(scan, roommate_ids)
+    paid = [int(cents) for cents in paid]
+    owed = [int(cents) for cents in owed]
+    return {
+        "total": scan["total"],
+        "contributions": dict(zip(roommate_ids, paid)),
+        "fair_shares": dict(zip(roommate_ids, owed)),
+        "net": {rm_id: p - o for rm_id, p, o in zip(roommate_ids, paid, owed)},
+        "categories": scan["categories"],
+        "budgets": scan["budgets"],
+    }
+
+
+def calculate_settlements(expenses: list[tuple], roommates: list[tuple],
+                          mode: str = "greedy", time_budget_ms: float = None) -> list[dict]:
     """
     Calculates financial settlements between roommates based on expense data.
     
     This function determines how much each roommate owes or is owed by others
-    based on the expenses they've paid and participated in. It uses a simplified
-    algorithm that assumes all roommates participate in every expense.
+    based on the expenses they've paid and participated in. Each expense is
+    split among its participants by their split weights when the rows carry
+    participant IDs (as returned by get_expense_history()); otherwise all
+    roommates are assumed to participate equally. Net balances come from
+    compute_balance_vectors().
     
     Args:
         expenses (list[tuple]): List of expense tuples from database 
                                 (id, date, account, category, amount, note, payer_id)
+                                or history rows with participant IDs at index 8
         roommates (list[tuple]): List of roommate tuples from database 
                                  (id, name, email, join_date)
+        mode (str, optional): "greedy" (default) or "optimal"; see settle_balances()
+        time_budget_ms (float, optional): Optimiser budget for mode="optimal"
     
     Returns:
         list[Dict]: List of settlement dictionaries representing who owes whom.
-                   Each dict contains: debtor_id, creditor_id, amount, debtor_name, creditor_name
+                   Each dict contains: debtor_id, creditor_id, amount (in
+                   integer cents), debtor_name, creditor_name
     """
     # Handle empty data cases
     if not expenses or not roommates:
         return []
 
-    # Create mapping from roommate ID to name for easy lookup
-    roommate_map = {rm[0]: rm[1] for rm in roommates}  # rm[0] = id, rm[1] = name
-
-    # Initialize balances: {roommate_id: net_balance}
+    # Net balances in cents: {roommate_id: net_balance}
     # Positive balance = person is owed money (paid more than they owe)
     # Negative balance = person owes money (paid less than they owe)
-    balances = {rm[0]: 0.0 for rm in roommates}
+    roommate_ids, paid, owed = compute_balance_vectors(expenses, roommates)
+    balances = {rm_id: int(paid[i] - owed[i]) for i, rm_id in enumerate(roommate_ids)}
 
-    # Process each expense to calculate net balances
-    for exp in expenses:
-        # Extract expense data from tuple
-        # Tuple structure: (id, date, account, category, amount, note, payer_id)
-        payer_id = exp[6]  # payer_id is at index 6
-        amount = exp[4]    # amount is at index 4
-        
-        participant_ids = [rm[0] for rm in roommates]
+    return settle_balances(balances, roommates, mode, time_budget_ms)
 
-        # Skip expenses with no participants (shouldn't happen with validation)
-        if not participant_ids:
-            continue
 
-        # Calculate equal share per participant
-        share_per_person = amount / len(participant_ids)
+def settle_balances(balances: dict[int, int], roommates: list[tuple],
+                    mode: str = "greedy", time_budget_ms: float = None) -> list[dict]:
+    """
+    Turns net balances into the list of transfers that settles them.
 
-        # Update balances:
-        # Payer's balance increases (they paid the full amount)
-        balances[payer_id] += amount
-        
-        # Each participant's balance decreases (they owe their share)
-        for participant_id in participant_ids:
-            balances[participant_id] -= share_per_person
+    This is the settlement step of calculate_settlements(), usable on its own
+    when balances are already known (e.g. read from the roommate_balances
+    table), which makes the cost independent of the number of expenses.
+    Balances and transfers are integer cents, so they settle exactly; format
+    them for display with money.format_cents().
+
+    Args:
+        balances (dict[int, int]): Mapping of roommate ID to net balance in cents.
+                                   Positive = is owed money, negative = owes money.
+        roommates (list[tuple]): List of roommate tuples from database
+                                 (id, name, email, join_date)
+        mode (str, optional): "greedy" settles the largest creditor against the
+                              largest debtor; "optimal" minimises the number of
+                              transfers with optimize_settlements(). Defaults to "greedy".
+        time_budget_ms (float, optional): Optimiser budget for mode="optimal".
+                                          Defaults to DEFAULT_OPTIMIZER_BUDGET_MS.
+
+    Returns:
+        list[Dict]: List of settlement dictionaries representing who owes whom.
+                   Each dict contains: debtor_id, creditor_id, amount (in
+                   integer cents), debtor_name, creditor_name
+
+    Raises:
+        ValueError: If mode is not one of SETTLEMENT_MODES
+    """
+    if mode not in SETTLEMENT_MODES:
+        raise ValueError(f"Unknown settlement mode: {mode!r} (expected one of {SETTLEMENT_MODES})")
+    if mode == "optimal":
+        return optimize_settlements(balances, roommates, time_budget_ms)
+
+    # Create mapping from roommate ID to name for easy lookup
+    roommate_map = {rm[0]: rm[1] for rm in roommates}  # rm[0] = id, rm[1] = name
 
-    # Separate creditors (positive balance) and debtors (negative balance)
-    creditors = {rm_id: bal for rm_id, bal in balances.items() if bal > 0}
-    debtors = {rm_id: abs(bal) for rm_id, bal in balances.items() if bal < 0}
+    # Whole cents settle exactly, with no epsilon clean-up
+    cents = [(rm_id, int(bal)) for rm_id, bal in balances.items()]
+
+    # Max-heaps (via negated balances) of creditors (positive balance) and
+    # debtors (negative balance). The insertion position breaks ties so equal
+    # balances are settled in the same order as the original sorted() scan.
+    creditors = [(-bal, order, rm_id) for order, (rm_id, bal) in enumerate(cents) if bal > 0]
+    debtors = [(bal, order, rm_id) for order, (rm_id, bal) in enumerate(cents) if bal < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
 
     # Generate settlements using a greedy algorithm:
-    # Repeatedly settle the largest creditor with the largest debtor
+    # Repeatedly settle the largest creditor with the largest debtor.
+    # Each step is O(log k), so k non-zero balances settle in O(k log k).
     settlements = []
     while creditors and debtors:
-        # Find the largest creditor and largest debtor
-        creditor_id, creditor_balance = next(iter(sorted(creditors.items(), 
-                                                       key=lambda item: item[1], 
-                                                       reverse=True)))
-        debtor_id, debtor_balance = next(iter(sorted(debtors.items(), 
-                                                   key=lambda item: item[1], 
-                                                   reverse=True)))
+        # Take the largest creditor and largest debtor
+        neg_creditor_balance, creditor_order, creditor_id = heapq.heappop(creditors)
+        neg_debtor_balance, debtor_order, debtor_id = heapq.heappop(debtors)
+        creditor_balance = -neg_creditor_balance
+        debtor_balance = -neg_debtor_balance
 
         # Settle the smaller of the two amounts
         amount_to_settle = min(creditor_balance, debtor_balance)
@@ -77,25 +387,217 @@ def calculate_settlements(expenses: list[tuple], roommates: list[tuple]) -> list
         settlement = {
             "debtor_id": debtor_id,
             "creditor_id": creditor_id,
-            "amount": round(amount_to_settle, 2),
+            "amount": amount_to_settle,
             "debtor_name": roommate_map[debtor_id],
             "creditor_name": roommate_map[creditor_id]
         }
         settlements.append(settlement)
 
         # Update balances after settlement
-        creditors[creditor_id] -= amount_to_settle
-        debtors[debtor_id] -= amount_to_settle
+        creditor_balance -= amount_to_settle
+        debtor_balance -= amount_to_settle
 
-        # Remove fully settled balances (using epsilon for floating point precision)
-        if creditors[creditor_id] < 0.01:
-            del creditors[creditor_id]
-        if debtors[debtor_id] < 0.01:
-            del debtors[debtor_id]
+        # Keep only balances that are not yet settled
+        if creditor_balance > 0:
+            heapq.heappush(creditors, (-creditor_balance, creditor_order, creditor_id))
+        if debtor_balance > 0:
+            heapq.heappush(debtors, (-debtor_balance, debtor_order, debtor_id))
 
     return settlements
 
 
+# -----------------------------
+# Minimum-transfer optimiser
+# -----------------------------
+#
+# A group of k non-zero balances that sums to zero can always be settled with
+# k - 1 transfers (the greedy matcher achieves this inside the group), so the
+# fewest transfers for all balances is (number of balances) - (largest number
+# of disjoint zero-sum groups they can be partitioned into). The optimiser
+# looks for that partition in integer cents and settles each group greedily.
+
+class _BudgetExceeded(Exception):
+    """Raised internally when the optimiser runs out of wall-clock time."""
+
+
+def _zero_sum_partition(cents: list[int], deadline: float) -> list[list[int]]:
+    """
+    Exactly partitions balances into the most zero-sum groups (subset DP).
+
+    best[mask] is the largest number of zero-sum groups that fit into the
+    balances in mask; a mask counts as one more group when its own sum is 0.
+    Walking back from the full mask, the zero-sum masks on the path cut the
+    balances into the groups. O(2^n * n) time, so n is kept small.
+
+    Args:
+        cents (list[int]): Non-zero balances in cents
+        deadline (float): time.perf_counter() value at which to give up
+
+    Returns:
+        list[list[int]]: Positions into cents, one list per group. If the
+                         balances do not sum to zero the last group holds the
+                         unbalanced remainder.
+
+    Raises:
+        _BudgetExceeded: If the deadline passes during the search
+    """
+    n = len(cents)
+    full = (1 << n) - 1
+    sums = [0] * (full + 1)
+    best = [0] * (full + 1)
+
+    for mask in range(1, full + 1):
+        if not mask & 0x3FF and time.perf_counter() > deadline:
+            raise _BudgetExceeded()
+        low = mask & -mask
+        sums[mask] = sums[mask ^ low] + cents[low.bit_length() - 1]
+        value = 0
+        remaining = mask
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            if best[mask ^ bit] > value:
+                value = best[mask ^ bit]
+        best[mask] = value + (1 if sums[mask] == 0 else 0)
+
+    # Recover the groups from the chain of masks
+    groups = []
+    mask = full
+    boundary = full
+    while mask:
+        if sums[mask] == 0 and mask != boundary:
+            groups.append(boundary ^ mask)
+            boundary = mask
+        target = best[mask] - (1 if sums[mask] == 0 else 0)
+        remaining = mask
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            if best[mask ^ bit] == target:
+                mask ^= bit
+                break
+    groups.append(boundary)
+
+    return [[i for i in range(n) if group >> i & 1] for group in groups if group]
+
+
+def _match_small_groups(cents: dict[int, int], deadline: float) -> list[list[int]]:
+    """
+    Bounded heuristic for large households: peels off zero-sum pairs and
+    triples (one balance cancelling two of the opposite sign) using hash
+    lookups. Matched roommates are removed from cents in place.
+
+    Args:
+        cents (dict[int, int]): Mapping of roommate ID to non-zero balance in cents
+        deadline (float): time.perf_counter() value at which to stop searching
+
+    Returns:
+        list[list[int]]: Roommate IDs of every zero-sum group found
+    """
+    groups = []
+
+    # Pairs: a creditor whose balance exactly cancels a debtor's
+    by_amount = {}
+    for rm_id, amount in cents.items():
+        if amount < 0:
+            by_amount.setdefault(amount, []).append(rm_id)
+    for rm_id, amount in list(cents.items()):
+        if amount > 0 and by_amount.get(-amount):
+            partner = by_amount[-amount].pop()
+            groups.append([rm_id, partner])
+            del cents[rm_id], cents[partner]
+
+    # Triples: two balances of one sign cancelling one of the other sign
+    for sign in (1, -1):
+        singles = {}
+        for rm_id, amount in cents.items():
+            if amount * sign < 0:
+                singles.setdefault(-amount, []).append(rm_id)
+        pool = [rm_id for rm_id, amount in cents.items() if amount * sign > 0]
+        used = set()
+        for i, first in enumerate(pool):
+            if first in used:
+                continue
+            for j, second in enumerate(pool[i + 1:]):
+                if not j & 0xFF and time.perf_counter() > deadline:
+                    break
+                if second in used:
+                    continue
+                candidates = singles.get(cents[first] + cents[second])
+                if candidates:
+                    third = candidates.pop()
+                    groups.append([first, second, third])
+                    used.update((first, second))
+                    break
+            if time.perf_counter() > deadline:
+                break
+        for group in groups:
+            for rm_id in group:
+                cents.pop(rm_id, None)
+
+    return groups
+
+
+def optimize_settlements(balances: dict[int, int], roommates: list[tuple],
+                         time_budget_ms: float = None) -> list[dict]:
+    """
+    Settles net balances with as few transfers as it can find in the budget.
+
+    Balances (in cents) are split into disjoint zero-sum groups, each of
+    which is then settled by the greedy matcher with one transfer fewer
+    than its size. Up to OPTIMIZER_EXACT_LIMIT balances the
+    partition is found exactly with a subset DP; larger households first
+    have zero-sum pairs and triples matched by a bounded heuristic, and the
+    DP is applied if the remainder is small enough. Whatever is left when
+    the search ends or the budget runs out is settled greedily, so the result
+    never has more transfers than settle_balances(mode="greedy") would give
+    for the same groups.
+
+    Args:
+        balances (dict[int, int]): Mapping of roommate ID to net balance in cents.
+                                   Positive = is owed money, negative = owes money.
+        roommates (list[tuple]): List of roommate tuples from database
+                                 (id, name, email, join_date)
+        time_budget_ms (float, optional): Wall-clock budget for the search.
+                                          Defaults to DEFAULT_OPTIMIZER_BUDGET_MS.
+
+    Returns:
+        list[Dict]: Settlement dictionaries in the same format as settle_balances()
+    """
+    if time_budget_ms is None:
+        time_budget_ms = DEFAULT_OPTIMIZER_BUDGET_MS
+    deadline = time.perf_counter() + time_budget_ms / 1000
+
+    # Integer cents make the zero-sum checks exact
+    cents = {rm_id: int(bal) for rm_id, bal in balances.items() if bal}
+
+    groups = []
+    try:
+        if len(cents) > OPTIMIZER_EXACT_LIMIT:
+            groups.extend(_match_small_groups(cents, deadline))
+        if 0 < len(cents) <= OPTIMIZER_EXACT_LIMIT:
+            ids = list(cents)
+            for positions in _zero_sum_partition([cents[rm_id] for rm_id in ids], deadline):
+                groups.append([ids[i] for i in positions])
+            cents = {}
+    except _BudgetExceeded:
+        pass
+    # Out of budget or too many balances left: greedy for the remainder
+    if cents:
+        groups.append(list(cents))
+
+    # Settle each group on its own (with only its members' names, so the cost
+    # stays proportional to the group size)
+    names = {rm[0]: rm[1] for rm in roommates}
+    settlements = []
+    for group in groups:
+        settlements.extend(settle_balances(
+            {rm_id: balances[rm_id] for rm_id in group},
+            [(rm_id, names[rm_id]) for rm_id in group]
+        ))
+    return settlements
+
+
 def calculate_personal_budget(expenses: list[tuple], roommates: list[tuple], user_id: int) -> dict[str, float]:
     """
     Calculates personal budget summary for a specific user by category.
@@ -120,14 +622,11 @@ def calculate_personal_budget(expenses: list[tuple], roommates: list[tuple], use
             category = exp[3]  # category at index 3
             amount = exp[4]    # amount at index 4
             
-            # Accumulate amount for this category
-            personal_budget[category] = personal_budget.get(category, 0.0) + amount
+            # Accumulate amount for this category, in exact cents
+            personal_budget[category] = personal_budget.get(category, 0) + to_cents(amount)
 
-    # Round all amounts to 2 decimal places for currency display
-    for category in personal_budget:
-        personal_budget[category] = round(personal_budget[category], 2)
-
-    return personal_budget
+    # Back to dollars for display
+    return {category: from_cents(cents) for category, cents in personal_budget.items()}
 
 
 def calculate_total_contributions(expenses: list[tuple], roommates: list[tuple]) -> dict[int, float]:
@@ -145,52 +644,39 @@ def calculate_total_contributions(expenses: list[tuple], roommates: list[tuple])
         dict[int, float]: Dictionary mapping roommate IDs to their total contributions
     """
     # Initialize contributions to zero for all roommates
-    contributions = {rm[0]: 0.0 for rm in roommates}
+    contributions = {rm[0]: 0 for rm in roommates}
     
-    # Sum up all expenses paid by each roommate
+    # Sum up all expenses paid by each roommate, in exact cents
     for exp in expenses:
         payer_id = exp[6]  # payer_id at index 6
         amount = exp[4]    # amount at index 4
-        contributions[payer_id] += amount
-
-    # Round all amounts for clean display
-    for rm_id in contributions:
-        contributions[rm_id] = round(contributions[rm_id], 2)
+        # Expenses without a (known) payer count towards nobody
+        if payer_id in contributions:
+            contributions[payer_id] += to_cents(amount)
 
-    return contributions
+    # Back to dollars for display
+    return {rm_id: from_cents(cents) for rm_id, cents in contributions.items()}
 
 
 def calculate_total_owed_per_person(expenses: list[tuple], roommates: list[tuple]) -> dict[int, float]:
     """
     Calculates the fair share amount each roommate should have paid.
     
-    This represents the ideal distribution of expenses if everything was split
-    equally among all participants for each expense.
+    This represents the ideal distribution of expenses if every expense was
+    split among its participants by their split weights (equal, percent,
+    share-count or exact; see allocate_shares()). Rows without participant
+    IDs are treated as shared equally by all roommates.
     
     Args:
-        expenses (list[tuple]): List of expense tuples from database
+        expenses (list[tuple]): List of expense tuples from database,
+                                optionally with participant IDs at index 8
+                                and split weights at index 10
         roommates (list[tuple]): List of roommate tuples from database
     
     Returns:
         dict[int, float]: Dictionary mapping roommate IDs to their total fair share amount
     """
-    # Initialize owed amounts to zero for all roommates
-    total_owed = {rm[0]: 0.0 for rm in roommates}
+    roommate_ids, _, owed = compute_balance_vectors(expenses, roommates)
 
-    # Calculate each person's share of each expense
-    for exp in expenses:
-        participant_ids = [rm[0] for rm in roommates]
-        amount = exp[4]  # amount at index 4
-        
-        # Calculate equal share for each participant
-        share_per_person = amount / len(participant_ids)
-        
-        # Add this expense's share to each participant's total
-        for participant_id in participant_ids:
-            total_owed[participant_id] += share_per_person
-
-    # Round all amounts for clean display
-    for rm_id in total_owed:
-        total_owed[rm_id] = round(total_owed[rm_id], 2)
-
-    return total_owed
+    # Back to dollars for display
+    return {rm_id: from_cents(owed[i]) for i, rm_id in enumerate(roommate_ids)}
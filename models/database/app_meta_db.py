@@ -0,0 +1,43 @@
+# models/database/app_meta_db.py
+from models.database.db_connection import connection, transaction
+from models.database.instrumentation import instrumented
+
+# -----------------------------
+# App Metadata
+# -----------------------------
+#
+# Small key/value settings that belong to the database file rather than to
+# one launch, e.g. 'seeded' (when the sample payers and participants were
+# assigned, so it happens once per database).
+
+
+@instrumented()
+def get_meta(key: str, default: str = None) -> str:
+    """
+    Reads one metadata value.
+
+    Args:
+        key (str): Metadata key (e.g. 'seeded')
+        default (str, optional): Returned if the key is not set. Defaults to None.
+
+    Returns:
+        str: The stored value, or default
+    """
+    with connection() as conn:
+        row = conn.execute("SELECT value FROM app_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+
+@instrumented()
+def set_meta(key: str, value: str) -> None:
+    """
+    Stores one metadata value, replacing any previous value.
+
+    Joins the caller's transaction if one is open, otherwise commits on its own.
+
+    Args:
+        key (str): Metadata key
+        value (str): Value to store
+    """
+    with transaction() as conn:
+        conn.execute("INSERT OR REPLACE INTO app_meta (key, value) VALUES (?, ?)", (key, value))
@@ -1,88 +1,359 @@
 # models/database/db_connection.py
+import atexit
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+from models.database.migrations import run_migrations
+
 # Database file path configuration
-DB_PATH = Path(__file__).parent.parent.parent / "assets" / "data" / "roomiesplit.db"
+# ROOMIESPLIT_DB lets scripts and tests point the app at a scratch database
+DB_PATH = Path(os.environ.get(
+    "ROOMIESPLIT_DB",
+    Path(__file__).parent.parent.parent / "assets" / "data" / "roomiesplit.db"
+))
+
+# Pragmas applied once to every new connection, in this order.
+# Tune these by passing a different profile to ConnectionManager.
+DEFAULT_PRAGMAS = {
+    "foreign_keys": "ON",          # Enforce referential integrity
+    "busy_timeout": 5000,          # Wait up to 5s for a competing writer
+    "cache_size": -16000,          # ~16 MB page cache (negative = KiB)
+    "mmap_size": 134217728,        # Memory-map up to 128 MB of the file
+    "synchronous": "NORMAL",       # Safe with WAL, one fsync per checkpoint
+}
+
+
+# Maximum number of bound parameters per "IN (...)" list or batch.
+# Kept well below SQLite's SQLITE_MAX_VARIABLE_NUMBER on older builds (999).
+SQL_CHUNK_SIZE = 500
+
+
+def chunked(items, size: int = SQL_CHUNK_SIZE):
+    """
+    Splits a sequence into consecutive lists of at most `size` items.
+
+    Args:
+        items: Any iterable (e.g. a list of expense IDs)
+        size (int, optional): Maximum chunk length. Defaults to SQL_CHUNK_SIZE.
+
+    Yields:
+        list: The next chunk of items
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _open_connection(path, pragmas: dict) -> sqlite3.Connection:
+    """
+    Opens a raw SQLite connection and applies the given pragma profile.
+
+    Args:
+        path: Path of the database file
+        pragmas (dict): Mapping of pragma name to value
+
+    Returns:
+        sqlite3.Connection: A configured SQLite connection
+    """
+    conn = sqlite3.connect(path)
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value};")
+    return conn
+
+
+class ConnectionManager:
+    """
+    Owns the long-lived SQLite connections used by the DAO layer.
+
+    SQLite connections cannot be shared across threads, so the manager keeps
+    exactly one connection per thread and reuses it for every query issued on
+    that thread. The pragma profile is applied once when a connection is
+    opened rather than on every call.
+    """
+
+    def __init__(self, path=None, pragmas: dict = None):
+        """
+        Initializes the manager without opening any connection yet.
+
+        Args:
+            path (optional): Database file path. Defaults to DB_PATH.
+            pragmas (dict, optional): Pragma profile. Defaults to DEFAULT_PRAGMAS.
+        """
+        self.path = path or DB_PATH
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+
+    def _get(self) -> sqlite3.Connection:
+        """Returns this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _open_connection(self.path, self.pragmas)
+            self._local.conn = conn
+            self._local.depth = 0
+            self._local.pending = []
+            with self._lock:
+                self._connections.add(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Yields this thread's shared connection for read-only work.
+
+        The connection stays open after the block exits; callers must not
+        close it.
+
+        Yields:
+            sqlite3.Connection: The thread's managed connection
+        """
+        yield self._get()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Yields this thread's connection inside a transaction (unit of work).
+
+        The outermost block opens the transaction, commits when it exits
+        normally and rolls back if an exception escapes. Nested blocks join
+        the enclosing transaction through a SAVEPOINT, so several DAO calls
+        can be grouped into one atomic commit, and a failing inner block only
+        undoes its own statements if the caller handles the error.
+
+        Example:
+            with transaction():
+                expense_id = add_expense(...)
+                add_expense_participants(expense_id, [1, 2])
+
+        Yields:
+            sqlite3.Connection: The thread's managed connection
+        """
+        conn = self._get()
+        depth = self._local.depth
+        savepoint = f"sp_{depth}"
+        pending = self._local.pending
+        pending_mark = len(pending)
+
+        if depth == 0:
+            if not conn.in_transaction:
+                # IMMEDIATE takes the write lock up front so busy_timeout applies
+                conn.execute("BEGIN IMMEDIATE")
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+
+        self._local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            self._local.depth = depth
+            # Callbacks registered by the undone statements must not run
+            del pending[pending_mark:]
+            if depth == 0:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            self._local.depth = depth
+            if depth == 0:
+                conn.commit()
+                self._run_pending()
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+
+    def after_commit(self, callback):
+        """
+        Runs callback once the current transaction has committed.
+
+        Inside a transaction() block the callback is queued and runs after the
+        outermost block commits; it is dropped if the work that registered it
+        is rolled back. Outside a transaction it runs immediately.
+
+        Args:
+            callback: Function taking no arguments
+        """
+        self._get()
+        if self._local.depth == 0:
+            callback()
+        else:
+            self._local.pending.append(callback)
+
+    def _run_pending(self):
+        """Runs the callbacks queued by after_commit() on this thread."""
+        pending = self._local.pending
+        while pending:
+            callback = pending.pop(0)
+            try:
+                callback()
+            except Exception as e:
+                # The data is already committed; a failing observer must not undo it
+                print(f"Error in after-commit callback {callback!r}: {e}")
+
+    def close(self):
+        """Closes the calling thread's connection, if one is open."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                self._connections.discard(conn)
+            conn.close()
+
+    def close_all(self):
+        """
+        Closes every connection the manager has handed out.
+
+        Intended for application shutdown. Connections owned by other threads
+        are closed as well, so those threads must be idle by then.
+        """
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Connection belongs to a thread that already exited
+                pass
+        self._local = threading.local()
+
+
+# Process-wide manager used by all DAO modules
+_manager = ConnectionManager()
+atexit.register(_manager.close_all)
+
+
+def get_manager() -> ConnectionManager:
+    """
+    Returns the process-wide connection manager.
+
+    Returns:
+        ConnectionManager: The shared manager instance
+    """
+    return _manager
+
+
+def connection():
+    """
+    Context manager yielding the current thread's shared connection.
+
+    Example:
+        with connection() as conn:
+            rows = conn.execute("SELECT ...").fetchall()
+    """
+    return _manager.connection()
+
+
+def transaction():
+    """
+    Context manager yielding the current thread's connection inside a
+    transaction that commits on success and rolls back on error.
+    """
+    return _manager.transaction()
+
+
+def after_commit(callback):
+    """
+    Runs callback after the current thread's transaction commits
+    (immediately if no transaction is open).
+    """
+    _manager.after_commit(callback)
+
+
+def close_connections():
+    """Closes all managed connections. Safe to call more than once."""
+    _manager.close_all()
 
 
 def get_connection() -> sqlite3.Connection:
     """
-    Establishes and returns a SQLite database connection with foreign key constraints enabled.
-    
-    Foreign key constraints ensure referential integrity between related tables
-    (e.g., expenses.payer_id must reference a valid roommates.id).
-    
+    Establishes and returns a new, unmanaged SQLite database connection.
+
+    The connection gets the same pragma profile as managed connections,
+    including foreign key constraints which ensure referential integrity
+    between related tables (e.g., expenses.payer_id must reference a valid
+    roommates.id). The caller owns the connection and must close it. Prefer
+    connection() / transaction() for regular DAO work.
+
     Returns:
         sqlite3.Connection: A SQLite database connection with foreign keys enabled
     """
-    conn = sqlite3.connect(DB_PATH)
-    # Enable foreign key constraints to maintain data integrity
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    return _open_connection(_manager.path, _manager.pragmas)
 
 
 def initialize_database():
     """
     Initializes the database by creating all required tables if they don't exist.
-    
+
     This function sets up the complete database schema including:
     - Roommates table for storing roommate information
     - Expenses table for tracking individual expenses
     - Expense participants table for many-to-many relationship between expenses and roommates
-    
+
     The schema includes proper foreign key constraints and indexing for data integrity
-    and performance.
+    and performance. Indexes and later schema changes are applied by the
+    versioned migrations in models/database/migrations.py.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
     # Enable Write-Ahead Logging for better concurrent read/write performance
-    # WAL allows reads to occur while writes are in progress
-    cur.execute("PRAGMA journal_mode=WAL;")
-
-    # Create roommates table - stores basic roommate information
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS roommates (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT,
-            join_date TEXT
-        );
-    """)
-
-    # Create expenses table - tracks individual expense records
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS expenses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            account TEXT,
-            category TEXT NOT NULL,
-            amount REAL NOT NULL,
-            note TEXT,
-            payer_id INTEGER,
-            -- Foreign key to roommates table with SET NULL on delete
-            -- This preserves expense records even if the payer is deleted
-            FOREIGN KEY (payer_id) REFERENCES roommates(id) ON DELETE SET NULL
-        );
-    """)
-
-    # Create expense_participants table - many-to-many relationship table
-    # Tracks which roommates participated in which expenses
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS expense_participants (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            expense_id INTEGER NOT NULL,
-            roommate_id INTEGER NOT NULL,
-            -- CASCADE delete: if expense is deleted, remove all its participant records
-            FOREIGN KEY (expense_id) REFERENCES expenses(id) ON DELETE CASCADE,
-            -- Standard foreign key: participant must be a valid roommate
-            FOREIGN KEY (roommate_id) REFERENCES roommates(id),
-            -- Ensure unique combinations to prevent duplicate participant entries
-            UNIQUE(expense_id, roommate_id)
-        );
-    """)
-
-    # Commit changes and close connection
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    # WAL allows reads to occur while writes are in progress.
+    # The journal mode cannot be changed inside a transaction.
+    with connection() as conn:
+        conn.execute("PRAGMA journal_mode=WAL;")
+
+    with transaction() as conn:
+        cur = conn.cursor()
+
+        # Create roommates table - stores basic roommate information
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS roommates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                email TEXT,
+                join_date TEXT
+            );
+        """)
+
+        # Create expenses table - tracks individual expense records
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS expenses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                account TEXT,
+                category TEXT NOT NULL,
+                amount REAL NOT NULL,
+                note TEXT,
+                payer_id INTEGER,
+                -- Foreign key to roommates table with SET NULL on delete
+                -- This preserves expense records even if the payer is deleted
+                FOREIGN KEY (payer_id) REFERENCES roommates(id) ON DELETE SET NULL
+            );
+        """)
+
+        # Create expense_participants table - many-to-many relationship table
+        # Tracks which roommates participated in which expenses
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS expense_participants (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                expense_id INTEGER NOT NULL,
+                roommate_id INTEGER NOT NULL,
+                -- CASCADE delete: if expense is deleted, remove all its participant records
+                FOREIGN KEY (expense_id) REFERENCES expenses(id) ON DELETE CASCADE,
+                -- Standard foreign key: participant must be a valid roommate
+                FOREIGN KEY (roommate_id) REFERENCES roommates(id),
+                -- Ensure unique combinations to prevent duplicate participant entries
+                UNIQUE(expense_id, roommate_id)
+            );
+        """)
+
+    # Upgrade the schema (indexes, new tables) to the latest version
+    with connection() as conn:
+        run_migrations(conn)
@@ -0,0 +1,95 @@
+# models/database/events.py
+import threading
+
+from models.database.db_connection import after_commit, connection
+
+# -----------------------------
+# Expense Change Notifications
+# -----------------------------
+#
+# DAO write functions call publish() with the IDs of the expenses they
+# touched. Subscribers are called only after the surrounding transaction has
+# committed, so they never see changes that are later rolled back.
+#
+# Every committed change also bumps a process-wide change counter, which
+# together with PRAGMA data_version (see change_token()) lets caches tell
+# cheaply whether anything was written since they last looked.
+
+_lock = threading.Lock()
+_listeners = []
+_change_count = 0
+_local = threading.local()
+
+
+def subscribe(callback):
+    """
+    Registers a function to be called after committed expense changes.
+
+    Args:
+        callback: Function taking one argument: a frozenset of changed
+                  expense IDs, or None when anything may have changed
+                  (e.g. a roommate was added, renamed or deleted)
+    """
+    with _lock:
+        if callback not in _listeners:
+            _listeners.append(callback)
+
+
+def unsubscribe(callback):
+    """
+    Removes a function registered with subscribe(). Unknown callbacks are ignored.
+
+    Args:
+        callback: The function to remove
+    """
+    with _lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+
+
+def publish(expense_ids=None):
+    """
+    Announces changed expenses to all subscribers once the write commits.
+
+    Args:
+        expense_ids (iterable, optional): IDs of the inserted, updated or
+                                          deleted expenses. None means the
+                                          change is not limited to known expenses.
+    """
+    changed = None if expense_ids is None else frozenset(expense_ids)
+    if changed is not None and not changed:
+        return
+    after_commit(lambda: _dispatch(changed))
+
+
+def _dispatch(changed):
+    """Bumps the change counter and calls every subscriber with the committed change set."""
+    global _change_count
+    with _lock:
+        _change_count += 1
+        listeners = list(_listeners)
+    for callback in listeners:
+        callback(changed)
+
+
+def change_token() -> int:
+    """
+    Returns a number that changes whenever committed data may have changed.
+
+    Writes through the DAO bump the counter directly. Commits made by other
+    connections (another thread or process, e.g. an import run from the
+    command line) are detected through PRAGMA data_version on this thread's
+    connection; they are announced to the subscribers as "anything may have
+    changed" before the new token is returned. Costs one PRAGMA round trip.
+
+    Returns:
+        int: The current change token; equal tokens mean no change in between
+    """
+    with connection() as conn:
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+    seen = getattr(_local, "data_version", None)
+    _local.data_version = version
+    if seen is not None and seen != version:
+        _dispatch(None)
+    with _lock:
+        return _change_count
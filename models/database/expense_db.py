@@ -1,18 +1,26 @@
 # models/database/expense_db.py
-from models.database.db_connection import get_connection
+import re
+import sqlite3
+
+from models.database.db_connection import connection, transaction, chunked
+from models.database.events import publish
+from models.database.instrumentation import instrumented
+from models.money import to_cents, split_weights
 
 # -----------------------------
 # Expense CRUD Operations
 # -----------------------------
 
-def add_expense(date: str, account: str, category: str, amount: float, 
-                note: str = "", payer_id: int = None) -> int:
+@instrumented()
+def add_expense(date: str, account: str, category: str, amount: float,
+                note: str = "", payer_id: int = None, household_id: int = 1,
+                split_type: str = "equal") -> int:
     """
     Creates a new expense record in the database and returns the generated expense ID.
-    
+
     This function handles the core expense creation and is typically followed by
     adding participants via add_expense_participants().
-    
+
     Args:
         date (str): The date of the expense in 'YYYY-MM-DD' format
         account (str): The account or payment method used
@@ -20,134 +28,459 @@ def add_expense(date: str, account: str, category: str, amount: float,
         amount (float): The expense amount
         note (str, optional): Additional notes about the expense. Defaults to empty string.
         payer_id (int, optional): ID of the roommate who paid. Defaults to None.
-    
+        household_id (int, optional): Household the expense belongs to. Defaults to 1.
+        split_type (str, optional): How the participant weights were entered
+                                    (see models.money.SPLIT_TYPES). Defaults to "equal".
+
     Returns:
         int: The auto-generated ID of the newly created expense record
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    # Insert expense record
-    cur.execute("""
-        INSERT INTO expenses (date, account, category, amount, note, payer_id)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (date, account, category, amount, note, payer_id))
-    
-    # Get the auto-generated ID of the new expense
-    expense_id = cur.lastrowid
-    
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        # Insert expense record
+        cur = conn.execute("""
+            INSERT INTO expenses (date, account, category, amount, note, payer_id, household_id, split_type)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (date, account, category, amount, note, payer_id, household_id, split_type))
+        publish([cur.lastrowid])
+
+        # Get the auto-generated ID of the new expense
+        return cur.lastrowid
+
+
+@instrumented()
+def create_expense(date: str, account: str, category: str, amount: float,
+                   note: str = "", payer_id: int = None, participant_ids: list = (),
+                   household_id: int = 1, split_type: str = "equal", split_values: list = None) -> int:
+    """
+    Creates an expense together with its participants as one unit of work.
+
+    The expense row and all participant rows are written on one connection
+    in one transaction with a single commit. If any part fails (e.g. an
+    unknown roommate ID), nothing is saved, so an expense can never be left
+    without its participants.
+
+    Args:
+        date (str): The date of the expense in 'YYYY-MM-DD' format
+        account (str): The account or payment method used
+        category (str): Expense category (e.g., 'Groceries', 'Rent', 'Utilities')
+        amount (float): The expense amount
+        note (str, optional): Additional notes about the expense. Defaults to empty string.
+        payer_id (int, optional): ID of the roommate who paid. Defaults to None.
+        participant_ids (list, optional): Roommate IDs sharing the expense. Defaults to none.
+        household_id (int, optional): Household the expense belongs to. Defaults to 1.
+        split_type (str, optional): "equal" (default), "percent", "shares" or "exact"
+        split_values (list, optional): One value per participant for the
+                                       non-equal split types (percentages,
+                                       share counts or dollar amounts)
+
+    Returns:
+        int: The auto-generated ID of the newly created expense record
+
+    Raises:
+        ValueError: If the split values are invalid (see models.money.split_weights)
+    """
+    weights = split_weights(split_type, participant_ids if split_type == "equal" else split_values or [],
+                            to_cents(amount))
+    if len(weights) != len(participant_ids):
+        raise ValueError("expected one split value per participant")
+    with transaction():
+        expense_id = add_expense(date, account, category, amount, note, payer_id, household_id, split_type)
+        add_expense_participants(expense_id, participant_ids, weights)
     return expense_id
 
 
-def get_all_expenses() -> list:
+@instrumented()
+def get_all_expenses(household_id: int = None) -> list:
     """
     Retrieves all expense records from the database, ordered by most recent first.
-    
+
+    Args:
+        household_id (int, optional): Only return this household's expenses.
+                                      Defaults to every household.
+
     Returns:
         list: List of expense tuples ordered by date descending.
               Each tuple: (id, date, account, category, amount, note, payer_id)
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT id, date, account, category, amount, note, payer_id
-        FROM expenses
-        ORDER BY date DESC
-    """)
-    
-    data = cur.fetchall()
-    conn.close()
-    return data
+    where, params = ("WHERE household_id = ?", (household_id,)) if household_id is not None else ("", ())
+    with connection() as conn:
+        cur = conn.execute(f"""
+            SELECT id, date, account, category, amount, note, payer_id
+            FROM expenses
+            {where}
+            ORDER BY date DESC
+        """, params)
+        return cur.fetchall()
+
 
+@instrumented()
+def count_expenses(household_id: int = None) -> int:
+    """
+    Counts expenses without fetching them.
 
+    Args:
+        household_id (int, optional): Only count this household's expenses.
+                                      Defaults to every household.
+
+    Returns:
+        int: Number of expenses
+    """
+    where, params = ("WHERE household_id = ?", (household_id,)) if household_id is not None else ("", ())
+    with connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM expenses {where}", params).fetchone()[0]
+
+
+@instrumented()
+def get_expense_ids(household_id: int = None, without_payer: bool = False) -> list:
+    """
+    Retrieves expense IDs only, in ID order.
+
+    Args:
+        household_id (int, optional): Only this household's expenses. Defaults to every household.
+        without_payer (bool, optional): Only expenses with no payer yet (served
+                                        by the partial idx_expenses_unpaid index).
+                                        Defaults to False.
+
+    Returns:
+        list: Expense IDs
+    """
+    conditions, params = [], []
+    if household_id is not None:
+        conditions.append("household_id = ?")
+        params.append(household_id)
+    if without_payer:
+        conditions.append("payer_id IS NULL")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with connection() as conn:
+        return [row[0] for row in conn.execute(f"SELECT id FROM expenses {where} ORDER BY id", params)]
+
+
+@instrumented()
+def get_expense_history(household_id: int = None) -> list:
+    """
+    Retrieves every expense together with its payer and participant details.
+
+    Replaces the pattern of calling get_roommate_by_id() and
+    get_expense_participants() once per expense. Payer names come from a JOIN
+    and participants are bulk-prefetched in a second query, so the whole
+    history costs two round trips regardless of its size.
+
+    Args:
+        household_id (int, optional): Only return this household's expenses.
+                                      Defaults to every household.
+
+    Returns:
+        list: List of history tuples ordered by date descending.
+              Each tuple: (id, date, account, category, amount, note, payer_id,
+              payer_name, participant_ids, participant_names, participant_weights).
+              The first seven fields match get_all_expenses(); payer_name is
+              None when no payer is set and the participant fields are tuples
+              (empty if none). A participant's share is its weight divided by
+              the expense's total weight (all 1 for an equal split).
+    """
+    where, params = ("WHERE e.household_id = ?", (household_id,)) if household_id is not None else ("", ())
+    with connection() as conn:
+        expenses = conn.execute(f"""
+            SELECT e.id, e.date, e.account, e.category, e.amount, e.note,
+                   e.payer_id, r.name
+            FROM expenses e
+            LEFT JOIN roommates r ON e.payer_id = r.id
+            {where}
+            ORDER BY e.date DESC
+        """, params).fetchall()
+
+        # Prefetch all participant rows in one pass, grouped by expense
+        participants = {}
+        for expense_id, roommate_id, name, weight in conn.execute(f"""
+            SELECT ep.expense_id, r.id, r.name, ep.weight
+            FROM expense_participants ep
+            JOIN roommates r ON ep.roommate_id = r.id
+            JOIN expenses e ON e.id = ep.expense_id
+            {where}
+            ORDER BY ep.expense_id, ep.id
+        """, params):
+            ids, names, weights = participants.setdefault(expense_id, ([], [], []))
+            ids.append(roommate_id)
+            names.append(name)
+            weights.append(weight)
+
+    history = []
+    for exp in expenses:
+        ids, names, weights = participants.get(exp[0], ((), (), ()))
+        history.append(exp + (tuple(ids), tuple(names), tuple(weights)))
+    return history
+
+
+@instrumented()
+def get_ledger_entries(expense_ids: list = None) -> dict:
+    """
+    Retrieves the fields that balances depend on, for all or some expenses.
+
+    Used by models.ledger.BalanceLedger to load once and then refresh only
+    the expenses named in change notifications.
+
+    Args:
+        expense_ids (list, optional): Only fetch these expenses. Defaults to all.
+
+    Returns:
+        dict: Mapping of expense ID to (category, amount_cents, payer_id,
+              participant_ids, participant_weights, date, household_id) where
+              participant_ids is a tuple sorted by roommate ID and
+              participant_weights holds the matching weights. Requested IDs
+              that no longer exist are absent.
+    """
+    entries = {}
+    participants = {}
+    with connection() as conn:
+        if expense_ids is None:
+            chunks = [None]
+        else:
+            chunks = chunked(list(expense_ids))
+        for chunk in chunks:
+            where = "" if chunk is None else f"WHERE id IN ({', '.join('?' * len(chunk))})"
+            for expense_id, category, cents, payer_id, date, household_id in conn.execute(
+                f"SELECT id, category, amount_cents, payer_id, date, household_id FROM expenses {where}",
+                chunk or ()
+            ):
+                entries[expense_id] = (category, cents, payer_id, date, household_id)
+            where = "" if chunk is None else f"WHERE expense_id IN ({', '.join('?' * len(chunk))})"
+            for expense_id, roommate_id, weight in conn.execute(
+                f"SELECT expense_id, roommate_id, weight FROM expense_participants {where} "
+                f"ORDER BY expense_id, roommate_id", chunk or ()
+            ):
+                ids, weights = participants.setdefault(expense_id, ([], []))
+                ids.append(roommate_id)
+                weights.append(weight)
+
+    result = {}
+    for expense_id, (category, cents, payer_id, date, household_id) in entries.items():
+        ids, weights = participants.get(expense_id, ((), ()))
+        result[expense_id] = (category, cents, payer_id, tuple(ids), tuple(weights), date, household_id)
+    return result
+
+
+@instrumented(rows=lambda page: len(page[0]))
+def get_expenses_page(limit: int = 100, cursor: tuple = None, category: str = None,
+                      payer_id: int = None, start_date: str = None,
+                      end_date: str = None) -> tuple:
+    """
+    Retrieves one page of expenses using keyset pagination.
+
+    Rows are ordered by (date DESC, id DESC). Instead of an OFFSET, the next
+    page starts strictly after the (date, id) of the last row returned, so
+    every page costs the same no matter how deep into the table it is.
+
+    Args:
+        limit (int, optional): Maximum rows per page. Defaults to 100.
+        cursor (tuple, optional): (date, id) returned as next_cursor by the
+                                  previous call. None fetches the first page.
+        category (str, optional): Only include expenses in this category
+        payer_id (int, optional): Only include expenses paid by this roommate
+        start_date (str, optional): Only include expenses on or after this date
+        end_date (str, optional): Only include expenses on or before this date
+
+    Returns:
+        tuple: (rows, next_cursor) where rows are expense tuples
+               (id, date, account, category, amount, note, payer_id) and
+               next_cursor is None once the last page has been reached
+    """
+    conditions = []
+    values = []
+
+    if cursor is not None:
+        conditions.append("(date, id) < (?, ?)")
+        values.extend(cursor)
+    if category is not None:
+        conditions.append("category = ?")
+        values.append(category)
+    if payer_id is not None:
+        conditions.append("payer_id = ?")
+        values.append(payer_id)
+    if start_date is not None:
+        conditions.append("date >= ?")
+        values.append(start_date)
+    if end_date is not None:
+        conditions.append("date <= ?")
+        values.append(end_date)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    values.append(limit)
+
+    with connection() as conn:
+        rows = conn.execute(f"""
+            SELECT id, date, account, category, amount, note, payer_id
+            FROM expenses
+            {where}
+            ORDER BY date DESC, id DESC
+            LIMIT ?
+        """, tuple(values)).fetchall()
+
+    # A short page means there is nothing left to fetch
+    next_cursor = (rows[-1][1], rows[-1][0]) if len(rows) == limit else None
+    return rows, next_cursor
+
+
+def iter_expense_chunks(chunk_size: int = 1000, **filters):
+    """
+    Streams expenses in fixed-size chunks, newest first.
+
+    Built on get_expenses_page(), so at most one chunk is held in memory and
+    no read transaction stays open between chunks.
+
+    Args:
+        chunk_size (int, optional): Rows per chunk. Defaults to 1000.
+        **filters: Same filters as get_expenses_page() (category, payer_id,
+                   start_date, end_date)
+
+    Yields:
+        list: The next list of up to chunk_size expense tuples
+    """
+    cursor = None
+    while True:
+        rows, cursor = get_expenses_page(chunk_size, cursor, **filters)
+        if rows:
+            yield rows
+        if cursor is None:
+            return
+
+
+@instrumented()
+def search_expense_ids(text: str, limit: int = None) -> list:
+    """
+    Searches expenses by note, category, account and payer name.
+
+    Uses the expenses_fts full-text index with prefix matching, so "gro"
+    matches "Groceries". Every word in the search text must match. Results
+    are ordered by relevance (FTS5 bm25 rank). Falls back to a LIKE scan if
+    the database has no FTS5 index.
+
+    Args:
+        text (str): Free-text search input
+        limit (int, optional): Maximum number of IDs to return
+
+    Returns:
+        list: Matching expense IDs, best match first (empty if text has no words)
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return []
+
+    # Quote each word so FTS5 operators in user input are treated literally
+    match = " ".join(f'"{word}"*' for word in words)
+    limit_sql = "LIMIT ?" if limit is not None else ""
+    params = (match, limit) if limit is not None else (match,)
+
+    with connection() as conn:
+        try:
+            cur = conn.execute(f"""
+                SELECT rowid FROM expenses_fts
+                WHERE expenses_fts MATCH ?
+                ORDER BY rank
+                {limit_sql}
+            """, params)
+            return [row[0] for row in cur]
+        except sqlite3.OperationalError:
+            # No FTS5 support in this SQLite build
+            pass
+
+        conditions = []
+        values = []
+        for word in words:
+            conditions.append(
+                "(e.note LIKE ? OR e.category LIKE ? OR e.account LIKE ? OR r.name LIKE ?)"
+            )
+            values.extend([f"%{word}%"] * 4)
+        if limit is not None:
+            values.append(limit)
+        cur = conn.execute(f"""
+            SELECT e.id FROM expenses e
+            LEFT JOIN roommates r ON e.payer_id = r.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY e.date DESC, e.id DESC
+            {limit_sql}
+        """, tuple(values))
+        return [row[0] for row in cur]
+
+
+@instrumented()
 def get_expense_by_id(expense_id: int) -> tuple:
     """
     Retrieves a single expense record by its ID.
-    
+
     Args:
         expense_id (int): The ID of the expense to retrieve
-    
+
     Returns:
         tuple: Expense record as a tuple, or None if not found
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT id, date, account, category, amount, note, payer_id
-        FROM expenses
-        WHERE id = ?
-    """, (expense_id,))
-    
-    result = cur.fetchone()
-    conn.close()
-    return result
+    with connection() as conn:
+        cur = conn.execute("""
+            SELECT id, date, account, category, amount, note, payer_id
+            FROM expenses
+            WHERE id = ?
+        """, (expense_id,))
+        return cur.fetchone()
 
 
+@instrumented()
 def get_expense_by_category(category: str) -> list:
     """
     Retrieves all expenses in a specific category.
-    
+
     Useful for generating category-based reports or filtering expenses.
-    
+
     Args:
         category (str): The category to filter by (e.g., 'Groceries', 'Entertainment')
-    
+
     Returns:
         list: List of expense tuples matching the specified category
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT id, date, account, category, amount, note, payer_id
-        FROM expenses
-        WHERE category = ?
-    """, (category,))
-    
-    results = cur.fetchall()
-    conn.close()
-    return results
+    with connection() as conn:
+        cur = conn.execute("""
+            SELECT id, date, account, category, amount, note, payer_id
+            FROM expenses
+            WHERE category = ?
+        """, (category,))
+        return cur.fetchall()
 
 
+@instrumented()
 def get_expenses_by_roommate(roommate_id: int) -> list:
     """
     Retrieves all expenses paid by a specific roommate.
-    
+
     Useful for generating personal expense reports or calculating individual contributions.
-    
+
     Args:
         roommate_id (int): The ID of the roommate whose expenses to retrieve
-    
+
     Returns:
         list: List of expense tuples paid by the specified roommate
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT id, date, account, category, amount, note, payer_id
-        FROM expenses
-        WHERE payer_id = ?
-    """, (roommate_id,))
-    
-    results = cur.fetchall()
-    conn.close()
-    return results
+    with connection() as conn:
+        cur = conn.execute("""
+            SELECT id, date, account, category, amount, note, payer_id
+            FROM expenses
+            WHERE payer_id = ?
+        """, (roommate_id,))
+        return cur.fetchall()
 
 
-def update_expense(expense_id: int, date: str = None, account: str = None, 
-                   category: str = None, amount: float = None, note: str = None, 
-                   payer_id: int = None):
+@instrumented()
+def update_expense(expense_id: int, date: str = None, account: str = None,
+                   category: str = None, amount: float = None, note: str = None,
+                   payer_id: int = None, split_values: dict = None):
     """
     Updates an existing expense record with only the provided fields.
-    
+
     This function uses dynamic field building to only update the fields that
     are provided (not None), making it flexible for partial updates.
-    
+
+    The participants of an 'exact' split store their amounts as weights, so
+    a new amount for such an expense must come with new exact amounts that
+    add up to it; both are written in the same transaction. Other split
+    types keep their weights and are re-split over the new amount.
+
     Args:
         expense_id (int): The ID of the expense to update
         date (str, optional): New date in 'YYYY-MM-DD' format
@@ -156,10 +489,14 @@ def update_expense(expense_id: int, date: str = None, account: str = None,
         amount (float, optional): New expense amount
         note (str, optional): New notes
         payer_id (int, optional): New payer roommate ID
-    """
-    conn = get_connection()
-    cur = conn.cursor()
+        split_values (dict, optional): New exact amount per participant ID;
+                                       required with a new amount for an
+                                       'exact' split, not accepted otherwise
 
+    Raises:
+        ValueError: If the amount of an 'exact' split changes without valid
+                    split_values, or split_values are given for any other change
+    """
     # Build dynamic update query based on provided parameters
     fields = []
     values = []
@@ -184,129 +521,379 @@ def update_expense(expense_id: int, date: str = None, account: str = None,
         values.append(payer_id)
 
     # Exit early if no fields to update
-    if not fields:
-        conn.close()
+    if not fields and split_values is None:
         return
 
     # Build and execute the dynamic SQL query
     sql = f"UPDATE expenses SET {', '.join(fields)} WHERE id = ?"
     values.append(expense_id)
 
-    cur.execute(sql, tuple(values))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        weights = _exact_weights(conn, expense_id, amount, split_values)
+        conn.execute(sql, tuple(values))
+        if weights:
+            conn.executemany(
+                "UPDATE expense_participants SET weight = ? WHERE expense_id = ? AND roommate_id = ?",
+                [(weight, expense_id, roommate_id) for roommate_id, weight in weights.items()]
+            )
+        publish([expense_id])
+
 
+def _exact_weights(conn, expense_id: int, amount, split_values: dict) -> dict:
+    """
+    Validates the split values passed to update_expense().
+
+    Returns:
+        dict: New weight (cents) per participant ID of an 'exact' split whose
+              amount changes, otherwise empty
 
+    Raises:
+        ValueError: See update_expense()
+    """
+    row = conn.execute("SELECT split_type FROM expenses WHERE id = ?", (expense_id,)).fetchone()
+    if amount is None or row is None or row[0] != "exact":
+        if split_values is not None:
+            raise ValueError("split values can only be changed with the amount of an exact split")
+        return {}
+    if split_values is None:
+        raise ValueError("changing the amount of an exact split needs the new exact amounts")
+
+    participant_ids = {r[0] for r in conn.execute(
+        "SELECT roommate_id FROM expense_participants WHERE expense_id = ?", (expense_id,))}
+    if set(split_values) != participant_ids:
+        raise ValueError("expected one exact amount per participant")
+    roommate_ids = list(split_values)
+    weights = split_weights("exact", [split_values[rm_id] for rm_id in roommate_ids], to_cents(amount))
+    return dict(zip(roommate_ids, weights))
+
+
+@instrumented()
 def delete_expense(expense_id: int) -> bool:
     """
     Deletes an expense record from the database.
-    
+
     Due to foreign key constraints with CASCADE delete, this will also
     automatically remove all associated participant records from the
     expense_participants table.
-    
+
     Args:
         expense_id (int): The ID of the expense to delete
-    
+
     Returns:
         bool: True if the expense was successfully deleted, False otherwise
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    # Verify the expense exists before attempting deletion
-    cur.execute("SELECT id FROM expenses WHERE id = ?", (expense_id,))
-    exists = cur.fetchone()
-    
-    # Execute the deletion
-    cur.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
-    rows_deleted = cur.rowcount
-    
-    conn.commit()
-    conn.close()
-    
+    with transaction() as conn:
+        cur = conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+        rows_deleted = cur.rowcount
+        publish([expense_id])
+
     # Return success status
     return rows_deleted > 0
 
 
+# -----------------------------
+# Expense Aggregates
+# -----------------------------
+#
+# GROUP BY queries over the integer amount_cents column, so the reports can
+# total a household without loading its expenses. Date bounds are inclusive
+# 'YYYY-MM-DD' strings (or dates), like the BalanceLedger's date ranges.
+
+def _aggregate_filter(household_id: int = None, start_date=None, end_date=None) -> tuple:
+    """Builds the WHERE conditions and parameters shared by the aggregates."""
+    conditions, params = [], []
+    if household_id is not None:
+        conditions.append("household_id = ?")
+        params.append(household_id)
+    if start_date:
+        conditions.append("date >= ?")
+        params.append(str(start_date))
+    if end_date:
+        conditions.append("date <= ?")
+        params.append(str(end_date))
+    return conditions, params
+
+
+@instrumented()
+def get_total_expenses(household_id: int = None, start_date=None, end_date=None) -> int:
+    """
+    Calculates the sum of the expense amounts in SQL.
+
+    Args:
+        household_id (int, optional): Only count this household's expenses.
+                                      Defaults to every household.
+        start_date (optional): Only count expenses on or after this date
+        end_date (optional): Only count expenses on or before this date
+
+    Returns:
+        int: Total in cents (0 when there are no expenses)
+    """
+    conditions, params = _aggregate_filter(household_id, start_date, end_date)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with connection() as conn:
+        return conn.execute(f"SELECT COALESCE(SUM(amount_cents), 0) FROM expenses {where}",
+                            params).fetchone()[0]
+
+
+@instrumented()
+def get_contributions_by_payer(household_id: int = None, start_date=None, end_date=None) -> dict:
+    """
+    Calculates the total amount paid by each roommate with a GROUP BY payer_id.
+
+    SQL counterpart of calculator.calculate_total_contributions() that does
+    not need the expense list in memory. Expenses without a payer are ignored.
+
+    Args:
+        household_id (int, optional): Only count this household's expenses.
+                                      Defaults to every household.
+        start_date (optional): Only count expenses on or after this date
+        end_date (optional): Only count expenses on or before this date
+
+    Returns:
+        dict: Mapping of payer roommate ID to the total paid in cents
+              (roommates who paid nothing are absent)
+    """
+    conditions, params = _aggregate_filter(household_id, start_date, end_date)
+    conditions.append("payer_id IS NOT NULL")
+    with connection() as conn:
+        cur = conn.execute(f"""
+            SELECT payer_id, SUM(amount_cents)
+            FROM expenses
+            WHERE {' AND '.join(conditions)}
+            GROUP BY payer_id
+        """, params)
+        return dict(cur.fetchall())
+
+
+@instrumented()
+def get_personal_budget(roommate_id: int, household_id: int = None, start_date=None,
+                        end_date=None) -> dict:
+    """
+    Calculates a roommate's spending per category with a filtered GROUP BY.
+
+    SQL counterpart of calculator.calculate_personal_budget(); the payer_id
+    index limits the scan to the roommate's own expenses.
+
+    Args:
+        roommate_id (int): The ID of the roommate who paid
+        household_id (int, optional): Only count this household's expenses.
+                                      Defaults to every household.
+        start_date (optional): Only count expenses on or after this date
+        end_date (optional): Only count expenses on or before this date
+
+    Returns:
+        dict: Mapping of category name to the total paid in cents
+    """
+    conditions, params = _aggregate_filter(household_id, start_date, end_date)
+    with connection() as conn:
+        cur = conn.execute(f"""
+            SELECT category, SUM(amount_cents)
+            FROM expenses
+            WHERE {' AND '.join(['payer_id = ?'] + conditions)}
+            GROUP BY category
+        """, [roommate_id] + params)
+        return dict(cur.fetchall())
+
+
+# -----------------------------
+# Bulk Expense Operations
+# -----------------------------
+
+@instrumented()
+def add_expenses_bulk(expenses: list, household_id: int = 1) -> list:
+    """
+    Inserts many expense records in a single transaction.
+
+    Uses executemany so that importing thousands of expenses costs one
+    commit instead of one per row.
+
+    Args:
+        expenses (list): List of tuples (date, account, category, amount, note, payer_id)
+        household_id (int, optional): Household all rows belong to. Defaults to 1.
+
+    Returns:
+        list: The generated expense IDs, in the same order as the input rows
+    """
+    if not expenses:
+        return []
+
+    with transaction() as conn:
+        conn.executemany("""
+            INSERT INTO expenses (date, account, category, amount, note, payer_id, household_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [tuple(row) + (household_id,) for row in expenses])
+
+        # The transaction holds the write lock, so AUTOINCREMENT hands out
+        # consecutive IDs ending at the last inserted row
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        first_id = last_id - len(expenses) + 1
+        publish(range(first_id, last_id + 1))
+
+    return list(range(first_id, last_id + 1))
+
+
+@instrumented()
+def delete_expenses(expense_ids: list) -> dict:
+    """
+    Deletes many expense records in a single transaction.
+
+    IDs are processed in chunks of `WHERE id IN (...)` statements. As with
+    delete_expense(), participant rows are removed by the CASCADE constraint.
+
+    Args:
+        expense_ids (list): IDs of the expenses to delete
+
+    Returns:
+        dict: Mapping of each requested expense ID to True if it was deleted,
+              or False if no such expense existed
+    """
+    outcomes = {expense_id: False for expense_id in expense_ids}
+
+    with transaction() as conn:
+        for chunk in chunked(list(outcomes)):
+            placeholders = ", ".join("?" * len(chunk))
+            existing = conn.execute(
+                f"SELECT id FROM expenses WHERE id IN ({placeholders})", chunk
+            ).fetchall()
+            conn.execute(f"DELETE FROM expenses WHERE id IN ({placeholders})", chunk)
+            for (expense_id,) in existing:
+                outcomes[expense_id] = True
+        publish(expense_id for expense_id, deleted in outcomes.items() if deleted)
+
+    return outcomes
+
+
+@instrumented()
+def set_participants_bulk(assignments: dict) -> dict:
+    """
+    Replaces the participant lists of many expenses in a single transaction.
+
+    Bulk counterpart of update_expense_participants(): existing participant
+    rows are cleared with chunked DELETEs and the new rows are written with
+    one executemany. The expenses are split equally afterwards.
+
+    Args:
+        assignments (dict): Mapping of expense ID to a list of roommate IDs
+
+    Returns:
+        dict: Mapping of each expense ID to True if its participants were set,
+              or False if the expense does not exist (it is skipped)
+    """
+    outcomes = {expense_id: False for expense_id in assignments}
+
+    with transaction() as conn:
+        for chunk in chunked(list(outcomes)):
+            placeholders = ", ".join("?" * len(chunk))
+            existing = conn.execute(
+                f"SELECT id FROM expenses WHERE id IN ({placeholders})", chunk
+            ).fetchall()
+            for (expense_id,) in existing:
+                outcomes[expense_id] = True
+            conn.execute(
+                f"DELETE FROM expense_participants WHERE expense_id IN ({placeholders})", chunk
+            )
+            conn.execute(
+                f"UPDATE expenses SET split_type = 'equal' "
+                f"WHERE id IN ({placeholders}) AND split_type != 'equal'", chunk
+            )
+
+        conn.executemany("""
+            INSERT OR IGNORE INTO expense_participants (expense_id, roommate_id)
+            VALUES (?, ?)
+        """, [
+            (expense_id, participant_id)
+            for expense_id, participant_ids in assignments.items() if outcomes[expense_id]
+            for participant_id in participant_ids
+        ])
+        publish(expense_id for expense_id, updated in outcomes.items() if updated)
+
+    return outcomes
+
+
 # -----------------------------
 # Expense Participant Operations
 # -----------------------------
 
-def add_expense_participants(expense_id: int, participant_ids: list):
+@instrumented()
+def add_expense_participants(expense_id: int, participant_ids: list, weights: list = None):
     """
     Adds multiple roommates as participants to an expense.
-    
+
     This creates the many-to-many relationship between expenses and roommates.
     Uses INSERT OR IGNORE to handle cases where participant might already exist.
-    
+
     Args:
         expense_id (int): The ID of the expense
         participant_ids (list): List of roommate IDs to add as participants
+        weights (list, optional): Positive integer split weight per participant
+                                  (see models.money.split_weights). Defaults to 1 each.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    for participant_id in participant_ids:
-        cur.execute("""
-            INSERT OR IGNORE INTO expense_participants (expense_id, roommate_id)
-            VALUES (?, ?)
-        """, (expense_id, participant_id))
-    
-    conn.commit()
-    conn.close()
+    if weights is None:
+        weights = [1] * len(participant_ids)
+    with transaction() as conn:
+        conn.executemany("""
+            INSERT OR IGNORE INTO expense_participants (expense_id, roommate_id, weight)
+            VALUES (?, ?, ?)
+        """, [(expense_id, participant_id, weight) for participant_id, weight in zip(participant_ids, weights)])
+        publish([expense_id])
 
 
+@instrumented()
 def get_expense_participants(expense_id: int) -> list:
     """
     Retrieves all roommates who participated in a specific expense.
-    
+
     Args:
         expense_id (int): The ID of the expense
-    
+
     Returns:
         list: List of tuples containing participant information.
               Each tuple: (roommate_id, roommate_name)
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT r.id, r.name 
-        FROM expense_participants ep
-        JOIN roommates r ON ep.roommate_id = r.id
-        WHERE ep.expense_id = ?
-    """, (expense_id,))
-    
-    participants = cur.fetchall()
-    conn.close()
-    return participants
+    with connection() as conn:
+        cur = conn.execute("""
+            SELECT r.id, r.name
+            FROM expense_participants ep
+            JOIN roommates r ON ep.roommate_id = r.id
+            WHERE ep.expense_id = ?
+        """, (expense_id,))
+        return cur.fetchall()
 
 
-def update_expense_participants(expense_id: int, participant_ids: list):
+@instrumented()
+def update_expense_participants(expense_id: int, participant_ids: list,
+                                split_type: str = "equal", split_values: list = None):
     """
     Completely replaces the participant list for an expense.
-    
+
     This operation first removes all existing participants and then adds
     the new list. Useful for when you need to completely change who
     participated in an expense.
-    
+
     Args:
         expense_id (int): The ID of the expense to update
         participant_ids (list): New list of roommate IDs to set as participants
+        split_type (str, optional): "equal" (default), "percent", "shares" or "exact"
+        split_values (list, optional): One value per participant for the
+                                       non-equal split types
+
+    Raises:
+        ValueError: If the split values are invalid (see models.money.split_weights)
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    # Remove all existing participants for this expense
-    cur.execute("DELETE FROM expense_participants WHERE expense_id = ?", (expense_id,))
-    
-    # Add the new participants
-    for participant_id in participant_ids:
-        cur.execute("""
-            INSERT INTO expense_participants (expense_id, roommate_id)
-            VALUES (?, ?)
-        """, (expense_id, participant_id))
-    
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    with transaction() as conn:
+        row = conn.execute("SELECT amount_cents FROM expenses WHERE id = ?", (expense_id,)).fetchone()
+        weights = split_weights(split_type, participant_ids if split_type == "equal" else split_values or [],
+                                row[0] if row else 0)
+        if len(weights) != len(participant_ids):
+            raise ValueError("expected one split value per participant")
+
+        # Remove all existing participants for this expense
+        conn.execute("DELETE FROM expense_participants WHERE expense_id = ?", (expense_id,))
+        conn.execute("UPDATE expenses SET split_type = ? WHERE id = ?", (split_type, expense_id))
+
+        # Add the new participants
+        conn.executemany("""
+            INSERT INTO expense_participants (expense_id, roommate_id, weight)
+            VALUES (?, ?, ?)
+        """, [(expense_id, participant_id, weight) for participant_id, weight in zip(participant_ids, weights)])
+        publish([expense_id])
@@ -0,0 +1,95 @@
+# models/database/household_db.py
+from models.database.db_connection import connection, transaction, chunked
+from models.database.events import publish
+from models.database.instrumentation import instrumented
+
+# -----------------------------
+# Household Operations
+# -----------------------------
+
+@instrumented()
+def add_household(name: str) -> int:
+    """
+    Creates a new household.
+
+    Args:
+        name (str): Display name of the household
+
+    Returns:
+        int: The auto-generated household ID
+    """
+    with transaction() as conn:
+        cur = conn.execute("INSERT INTO households (name) VALUES (?)", (name,))
+        publish()
+        return cur.lastrowid
+
+
+@instrumented()
+def get_all_households() -> list:
+    """
+    Retrieves every household.
+
+    Returns:
+        list: List of tuples (id, name) ordered by ID
+    """
+    with connection() as conn:
+        return conn.execute("SELECT id, name FROM households ORDER BY id").fetchall()
+
+
+@instrumented()
+def get_household_snapshots(household_ids: list) -> dict:
+    """
+    Loads the roommates and expense history of several households at once.
+
+    Used by the batch report job: each work unit is a chunk of households
+    read with three queries (roommates, expenses, participants) through the
+    household indexes, instead of two queries per household.
+
+    Args:
+        household_ids (list): IDs of the households to load
+
+    Returns:
+        dict: Mapping of household ID to (roommates, history) where roommates
+              are (id, name, email, join_date) tuples ordered by ID and history
+              rows have the get_expense_history() layout, newest first
+    """
+    snapshots = {household_id: ([], []) for household_id in household_ids}
+
+    with connection() as conn:
+        for chunk in chunked(list(snapshots)):
+            placeholders = ", ".join("?" * len(chunk))
+
+            for rm_id, name, email, join_date, household_id in conn.execute(f"""
+                SELECT id, name, email, join_date, household_id
+                FROM roommates
+                WHERE household_id IN ({placeholders})
+                ORDER BY id
+            """, chunk):
+                snapshots[household_id][0].append((rm_id, name, email, join_date))
+
+            participants = {}
+            for expense_id, roommate_id, name, weight in conn.execute(f"""
+                SELECT ep.expense_id, r.id, r.name, ep.weight
+                FROM expenses e
+                JOIN expense_participants ep ON ep.expense_id = e.id
+                JOIN roommates r ON r.id = ep.roommate_id
+                WHERE e.household_id IN ({placeholders})
+                ORDER BY ep.expense_id, ep.id
+            """, chunk):
+                ids, names, weights = participants.setdefault(expense_id, ([], [], []))
+                ids.append(roommate_id)
+                names.append(name)
+                weights.append(weight)
+
+            for row in conn.execute(f"""
+                SELECT e.id, e.date, e.account, e.category, e.amount, e.note,
+                       e.payer_id, r.name, e.household_id
+                FROM expenses e
+                LEFT JOIN roommates r ON e.payer_id = r.id
+                WHERE e.household_id IN ({placeholders})
+                ORDER BY e.household_id, e.date DESC
+            """, chunk):
+                ids, names, weights = participants.get(row[0], ((), (), ()))
+                snapshots[row[8]][1].append(row[:8] + (tuple(ids), tuple(names), tuple(weights)))
+
+    return snapshots
@@ -0,0 +1,294 @@
+# models/database/instrumentation.py
+import atexit
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from models.database.db_connection import connection
+
+# Latency samples kept per query name for percentile estimates
+MAX_SAMPLES = 2000
+
+# Slow query records kept in memory (oldest are dropped first)
+MAX_SLOW_QUERIES = 200
+
+# Statements captured per call for the slow-query log
+MAX_CAPTURED_STATEMENTS = 20
+
+slow_query_logger = logging.getLogger("roomiesplit.slow_queries")
+
+
+class QueryStats:
+    """
+    Running statistics for one named DAO query.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initializes empty statistics.
+
+        Args:
+            name (str): The query name (e.g. 'expense_db.get_all_expenses')
+        """
+        self.name = name
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=MAX_SAMPLES)
+
+    def record(self, elapsed_ms: float, rows: int):
+        """
+        Adds one call to the statistics.
+
+        Args:
+            elapsed_ms (float): Wall-clock latency of the call in milliseconds
+            rows (int): Number of rows the call returned
+        """
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        self.samples.append(elapsed_ms)
+
+    def percentile(self, pct: float) -> float:
+        """
+        Returns a latency percentile over the retained samples.
+
+        Args:
+            pct (float): Percentile between 0 and 100
+
+        Returns:
+            float: Latency in milliseconds (0.0 if there are no samples)
+        """
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def to_dict(self) -> dict:
+        """
+        Converts the statistics to a JSON-friendly dictionary.
+
+        Returns:
+            dict: calls, rows and latency figures in milliseconds
+        """
+        return {
+            "calls": self.calls,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+# -----------------------------
+# Configuration and State
+# -----------------------------
+
+_lock = threading.Lock()
+_stats = {}
+_slow_queries = deque(maxlen=MAX_SLOW_QUERIES)
+_local = threading.local()
+
+# ROOMIESPLIT_PROFILE=<path> profiles the whole session and writes the
+# stats to <path> as JSON on exit; ROOMIESPLIT_SLOW_MS sets the threshold.
+_config = {
+    "enabled": bool(os.environ.get("ROOMIESPLIT_PROFILE")),
+    "slow_threshold_ms": float(os.environ.get("ROOMIESPLIT_SLOW_MS", 50.0)),
+    "stats_path": os.environ.get("ROOMIESPLIT_PROFILE") or None,
+}
+
+
+def configure(enabled: bool = True, slow_threshold_ms: float = None, stats_path: str = None):
+    """
+    Turns DAO instrumentation on or off.
+
+    Args:
+        enabled (bool, optional): Whether to record statistics. Defaults to True.
+        slow_threshold_ms (float, optional): Calls slower than this are added
+                                             to the slow-query log
+        stats_path (str, optional): File that receives the JSON stats on exit
+    """
+    _config["enabled"] = enabled
+    if slow_threshold_ms is not None:
+        _config["slow_threshold_ms"] = float(slow_threshold_ms)
+    if stats_path is not None:
+        _config["stats_path"] = stats_path
+
+
+def is_enabled() -> bool:
+    """Returns True while instrumentation is recording."""
+    return _config["enabled"]
+
+
+def reset_stats():
+    """Clears all recorded statistics and slow queries."""
+    with _lock:
+        _stats.clear()
+        _slow_queries.clear()
+
+
+def get_stats() -> dict:
+    """
+    Returns a snapshot of the per-query statistics.
+
+    Returns:
+        dict: Mapping of query name to QueryStats.to_dict()
+    """
+    with _lock:
+        return {name: stats.to_dict() for name, stats in sorted(_stats.items())}
+
+
+def get_slow_queries() -> list:
+    """
+    Returns the slow-query log, oldest first.
+
+    Returns:
+        list: Dicts with name, elapsed_ms, rows, statements and query plans
+    """
+    with _lock:
+        return list(_slow_queries)
+
+
+def dump_stats_json(path: str = None) -> str:
+    """
+    Serializes the statistics and slow-query log as JSON.
+
+    Args:
+        path (str, optional): If given, the JSON is also written to this file
+
+    Returns:
+        str: The JSON document
+    """
+    document = json.dumps({
+        "slow_threshold_ms": _config["slow_threshold_ms"],
+        "queries": get_stats(),
+        "slow_queries": get_slow_queries(),
+    }, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(document)
+    return document
+
+
+def _dump_on_exit():
+    """Writes the stats file configured through ROOMIESPLIT_PROFILE."""
+    if _config["enabled"] and _config["stats_path"]:
+        dump_stats_json(_config["stats_path"])
+
+
+atexit.register(_dump_on_exit)
+
+
+# -----------------------------
+# Recording
+# -----------------------------
+
+def _count_rows(result) -> int:
+    """
+    Best-effort row count for a DAO return value.
+
+    Lists, dicts and sets count their items and a tuple counts as one row.
+    Functions returning another shape pass rows= to instrumented().
+    """
+    if isinstance(result, (list, dict, set)):
+        return len(result)
+    if isinstance(result, tuple):
+        return 1
+    return 0
+
+
+def _explain(conn, statements: list) -> list:
+    """Runs EXPLAIN QUERY PLAN for the captured read statements."""
+    plans = []
+    for sql in statements:
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            continue
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            plans.append({"sql": sql, "plan": [row[3] for row in rows]})
+        except Exception as e:
+            plans.append({"sql": sql, "plan": [f"unavailable: {e}"]})
+    return plans
+
+
+def instrumented(name: str = None, rows=None):
+    """
+    Decorator that times a DAO function and counts the rows it returns.
+
+    When instrumentation is disabled the wrapper only checks one flag. When
+    enabled, the SQL statements run by the call are captured through the
+    connection's trace callback; if the call exceeds the slow threshold they
+    are recorded in the slow-query log together with their EXPLAIN QUERY PLAN.
+
+    Args:
+        name (str, optional): Query name. Defaults to '<module>.<function>'.
+        rows (callable, optional): Returns the row count of a result, for
+                                   results that are not a plain list of
+                                   rows (e.g. a (rows, cursor) page).
+                                   Defaults to _count_rows().
+    """
+    count_rows = rows or _count_rows
+
+    def decorator(func):
+        query_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _config["enabled"]:
+                return func(*args, **kwargs)
+
+            with connection() as conn:
+                buffers = getattr(_local, "buffers", None)
+                if buffers is None:
+                    buffers = _local.buffers = []
+                captured = []
+                buffers.append(captured)
+                if len(buffers) == 1:
+                    # Outermost instrumented call owns the trace callback
+                    def trace(sql):
+                        for buffer in _local.buffers:
+                            if len(buffer) < MAX_CAPTURED_STATEMENTS:
+                                buffer.append(" ".join(sql.split()))
+                    conn.set_trace_callback(trace)
+
+                start = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                finally:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    buffers.pop()
+                    if not buffers:
+                        conn.set_trace_callback(None)
+
+                row_count = count_rows(result)
+                with _lock:
+                    stats = _stats.get(query_name)
+                    if stats is None:
+                        stats = _stats[query_name] = QueryStats(query_name)
+                    stats.record(elapsed_ms, row_count)
+
+                if elapsed_ms >= _config["slow_threshold_ms"] and not buffers:
+                    entry = {
+                        "name": query_name,
+                        "elapsed_ms": round(elapsed_ms, 3),
+                        "rows": row_count,
+                        "plans": _explain(conn, captured),
+                    }
+                    with _lock:
+                        _slow_queries.append(entry)
+                    slow_query_logger.warning("Slow query %s took %.1f ms (%d rows)",
+                                              query_name, elapsed_ms, row_count)
+                return result
+
+        return wrapper
+    return decorator
@@ -0,0 +1,811 @@
+# models/database/migrations.py
+import sqlite3
+from collections import Counter
+from contextlib import contextmanager
+
+from models.fingerprint import expense_fingerprint
+
+# -----------------------------
+# Schema Migrations
+# -----------------------------
+#
+# Each migration is (version, description, steps). Steps are either SQL
+# strings or callables taking the connection. Versions must be strictly
+# increasing; the applied version is stored in PRAGMA user_version so that
+# existing database files are upgraded in place.
+
+def _fts5_available(conn: sqlite3.Connection) -> bool:
+    """Returns True if this SQLite build includes the FTS5 extension."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _create_expense_search_index(conn: sqlite3.Connection):
+    """
+    Creates the expenses_fts full-text index and the triggers that keep it in
+    sync with expenses and roommate names. The FTS rowid is the expense id.
+    Skipped (search falls back to LIKE) if FTS5 is not compiled in.
+    """
+    if not _fts5_available(conn):
+        print("Warning: SQLite FTS5 is unavailable; expense search will use LIKE")
+        return
+
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5(
+            note, category, account, payer_name,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS expenses_fts_insert AFTER INSERT ON expenses
+        BEGIN
+            INSERT INTO expenses_fts (rowid, note, category, account, payer_name)
+            VALUES (NEW.id, NEW.note, NEW.category, NEW.account,
+                    (SELECT name FROM roommates WHERE id = NEW.payer_id));
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS expenses_fts_update
+        AFTER UPDATE OF note, category, account, payer_id ON expenses
+        BEGIN
+            DELETE FROM expenses_fts WHERE rowid = OLD.id;
+            INSERT INTO expenses_fts (rowid, note, category, account, payer_name)
+            VALUES (NEW.id, NEW.note, NEW.category, NEW.account,
+                    (SELECT name FROM roommates WHERE id = NEW.payer_id));
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS expenses_fts_delete AFTER DELETE ON expenses
+        BEGIN
+            DELETE FROM expenses_fts WHERE rowid = OLD.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS roommates_fts_rename AFTER UPDATE OF name ON roommates
+        BEGIN
+            UPDATE expenses_fts SET payer_name = NEW.name
+            WHERE rowid IN (SELECT id FROM expenses WHERE payer_id = NEW.id);
+        END
+    """)
+
+    # Backfill existing expenses
+    conn.execute("DELETE FROM expenses_fts")
+    conn.execute("""
+        INSERT INTO expenses_fts (rowid, note, category, account, payer_name)
+        SELECT e.id, e.note, e.category, e.account, r.name
+        FROM expenses e
+        LEFT JOIN roommates r ON e.payer_id = r.id
+    """)
+
+
+def _rebuild_real_balances(conn: sqlite3.Connection):
+    """
+    Fills the REAL-valued roommate_balances table of migration 4.
+
+    Superseded by rebuild_roommate_balances() once migration 5 has moved the
+    table to integer cents.
+    """
+    conn.execute("DELETE FROM roommate_balances")
+    conn.execute("""
+        INSERT INTO roommate_balances (roommate_id, paid_total, owed_total)
+        SELECT r.id,
+               COALESCE((SELECT SUM(e.amount) FROM expenses e WHERE e.payer_id = r.id), 0.0),
+               COALESCE((
+                   SELECT SUM(e.amount * 1.0 / c.n)
+                   FROM expense_participants ep
+                   JOIN expenses e ON e.id = ep.expense_id
+                   JOIN (SELECT expense_id, COUNT(*) AS n
+                         FROM expense_participants GROUP BY expense_id) c
+                     ON c.expense_id = ep.expense_id
+                   WHERE ep.roommate_id = r.id
+               ), 0.0)
+        FROM roommates r
+    """)
+
+
+def _create_roommate_balances(conn: sqlite3.Connection):
+    """
+    Creates roommate_balances and the triggers that keep it current.
+
+    Owed totals use an equal split among an expense's participant rows.
+    Every trigger applies only the delta caused by one row change, so the
+    table stays current in O(participants) per write.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS roommate_balances (
+            roommate_id INTEGER PRIMARY KEY,
+            paid_total REAL NOT NULL DEFAULT 0.0,
+            owed_total REAL NOT NULL DEFAULT 0.0,
+            -- Positive = is owed money, negative = owes money
+            net REAL GENERATED ALWAYS AS (paid_total - owed_total) VIRTUAL,
+            FOREIGN KEY (roommate_id) REFERENCES roommates(id) ON DELETE CASCADE
+        )
+    """)
+
+    # Every new roommate starts with a zero balance row
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS balances_roommate_insert AFTER INSERT ON roommates
+        BEGIN
+            INSERT OR IGNORE INTO roommate_balances (roommate_id) VALUES (NEW.id);
+        END
+    """)
+
+    # Paid totals follow the expense's payer and amount
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS balances_expense_insert AFTER INSERT ON expenses
+        BEGIN
+            UPDATE roommate_balances SET paid_total = paid_total + NEW.amount
+            WHERE roommate_id = NEW.payer_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS balances_expense_update
+        AFTER UPDATE OF amount, payer_id ON expenses
+        BEGIN
+            UPDATE roommate_balances SET paid_total = paid_total - OLD.amount
+            WHERE roommate_id = OLD.payer_id;
+            UPDATE roommate_balances SET paid_total = paid_total + NEW.amount
+            WHERE roommate_id = NEW.payer_id;
+            -- Spread the amount change equally over the participants
+            UPDATE roommate_balances
+            SET owed_total = owed_total + (NEW.amount - OLD.amount) * 1.0 /
+                (SELECT COUNT(*) FROM expense_participants WHERE expense_id = NEW.id)
+            WHERE roommate_id IN
+                (SELECT roommate_id FROM expense_participants WHERE expense_id = NEW.id);
+        END
+    """)
+    # Participant rows are removed by ON DELETE CASCADE after the expense row
+    # is gone, so the owed shares are released here, before the delete
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS balances_expense_delete BEFORE DELETE ON expenses
+        BEGIN
+            UPDATE roommate_balances SET paid_total = paid_total - OLD.amount
+            WHERE roommate_id = OLD.payer_id;
+            UPDATE roommate_balances
+            SET owed_total = owed_total - OLD.amount * 1.0 /
+                (SELECT COUNT(*) FROM expense_participants WHERE expense_id = OLD.id)
+            WHERE roommate_id IN
+                (SELECT roommate_id FROM expense_participants WHERE expense_id = OLD.id);
+        END
+    """)
+
+    # Adding a participant to an expense with n participants (after the insert)
+    # moves each existing share from amount/(n-1) to amount/n
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS balances_participant_insert
+        AFTER INSERT ON expense_participants
+        BEGIN
+            UPDATE roommate_balances
+            SET owed_total = owed_total
+                + (SELECT amount FROM expenses WHERE id = NEW.expense_id) * (
+                    1.0 / (SELECT COUNT(*) FROM expense_participants WHERE expense_id = NEW.expense_id)
+                  - 1.0 / ((SELECT COUNT(*) FROM expense_participants WHERE expense_id = NEW.expense_id) - 1))
+            WHERE roommate_id IN (SELECT roommate_id FROM expense_participants
+                                  WHERE expense_id = NEW.expense_id AND roommate_id != NEW.roommate_id);
+            UPDATE roommate_balances
+            SET owed_total = owed_total
+                + (SELECT amount FROM expenses WHERE id = NEW.expense_id) * 1.0 /
+                  (SELECT COUNT(*) FROM expense_participants WHERE expense_id = NEW.expense_id)
+            WHERE roommate_id = NEW.roommate_id;
+        END
+    """)
+    # Removing a participant (n remaining) moves the others from amount/(n+1)
+    # to amount/n. Skipped during cascades, handled by balances_expense_delete.
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS balances_participant_delete
+        AFTER DELETE ON expense_participants
+        WHEN EXISTS (SELECT 1 FROM expenses WHERE id = OLD.expense_id)
+        BEGIN
+            UPDATE roommate_balances
+            SET owed_total = owed_total
+                - (SELECT amount FROM expenses WHERE id = OLD.expense_id) * 1.0 /
+                  ((SELECT COUNT(*) FROM expense_participants WHERE expense_id = OLD.expense_id) + 1)
+            WHERE roommate_id = OLD.roommate_id;
+            UPDATE roommate_balances
+            SET owed_total = owed_total
+                + (SELECT amount FROM expenses WHERE id = OLD.expense_id) * (
+                    1.0 / (SELECT COUNT(*) FROM expense_participants WHERE expense_id = OLD.expense_id)
+                  - 1.0 / ((SELECT COUNT(*) FROM expense_participants WHERE expense_id = OLD.expense_id) + 1))
+            WHERE roommate_id IN (SELECT roommate_id FROM expense_participants
+                                  WHERE expense_id = OLD.expense_id);
+        END
+    """)
+
+    _rebuild_real_balances(conn)
+
+
+# Share of one participant row in cents, matching models.money.split_cents():
+# participants are ranked by roommate_id, each gets amount_cents / n and the
+# amount_cents % n leftover cents go to consecutive ranks starting at
+# expense id % n. Amounts are validated to be non-negative.
+_EXPENSE_SHARES_VIEW = """
+    CREATE VIEW IF NOT EXISTS expense_shares AS
+    SELECT expense_id, roommate_id,
+           amount_cents / n
+           + ((((k - expense_id % n) % n) + n) % n < amount_cents % n) AS share_cents
+    FROM (
+        SELECT ep.expense_id, ep.roommate_id, e.amount_cents,
+               (SELECT COUNT(*) FROM expense_participants x
+                WHERE x.expense_id = ep.expense_id) AS n,
+               (SELECT COUNT(*) FROM expense_participants x
+                WHERE x.expense_id = ep.expense_id AND x.roommate_id < ep.roommate_id) AS k
+        FROM expense_participants ep
+        JOIN expenses e ON e.id = ep.expense_id
+    )
+"""
+
+
+def _apply_shares(sign: str, expense_id: str) -> str:
+    """
+    Builds the trigger statement that adds (sign '+') or removes (sign '-')
+    the current shares of every participant of one expense.
+    """
+    return f"""
+            UPDATE roommate_balances
+            SET owed_cents = owed_cents {sign} (
+                SELECT share_cents FROM expense_shares
+                WHERE expense_id = {expense_id} AND roommate_id = roommate_balances.roommate_id)
+            WHERE roommate_id IN
+                (SELECT roommate_id FROM expense_participants WHERE expense_id = {expense_id});
+    """
+
+
+def rebuild_roommate_balances(conn: sqlite3.Connection):
+    """
+    Recomputes every row of roommate_balances from expenses and participants.
+
+    Paid totals are the sum of expenses each roommate paid for; owed totals
+    split every expense among its participant rows in whole cents (see
+    the expense_shares view). Expenses without participant rows only count
+    towards the payer's paid total.
+
+    Args:
+        conn (sqlite3.Connection): Connection inside an open transaction
+    """
+    conn.execute("DELETE FROM roommate_balances")
+    conn.execute("""
+        INSERT INTO roommate_balances (roommate_id, paid_cents, owed_cents)
+        SELECT r.id,
+               COALESCE((SELECT SUM(e.amount_cents) FROM expenses e WHERE e.payer_id = r.id), 0),
+               COALESCE((SELECT SUM(s.share_cents) FROM expense_shares s
+                         WHERE s.roommate_id = r.id), 0)
+        FROM roommates r
+    """)
+
+
+def _convert_balances_to_cents(conn: sqlite3.Connection):
+    """
+    Moves amounts and roommate_balances to exact integer cents.
+
+    Adds the generated expenses.amount_cents column and the expense_shares
+    view, and recreates roommate_balances with INTEGER cent columns. Each
+    participant change or amount change first removes the old shares of the
+    whole expense and then adds the new ones, since the leftover cents can
+    move between participants; that keeps every write O(participants).
+    """
+    conn.execute("""
+        ALTER TABLE expenses ADD COLUMN amount_cents INTEGER
+        GENERATED ALWAYS AS (CAST(ROUND(amount * 100) AS INTEGER)) VIRTUAL
+    """)
+    conn.execute(_EXPENSE_SHARES_VIEW)
+
+    for trigger in ("balances_roommate_insert", "balances_expense_insert", "balances_expense_update",
+                    "balances_expense_delete", "balances_participant_insert",
+                    "balances_participant_delete"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS roommate_balances")
+
+    conn.execute("""
+        CREATE TABLE roommate_balances (
+            roommate_id INTEGER PRIMARY KEY,
+            paid_cents INTEGER NOT NULL DEFAULT 0,
+            owed_cents INTEGER NOT NULL DEFAULT 0,
+            -- Positive = is owed money, negative = owes money
+            net_cents INTEGER GENERATED ALWAYS AS (paid_cents - owed_cents) VIRTUAL,
+            FOREIGN KEY (roommate_id) REFERENCES roommates(id) ON DELETE CASCADE
+        )
+    """)
+
+    conn.execute("""
+        CREATE TRIGGER balances_roommate_insert AFTER INSERT ON roommates
+        BEGIN
+            INSERT OR IGNORE INTO roommate_balances (roommate_id) VALUES (NEW.id);
+        END
+    """)
+
+    # Paid totals follow the expense's payer and amount
+    conn.execute("""
+        CREATE TRIGGER balances_expense_insert AFTER INSERT ON expenses
+        BEGIN
+            UPDATE roommate_balances SET paid_cents = paid_cents + NEW.amount_cents
+            WHERE roommate_id = NEW.payer_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER balances_expense_payer_update
+        AFTER UPDATE OF amount, payer_id ON expenses
+        BEGIN
+            UPDATE roommate_balances SET paid_cents = paid_cents - OLD.amount_cents
+            WHERE roommate_id = OLD.payer_id;
+            UPDATE roommate_balances SET paid_cents = paid_cents + NEW.amount_cents
+            WHERE roommate_id = NEW.payer_id;
+        END
+    """)
+    # A new amount is re-split among the participants
+    conn.execute(f"""
+        CREATE TRIGGER balances_expense_amount_before BEFORE UPDATE OF amount ON expenses
+        BEGIN
+            {_apply_shares("-", "OLD.id")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER balances_expense_amount_after AFTER UPDATE OF amount ON expenses
+        BEGIN
+            {_apply_shares("+", "NEW.id")}
+        END
+    """)
+    # Participant rows are removed by ON DELETE CASCADE after the expense row
+    # is gone, so the owed shares are released here, before the delete
+    conn.execute(f"""
+        CREATE TRIGGER balances_expense_delete BEFORE DELETE ON expenses
+        BEGIN
+            UPDATE roommate_balances SET paid_cents = paid_cents - OLD.amount_cents
+            WHERE roommate_id = OLD.payer_id;
+            {_apply_shares("-", "OLD.id")}
+        END
+    """)
+
+    # Adding or removing a participant re-splits the whole expense.
+    # Deletes are skipped during cascades, handled by balances_expense_delete.
+    conn.execute(f"""
+        CREATE TRIGGER balances_participant_insert_before
+        BEFORE INSERT ON expense_participants
+        BEGIN
+            {_apply_shares("-", "NEW.expense_id")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER balances_participant_insert_after
+        AFTER INSERT ON expense_participants
+        BEGIN
+            {_apply_shares("+", "NEW.expense_id")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER balances_participant_delete_before
+        BEFORE DELETE ON expense_participants
+        WHEN EXISTS (SELECT 1 FROM expenses WHERE id = OLD.expense_id)
+        BEGIN
+            {_apply_shares("-", "OLD.expense_id")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER balances_participant_delete_after
+        AFTER DELETE ON expense_participants
+        WHEN EXISTS (SELECT 1 FROM expenses WHERE id = OLD.expense_id)
+        BEGIN
+            {_apply_shares("+", "OLD.expense_id")}
+        END
+    """)
+
+    rebuild_roommate_balances(conn)
+
+
+def _add_households(conn: sqlite3.Connection):
+    """
+    Adds the household dimension.
+
+    Every roommate and expense belongs to one household; existing rows go to
+    household 1. The household_id columns carry no REFERENCES clause because
+    SQLite cannot add a foreign-key column with a non-NULL default.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS households (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO households (id, name) VALUES (1, 'Default household')")
+    conn.execute("ALTER TABLE roommates ADD COLUMN household_id INTEGER NOT NULL DEFAULT 1")
+    conn.execute("ALTER TABLE expenses ADD COLUMN household_id INTEGER NOT NULL DEFAULT 1")
+
+
+# Weighted share of one participant row in cents, matching
+# models.money.allocate_cents() with the expense ID as offset: every row gets
+# floor(amount_cents * weight / total_weight) and the leftover cents go to
+# the rows with the largest remainders, ties broken by the rotating turn of
+# the equal split. With every weight 1 this is the equal split of migration 5.
+_WEIGHTED_SHARES_VIEW = """
+    CREATE VIEW expense_shares AS
+    SELECT expense_id, roommate_id,
+           base + (ROW_NUMBER() OVER (PARTITION BY expense_id ORDER BY remainder DESC, turn)
+                   <= amount_cents - SUM(base) OVER (PARTITION BY expense_id)) AS share_cents
+    FROM (
+        SELECT expense_id, roommate_id, amount_cents,
+               amount_cents * weight / total_weight AS base,
+               amount_cents * weight % total_weight AS remainder,
+               ((k - expense_id % n) % n + n) % n AS turn
+        FROM (
+            SELECT ep.expense_id, ep.roommate_id, ep.weight, e.amount_cents,
+                   SUM(ep.weight) OVER per_expense AS total_weight,
+                   COUNT(*) OVER per_expense AS n,
+                   ROW_NUMBER() OVER (PARTITION BY ep.expense_id ORDER BY ep.roommate_id) - 1 AS k
+            FROM expense_participants ep
+            JOIN expenses e ON e.id = ep.expense_id
+            WINDOW per_expense AS (PARTITION BY ep.expense_id)
+        )
+    )
+"""
+
+
+def _add_split_weights(conn: sqlite3.Connection):
+    """
+    Adds per-participant split weights.
+
+    expenses.split_type records how the weights were entered ('equal',
+    'percent', 'shares' or 'exact'; see models.money.split_weights()) and
+    expense_participants.weight holds the integer weight itself. Shares are
+    always weight / total weight of the expense, so the balance triggers do
+    not depend on the split type. Existing rows get weight 1, which keeps
+    their equal split unchanged.
+    """
+    conn.execute("""
+        ALTER TABLE expenses ADD COLUMN split_type TEXT NOT NULL DEFAULT 'equal'
+        CHECK (split_type IN ('equal', 'percent', 'shares', 'exact'))
+    """)
+    conn.execute("""
+        ALTER TABLE expense_participants ADD COLUMN weight INTEGER NOT NULL DEFAULT 1
+        CHECK (weight > 0)
+    """)
+    conn.execute("DROP VIEW IF EXISTS expense_shares")
+    conn.execute(_WEIGHTED_SHARES_VIEW)
+
+    # A new weight re-splits the whole expense
+    conn.execute(f"""
+        CREATE TRIGGER balances_participant_weight_before
+        BEFORE UPDATE OF weight ON expense_participants
+        BEGIN
+            {_apply_shares("-", "OLD.expense_id")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER balances_participant_weight_after
+        AFTER UPDATE OF weight ON expense_participants
+        BEGIN
+            {_apply_shares("+", "NEW.expense_id")}
+        END
+    """)
+
+
+def _add_import_tracking(conn: sqlite3.Connection):
+    """
+    Adds idempotent imports: import_log and expenses.fingerprint.
+
+    import_log records the checksum of every fully imported file, so an
+    unchanged file is skipped with one indexed lookup. The fingerprint
+    identifies the CSV row an expense came from (see
+    models.fingerprint.expense_fingerprint()) and is UNIQUE per household;
+    expenses entered by hand keep a NULL fingerprint. Existing expenses are
+    fingerprinted in ID order, so re-importing the file they were loaded
+    from does not duplicate them.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS import_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            household_id INTEGER NOT NULL DEFAULT 1,
+            path TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            rows INTEGER NOT NULL,
+            inserted INTEGER NOT NULL,
+            imported_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (household_id, checksum)
+        )
+    """)
+    conn.execute("ALTER TABLE expenses ADD COLUMN fingerprint TEXT")
+
+    seen = Counter()
+    updates = []
+    for expense_id, household_id, expense_date, amount, category, note in conn.execute(
+            "SELECT id, household_id, date, amount, category, note FROM expenses ORDER BY id"):
+        key = (household_id, expense_fingerprint(expense_date, amount, category, note))
+        updates.append((expense_fingerprint(expense_date, amount, category, note, seen[key]), expense_id))
+        seen[key] += 1
+    conn.executemany("UPDATE expenses SET fingerprint = ? WHERE id = ?", updates)
+
+
+# Guard added to every balances_* trigger by migration 9. Triggers created
+# by later migrations must carry it too.
+_BALANCES_LIVE = "NOT EXISTS (SELECT 1 FROM balance_deferral)"
+
+
+def _add_balance_deferral(conn: sqlite3.Connection):
+    """
+    Lets bulk writes skip the per-row balance triggers (see deferred_balances()).
+
+    Every balances_* trigger is recreated with a WHEN clause that turns it
+    off while balance_deferral holds a row. The check is one lookup in an
+    empty table, so normal writes are unaffected.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS balance_deferral (
+            id INTEGER PRIMARY KEY CHECK (id = 1)
+        )
+    """)
+    triggers = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'balances\\_%' ESCAPE '\\'"
+    ).fetchall()
+    for name, sql in triggers:
+        head, begin, body = sql.partition("BEGIN")
+        guard = f"AND {_BALANCES_LIVE}" if "WHEN" in head else f"WHEN {_BALANCES_LIVE}"
+        conn.execute(f"DROP TRIGGER {name}")
+        conn.execute(f"{head.rstrip()}\n        {guard}\n        {begin}{body}")
+
+
+def _add_new_expense_balances(conn: sqlite3.Connection, since: int):
+    """
+    Adds the expenses with an id above `since` to roommate_balances.
+
+    Set-based counterpart of the insert triggers: one grouped pass over
+    the new expenses and their shares, O(new rows) rather than the
+    O(all expenses) of rebuild_roommate_balances().
+    """
+    conn.execute("INSERT OR IGNORE INTO roommate_balances (roommate_id) SELECT id FROM roommates")
+    conn.executemany(
+        "UPDATE roommate_balances SET paid_cents = paid_cents + ? WHERE roommate_id = ?",
+        [(cents, payer_id) for payer_id, cents in conn.execute("""
+            SELECT payer_id, SUM(amount_cents) FROM expenses
+            WHERE id > ? AND payer_id IS NOT NULL
+            GROUP BY payer_id
+        """, (since,))])
+    conn.executemany(
+        "UPDATE roommate_balances SET owed_cents = owed_cents + ? WHERE roommate_id = ?",
+        [(cents, roommate_id) for roommate_id, cents in conn.execute("""
+            SELECT roommate_id, SUM(share_cents) FROM expense_shares
+            WHERE expense_id > ?
+            GROUP BY roommate_id
+        """, (since,))])
+
+
+def _max_expense_id(conn: sqlite3.Connection) -> int:
+    """Returns the highest expense id so far (ids are AUTOINCREMENT, never reused)."""
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM expenses").fetchone()[0]
+
+
+@contextmanager
+def deferred_balances(conn: sqlite3.Connection, inserts_only: bool = False):
+    """
+    Turns the balance triggers off for a bulk write, then catches up once.
+
+    The per-row triggers re-split an expense on every participant row
+    written, which dominates writes that touch most expenses. Inside this
+    block they are skipped, and roommate_balances is recomputed with
+    rebuild_roommate_balances() at the end (O(all expenses)). With
+    inserts_only=True the block promises to only add expenses and
+    participants of those new expenses, so only the new rows are added
+    to the balances instead (O(new rows)). The flag row lives in the
+    caller's transaction, so other connections never see it and a
+    rollback clears it. Nested blocks catch up only once, at the end of
+    the outermost one, which decides between the two modes.
+
+    Args:
+        conn (sqlite3.Connection): Connection inside an open transaction
+        inserts_only (bool): Whether the block only inserts new expenses
+
+    Yields:
+        sqlite3.Connection: The same connection
+    """
+    outermost = conn.execute("INSERT OR IGNORE INTO balance_deferral (id) VALUES (1)").rowcount == 1
+    since = _max_expense_id(conn) if outermost and inserts_only else None
+    try:
+        yield conn
+    finally:
+        # Also on errors: a caller that catches the exception and commits
+        # must not leave the triggers off or the balances stale
+        if outermost:
+            if since is None:
+                rebuild_roommate_balances(conn)
+            else:
+                _add_new_expense_balances(conn, since)
+            conn.execute("DELETE FROM balance_deferral")
+
+
+def _has_search_index(conn: sqlite3.Connection) -> bool:
+    """Returns True if the expenses_fts table was created (FTS5 available)."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'expenses_fts'"
+    ).fetchone() is not None
+
+
+def _add_search_deferral(conn: sqlite3.Connection):
+    """
+    Lets bulk inserts skip the per-row search index trigger (see
+    deferred_search_index()).
+
+    Only expenses_fts_insert gets the guard: updates and deletes during an
+    import are rare, and their triggers must keep running so the index
+    never holds stale text.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_deferral (
+            id INTEGER PRIMARY KEY CHECK (id = 1)
+        )
+    """)
+    if not _has_search_index(conn):
+        return
+    conn.execute("DROP TRIGGER IF EXISTS expenses_fts_insert")
+    conn.execute("""
+        CREATE TRIGGER expenses_fts_insert AFTER INSERT ON expenses
+        WHEN NOT EXISTS (SELECT 1 FROM search_deferral)
+        BEGIN
+            INSERT INTO expenses_fts (rowid, note, category, account, payer_name)
+            VALUES (NEW.id, NEW.note, NEW.category, NEW.account,
+                    (SELECT name FROM roommates WHERE id = NEW.payer_id));
+        END
+    """)
+
+
+@contextmanager
+def deferred_search_index(conn: sqlite3.Connection):
+    """
+    Turns the search index insert trigger off for a bulk insert, then
+    indexes the new expenses in one statement.
+
+    expenses_fts stores its own copy of the text (it is not an
+    external-content table), so the FTS5 'rebuild' command would only
+    re-index what it already holds. Instead, every expense with an id above
+    the highest one at the start of the block that the index does not yet
+    have is inserted with a single INSERT ... SELECT at the end. Like
+    deferred_balances(), the flag lives in the caller's transaction and
+    nested blocks index only once, at the end of the outermost one. Does
+    nothing if FTS5 is unavailable.
+
+    Args:
+        conn (sqlite3.Connection): Connection inside an open transaction
+
+    Yields:
+        sqlite3.Connection: The same connection
+    """
+    if not _has_search_index(conn):
+        yield conn
+        return
+    outermost = conn.execute("INSERT OR IGNORE INTO search_deferral (id) VALUES (1)").rowcount == 1
+    since = _max_expense_id(conn)
+    try:
+        yield conn
+    finally:
+        if outermost:
+            conn.execute("""
+                INSERT INTO expenses_fts (rowid, note, category, account, payer_name)
+                SELECT e.id, e.note, e.category, e.account, r.name
+                FROM expenses e
+                LEFT JOIN roommates r ON e.payer_id = r.id
+                WHERE e.id > ?
+                  AND e.id NOT IN (SELECT rowid FROM expenses_fts WHERE rowid > ?)
+            """, (since, since))
+            conn.execute("DELETE FROM search_deferral")
+
+
+MIGRATIONS = [
+    (1, "Index the hot expense query paths", [
+        # get_all_expenses orders by date
+        "CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date)",
+        # get_expenses_by_roommate filters on payer_id
+        "CREATE INDEX IF NOT EXISTS idx_expenses_payer_id ON expenses(payer_id)",
+        # get_expense_by_category filters on category
+        "CREATE INDEX IF NOT EXISTS idx_expenses_category ON expenses(category)",
+        # Participant lookups by roommate (expense_id is covered by the UNIQUE index)
+        "CREATE INDEX IF NOT EXISTS idx_expense_participants_roommate_id "
+        "ON expense_participants(roommate_id)",
+    ]),
+    (2, "Collect query planner statistics", [
+        "ANALYZE",
+    ]),
+    (3, "Add full-text search index over expenses", [
+        _create_expense_search_index,
+    ]),
+    (4, "Add trigger-maintained roommate balances", [
+        _create_roommate_balances,
+    ]),
+    (5, "Keep amounts and balances in integer cents", [
+        _convert_balances_to_cents,
+    ]),
+    (6, "Add households", [
+        _add_households,
+        "CREATE INDEX IF NOT EXISTS idx_roommates_household ON roommates(household_id)",
+        # Per-household history in date order, and per-household payer totals
+        "CREATE INDEX IF NOT EXISTS idx_expenses_household_date ON expenses(household_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_expenses_household_payer "
+        "ON expenses(household_id, payer_id, amount)",
+        # Only imported expenses still waiting for a payer
+        "CREATE INDEX IF NOT EXISTS idx_expenses_unpaid ON expenses(household_id) "
+        "WHERE payer_id IS NULL",
+    ]),
+    (7, "Add weighted and custom splits", [
+        _add_split_weights,
+    ]),
+    (8, "Make CSV imports idempotent", [
+        _add_import_tracking,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_expenses_fingerprint "
+        "ON expenses(household_id, fingerprint) WHERE fingerprint IS NOT NULL",
+    ]),
+    (9, "Allow deferred balance maintenance for bulk writes", [
+        _add_balance_deferral,
+    ]),
+    (10, "Add app metadata", [
+        """
+        CREATE TABLE IF NOT EXISTS app_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID
+        """,
+        # Databases that already have participants were seeded by an
+        # earlier start; seeding them again would overwrite real data
+        """
+        INSERT OR IGNORE INTO app_meta (key, value)
+        SELECT 'seeded', datetime('now')
+        WHERE EXISTS (SELECT 1 FROM expense_participants)
+        """,
+    ]),
+    (11, "Allow deferred search indexing for bulk imports", [
+        _add_search_deferral,
+    ]),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    Returns the schema version recorded in the database file.
+
+    Args:
+        conn (sqlite3.Connection): An open database connection
+
+    Returns:
+        int: The current PRAGMA user_version (0 for a fresh database)
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Applies every pending migration in version order.
+
+    Each migration runs in its own transaction together with the
+    user_version bump, so a failed migration leaves the database at the
+    previous version and is retried on the next start.
+
+    Args:
+        conn (sqlite3.Connection): An open connection with no active transaction
+
+    Returns:
+        int: The schema version after all migrations have run
+    """
+    current = get_schema_version(conn)
+
+    for version, description, steps in MIGRATIONS:
+        if version <= current:
+            continue
+
+        conn.execute("BEGIN")
+        try:
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            # PRAGMA does not accept bound parameters; version is an int literal
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        print(f"Applied migration {version}: {description}")
+        current = version
+
+    return current
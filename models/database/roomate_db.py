@@ -1,12 +1,19 @@
 # models/database/roommate_db.py
-from models.database.db_connection import get_connection
+from models.database.db_connection import connection, transaction, chunked
+from models.database.events import publish
+from models.database.expense_db import set_participants_bulk
+from models.database.instrumentation import instrumented
+from models.database.migrations import deferred_balances, rebuild_roommate_balances as _rebuild_roommate_balances
+from models.money import from_cents
 import random
+from contextlib import contextmanager
 
 # -----------------------------
 # Roommate CRUD Operations
 # -----------------------------
 
-def add_roommate(name: str, email: str = "", join_date: str = None) -> None:
+@instrumented()
+def add_roommate(name: str, email: str = "", join_date: str = None, household_id: int = 1) -> None:
     """
     Creates a new roommate record in the database.
     
@@ -14,37 +21,74 @@ def add_roommate(name: str, email: str = "", join_date: str = None) -> None:
         name (str): Full name of the roommate (required)
         email (str, optional): Email address of the roommate. Defaults to empty string.
         join_date (str, optional): Join date in 'YYYY-MM-DD' format. Defaults to None.
+        household_id (int, optional): Household the roommate lives in. Defaults to 1.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    cur.execute(
-        "INSERT INTO roommates (name, email, join_date) VALUES (?, ?, ?)",
-        (name, email, join_date)
-    )
-    
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(
+            "INSERT INTO roommates (name, email, join_date, household_id) VALUES (?, ?, ?, ?)",
+            (name, email, join_date, household_id)
+        )
+        publish()
 
 
-def get_all_roommates() -> list:
+@instrumented()
+def get_all_roommates(household_id: int = None) -> list:
     """
     Retrieves all roommate records from the database.
     
+    Args:
+        household_id (int, optional): Only return this household's roommates.
+                                      Defaults to every household.
+
     Returns:
         list: List of roommate tuples ordered by ID.
               Each tuple: (id, name, email, join_date)
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    cur.execute("SELECT id, name, email, join_date FROM roommates")
-    results = cur.fetchall()
-    
-    conn.close()
-    return results
+    with connection() as conn:
+        if household_id is None:
+            cur = conn.execute("SELECT id, name, email, join_date FROM roommates")
+        else:
+            cur = conn.execute(
+                "SELECT id, name, email, join_date FROM roommates WHERE household_id = ? ORDER BY id",
+                (household_id,)
+            )
+        return cur.fetchall()
+
+
+@instrumented()
+def get_roommate_ids_by_household() -> dict:
+    """
+    Retrieves the roommate IDs of every household.
+
+    Returns:
+        dict: Mapping of household ID to its roommate IDs in ID order
+              (households without roommates are absent)
+    """
+    with connection() as conn:
+        households = {}
+        for rm_id, household_id in conn.execute("SELECT id, household_id FROM roommates ORDER BY id"):
+            households.setdefault(household_id, []).append(rm_id)
+        return households
+
+
+@instrumented()
+def count_roommates(household_id: int = None) -> int:
+    """
+    Counts roommates without fetching them.
+
+    Args:
+        household_id (int, optional): Only count this household's roommates.
+                                      Defaults to every household.
+
+    Returns:
+        int: Number of roommates
+    """
+    where, params = ("WHERE household_id = ?", (household_id,)) if household_id is not None else ("", ())
+    with connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM roommates {where}", params).fetchone()[0]
 
 
+@instrumented()
 def get_roommate_by_id(roommate_id: int) -> tuple:
     """
     Retrieves a single roommate record by ID.
@@ -55,19 +99,15 @@ def get_roommate_by_id(roommate_id: int) -> tuple:
     Returns:
         tuple: Roommate record as (id, name, email), or None if not found
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    cur.execute(
-        "SELECT id, name, email FROM roommates WHERE id = ?",
-        (roommate_id,)
-    )
-    
-    result = cur.fetchone()
-    conn.close()
-    return result
+    with connection() as conn:
+        cur = conn.execute(
+            "SELECT id, name, email FROM roommates WHERE id = ?",
+            (roommate_id,)
+        )
+        return cur.fetchone()
 
 
+@instrumented()
 def update_roommate(roommate_id: int, name: str = None, email: str = None, 
                     join_date: str = None) -> None:
     """
@@ -82,9 +122,6 @@ def update_roommate(roommate_id: int, name: str = None, email: str = None,
         email (str, optional): New email address
         join_date (str, optional): New join date in 'YYYY-MM-DD' format
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
     # Build dynamic update query based on provided parameters
     fields = []
     values = []
@@ -103,18 +140,18 @@ def update_roommate(roommate_id: int, name: str = None, email: str = None,
 
     # Exit early if no fields to update
     if not fields:
-        conn.close()
         return
 
     # Build and execute the dynamic SQL query
     sql = f"UPDATE roommates SET {', '.join(fields)} WHERE id = ?"
     values.append(roommate_id)
 
-    cur.execute(sql, tuple(values))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(sql, tuple(values))
+        publish()
 
 
+@instrumented()
 def delete_roommate(roommate_id: int) -> None:
     """
     Deletes a roommate record from the database.
@@ -126,53 +163,185 @@ def delete_roommate(roommate_id: int) -> None:
     Args:
         roommate_id (int): The ID of the roommate to delete
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    cur.execute("DELETE FROM roommates WHERE id = ?", (roommate_id,))
-    
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM roommates WHERE id = ?", (roommate_id,))
+        publish()
+
+
+# -----------------------------
+# Balance Operations
+# -----------------------------
+
+@instrumented()
+def get_roommate_balances() -> list:
+    """
+    Retrieves the stored running balance of every roommate.
+
+    The roommate_balances table is kept current by database triggers on
+    expenses and expense_participants, so this costs O(roommates) no matter
+    how many expenses exist.
+
+    Balances are stored as integer cents, so the nets of all roommates add up
+    to exactly zero whenever every expense has participants.
+
+    Returns:
+        list: List of tuples (roommate_id, name, paid_total, owed_total, net)
+              in dollars. Positive net = is owed money, negative net = owes money.
+    """
+    with connection() as conn:
+        cur = conn.execute("""
+            SELECT r.id, r.name, b.paid_cents, b.owed_cents, b.net_cents
+            FROM roommates r
+            JOIN roommate_balances b ON b.roommate_id = r.id
+            ORDER BY r.id
+        """)
+        return [(rm_id, name, from_cents(paid), from_cents(owed), from_cents(net))
+                for rm_id, name, paid, owed, net in cur]
+
+
+@instrumented()
+def rebuild_roommate_balances() -> None:
+    """
+    Recomputes the stored balances from scratch.
+
+    Only needed to repair the table (e.g. after editing the database by hand);
+    normal writes keep it current through triggers.
+    """
+    with transaction() as conn:
+        _rebuild_roommate_balances(conn)
 
 
 # -----------------------------
 # Random Assignment Operations
 # -----------------------------
 
-def assign_random_payer(expense_ids: list) -> None:
+# A bulk assignment touching at least 1/BULK_REBUILD_RATIO of all expenses
+# skips the per-row balance triggers and rebuilds the balances once instead:
+# the rebuild costs about a tenth of the triggers per expense
+BULK_REBUILD_RATIO = 8
+
+
+@contextmanager
+def _bulk_write(conn, count: int):
+    """Defers the balance triggers if `count` expenses is a large share of the table."""
+    total = conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+    if count and count * BULK_REBUILD_RATIO >= total:
+        with deferred_balances(conn):
+            yield
+    else:
+        yield
+
+
+def _expense_rows(conn, expense_ids: list) -> dict:
+    """Returns {expense_id: (payer_id, household_id)} for the expenses that exist."""
+    rows = {}
+    for chunk in chunked(list(dict.fromkeys(expense_ids))):
+        placeholders = ", ".join("?" * len(chunk))
+        for expense_id, payer_id, household_id in conn.execute(
+                f"SELECT id, payer_id, household_id FROM expenses WHERE id IN ({placeholders})", chunk):
+            rows[expense_id] = (payer_id, household_id)
+    return rows
+
+
+def random_payers(expenses: list, households: dict, rng: random.Random) -> list:
+    """
+    Draws a random payer for each expense from its own household.
+
+    Args:
+        expenses (list): (expense_id, household_id) pairs, in draw order
+        households (dict): Mapping of household ID to its roommate IDs
+        rng (random.Random): Source of randomness
+
+    Returns:
+        list: (payer_id, expense_id) pairs, ready for executemany; expenses
+              of a household without roommates are left out
+    """
+    assignments = []
+    for expense_id, household_id in expenses:
+        candidates = households.get(household_id)
+        if candidates:
+            assignments.append((candidates[rng.randrange(len(candidates))], expense_id))
+    return assignments
+
+
+def random_participants(expenses: list, households: dict, rng: random.Random) -> dict:
+    """
+    Draws random participants for each expense, always including the payer.
+
+    Every expense gets 1 to len(household) participants: the payer plus a
+    random sample of the other roommates of its household. The sample is
+    drawn as positions that skip the payer's own position, so no per-expense
+    list of "other roommates" is built.
+
+    Args:
+        expenses (list): (expense_id, payer_id, household_id) triples, in draw order
+        households (dict): Mapping of household ID to its roommate IDs
+        rng (random.Random): Source of randomness
+
+    Returns:
+        dict: Mapping of expense ID to its participant IDs (payer first);
+              expenses without a payer are left out
+    """
+    positions = {household_id: {rm_id: i for i, rm_id in enumerate(ids)}
+                 for household_id, ids in households.items()}
+    assignments = {}
+    for expense_id, payer_id, household_id in expenses:
+        if not payer_id:
+            continue
+        roommates = households.get(household_id, [])
+        payer_position = positions.get(household_id, {}).get(payer_id)
+        others = len(roommates) - (payer_position is not None)
+
+        additional = min(rng.randint(1, max(1, len(roommates))) - 1, others)
+        picks = rng.sample(range(others), additional) if additional > 0 else []
+        if payer_position is not None:
+            picks = [i + (i >= payer_position) for i in picks]
+        assignments[expense_id] = [payer_id] + [roommates[i] for i in picks]
+    return assignments
+
+
+@instrumented()
+def assign_random_payer(expense_ids: list, seed=None) -> None:
     """
     Assigns a random roommate as the payer for each specified expense.
     
     This is typically used during database initialization to assign payers
-    to imported expenses that don't have payer information.
+    to imported expenses that don't have payer information. Payers are only
+    picked from the expense's own household; expenses of a household without
+    roommates are skipped.
+
+    All payers are drawn in memory first and then written with one
+    executemany in a single transaction; the expenses are read with chunked
+    IN queries. Large batches rebuild the balances once instead of running
+    the balance triggers per row (see BULK_REBUILD_RATIO). The same seed and
+    expense IDs always give the same payers.
     
     Args:
         expense_ids (list): List of expense IDs to assign random payers to
+        seed (optional): Seed for random.Random. Defaults to None (unseeded).
     
     Raises:
         ValueError: If there are no roommates in the database to assign
     """
-    roommates = get_all_roommates()
-    if not roommates:
+    households = get_roommate_ids_by_household()
+    if not households:
         raise ValueError("No roommates in database to assign.")
+    rng = random.Random(seed)
 
-    conn = get_connection()
-    cur = conn.cursor()
-
-    for expense_id in expense_ids:
-        # Select a random roommate ID from all available roommates
-        random_roommate_id = random.choice(roommates)[0]
-        
-        cur.execute(
-            "UPDATE expenses SET payer_id = ? WHERE id = ?",
-            (random_roommate_id, expense_id)
+    with transaction() as conn:
+        rows = _expense_rows(conn, expense_ids)
+        assignments = random_payers(
+            [(expense_id, rows[expense_id][1]) for expense_id in dict.fromkeys(expense_ids)
+             if expense_id in rows],
+            households, rng
         )
-
-    conn.commit()
-    conn.close()
+        with _bulk_write(conn, len(assignments)):
+            conn.executemany("UPDATE expenses SET payer_id = ? WHERE id = ?", assignments)
+        publish(expense_id for _, expense_id in assignments)
 
 
-def assign_random_participants(expense_ids: list) -> None:
+@instrumented()
+def assign_random_participants(expense_ids: list, seed=None) -> None:
     """
     Assigns random participants to each expense, ensuring the payer is always included.
     
@@ -180,53 +349,34 @@ def assign_random_participants(expense_ids: list) -> None:
     1. Always including the expense payer as a participant
     2. Randomly selecting 0 to (total_roommates - 1) additional participants
     3. Ensuring no duplicate participants
+
+    All participant lists are drawn in memory first (see
+    random_participants()) and then written with set_participants_bulk():
+    chunked DELETEs and one executemany in a single transaction, with the
+    balances rebuilt once for large batches. Expenses without a payer are
+    skipped. The same seed and expense IDs always give
+    the same participants.
     
     Args:
         expense_ids (list): List of expense IDs to assign random participants to
+        seed (optional): Seed for random.Random. Defaults to None (unseeded).
     
     Raises:
         ValueError: If there are no roommates in the database to assign
     """
-    roommates = get_all_roommates()
-    if not roommates:
+    households = get_roommate_ids_by_household()
+    if not households:
         raise ValueError("No roommates in database to assign.")
-    
-    conn = get_connection()
-    cur = conn.cursor()
-
-    for expense_id in expense_ids:
-        # Get the current payer for this expense
-        cur.execute("SELECT payer_id FROM expenses WHERE id = ?", (expense_id,))
-        result = cur.fetchone()
-        payer_id = result[0] if result else None
-        
-        # Skip expenses without a payer assigned
-        if not payer_id:
-            continue
-            
-        # Determine how many total participants (1 to all roommates)
-        num_participants = random.randint(1, len(roommates))
-        
-        # Start participant list with the payer (always included)
-        participant_ids = [payer_id]
-        
-        # Add additional random participants if needed
-        other_roommates = [rm for rm in roommates if rm[0] != payer_id]
-        if other_roommates and num_participants > 1:
-            # Calculate how many additional participants to add
-            additional_count = min(num_participants - 1, len(other_roommates))
-            additional_participants = random.sample(other_roommates, additional_count)
-            participant_ids.extend([rm[0] for rm in additional_participants])
-        
-        # Clear existing participants and add the new random set
-        cur.execute("DELETE FROM expense_participants WHERE expense_id = ?", (expense_id,))
-        
-        for participant_id in participant_ids:
-            cur.execute(
-                "INSERT OR IGNORE INTO expense_participants (expense_id, roommate_id) VALUES (?, ?)",
-                (expense_id, participant_id)
-            )
+    rng = random.Random(seed)
+
+    with transaction() as conn:
+        rows = _expense_rows(conn, expense_ids)
+        assignments = random_participants(
+            [(expense_id,) + rows[expense_id] for expense_id in dict.fromkeys(expense_ids)
+             if expense_id in rows],
+            households, rng
+        )
+        with _bulk_write(conn, len(assignments)):
+            set_participants_bulk(assignments)
 
-    conn.commit()
-    conn.close()
-    print(f"Assigned random participants to {len(expense_ids)} expenses (payers always included)")
+    print(f"Assigned random participants to {len(assignments)} expenses (payers always included)")
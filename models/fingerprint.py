@@ -0,0 +1,56 @@
+# models/fingerprint.py
+import hashlib
+
+from models.money import to_cents
+
+# Imported expenses carry a fingerprint of the CSV row they came from, kept
+# UNIQUE per household in the database. Importing the same row twice is then
+# a no-op (INSERT OR IGNORE), so re-running an import, or importing a file
+# that has grown since, only adds the rows that are new.
+
+# Bytes read at a time when checksumming a file
+_READ_SIZE = 1 << 20
+
+
+def expense_fingerprint(expense_date: str, amount, category: str, note: str, occurrence: int = 0) -> str:
+    """
+    Returns the fingerprint of one imported expense row.
+
+    Amounts are compared in cents and text is stripped, so '12.5' and
+    '12.50 ' give the same fingerprint. Identical rows within one file (two
+    equal coffees on the same day) are told apart by their occurrence number.
+
+    Args:
+        expense_date (str): Date in 'YYYY-MM-DD' format
+        amount (float | str): Amount in dollars
+        category (str): Expense category
+        note (str): Expense note
+        occurrence (int, optional): How many identical rows came before
+                                    this one in the same file. Defaults to 0.
+
+    Returns:
+        str: 32 hex digits
+    """
+    key = "\x1f".join((expense_date.strip(), str(to_cents(amount)), (category or "").strip(),
+                       (note or "").strip(), str(occurrence)))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def file_checksum(path: str) -> str:
+    """
+    Returns the SHA-256 checksum of a file's contents.
+
+    Args:
+        path (str): Path of the file
+
+    Returns:
+        str: 64 hex digits
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,468 @@
+# models/ledger.py
+import os
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+
+from models.database import events
+from models.database.expense_db import get_ledger_entries
+from models.database.roomate_db import get_roommate_balances, get_roommate_ids_by_household
+from models.money import to_cents, split_cents, allocate_cents
+
+# ROOMIESPLIT_VERIFY_LEDGER=1 cross-checks the ledger after every update
+VERIFY_UPDATES = bool(os.environ.get("ROOMIESPLIT_VERIFY_LEDGER"))
+
+
+def date_ordinal(value) -> int:
+    """
+    Converts a 'YYYY-MM-DD' date (string or date) to its proleptic ordinal.
+
+    Args:
+        value: Date string or datetime.date
+
+    Returns:
+        int: date.toordinal(), or 0 for dates that cannot be parsed (they
+             sort before every real date)
+    """
+    if isinstance(value, date):
+        return value.toordinal()
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return 0
+
+
+class BalanceLedger:
+    """
+    In-memory running totals for the report screens.
+
+    The ledger loads every expense once and afterwards applies only the
+    difference caused by each committed write, as announced by the DAO through
+    models.database.events. Updating one expense costs O(participants), or
+    O(household roommates) for an expense without participants, independent
+    of the number of expenses, so reports can read the totals instantly.
+
+    All amounts are kept in integer cents and follow the owed rule of
+    calculator.compute_balance_vectors(), so the ledger and the in-memory
+    report paths agree:
+    - owed (fair share): an expense with participants is split among them
+      by their split weights with allocate_cents(), the rule the database
+      triggers use; one without participants is split equally among all
+      roommates of its household
+    - net balance: paid minus owed
+    - contribution: total paid
+    - total: per household, so reports on one household only count its own
+
+    roommate_balances leaves expenses without participants out, so verify()
+    compares it against the net balance without those shares.
+
+    Date-limited reads (start_date/end_date) use a prefix-sum index: one row
+    of per-roommate paid/owed cents and per-household totals per expense
+    date, plus cumulative rows in date order. A range then costs two bisects over the date
+    ordinals and one vector subtraction. The index is built on the first
+    date-limited read; afterwards each write updates its day's row and only
+    invalidates the cumulative rows from that date onward, which are
+    recomputed on the next read.
+    """
+
+    def __init__(self, verify_updates: bool = None):
+        """
+        Initializes an empty ledger; data is loaded on first use.
+
+        Args:
+            verify_updates (bool, optional): Run verify() after every update.
+                                             Defaults to ROOMIESPLIT_VERIFY_LEDGER.
+        """
+        self.verify_updates = VERIFY_UPDATES if verify_updates is None else verify_updates
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    # -----------------------------
+    # Loading and Updates
+    # -----------------------------
+
+    def load(self):
+        """Reads all roommates and expenses and rebuilds every total."""
+        households = get_roommate_ids_by_household()
+        entries = get_ledger_entries()
+
+        with self._lock:
+            # Roommates of each household in ID order: the order in which an
+            # expense without participants is split (see compute_balance_vectors)
+            self._members = households
+            self._household_of = {rm_id: h for h, ids in households.items() for rm_id in ids}
+            self._order = sorted(self._household_of)
+            self._households = sorted(set(households) | {entry[6] for entry in entries.values()})
+            self._entries = {}
+            self._total = {household_id: 0 for household_id in self._households}
+            self._paid = {rm_id: 0 for rm_id in self._order}
+            self._owed = {rm_id: 0 for rm_id in self._order}
+            # Part of owed from expenses without participants (not in roommate_balances)
+            self._shared = {rm_id: 0 for rm_id in self._order}
+            # {payer_id: {category: [cents, expense_count]}}
+            self._budgets = {rm_id: {} for rm_id in self._order}
+            self._column = {rm_id: i for i, rm_id in enumerate(self._order)}
+            self._total_column = {h: 2 * len(self._order) + i for i, h in enumerate(self._households)}
+            # Prefix-sum index, built on the first date-limited read
+            self._days = None
+            for expense_id, entry in entries.items():
+                self._apply(expense_id, entry, 1)
+                self._entries[expense_id] = entry
+            self._loaded = True
+
+    def invalidate(self):
+        """Forgets all totals; the next read reloads them."""
+        with self._lock:
+            self._loaded = False
+
+    def on_expenses_changed(self, expense_ids):
+        """
+        Applies committed changes (subscriber for models.database.events).
+
+        Args:
+            expense_ids (frozenset | None): Changed expense IDs, or None to
+                                            reload everything on next use
+        """
+        if expense_ids is None:
+            self.invalidate()
+            return
+
+        with self._lock:
+            if not self._loaded:
+                return
+            fresh = get_ledger_entries(list(expense_ids))
+            if any(entry[6] not in self._total for entry in fresh.values()):
+                # An expense of a household the ledger has no column for
+                self._loaded = False
+                return
+            for expense_id in expense_ids:
+                old = self._entries.pop(expense_id, None)
+                new = fresh.get(expense_id)
+                if old is not None:
+                    self._apply(expense_id, old, -1)
+                if new is not None:
+                    self._apply(expense_id, new, 1)
+                    self._entries[expense_id] = new
+
+            if self.verify_updates:
+                problems = self.verify()
+                if problems:
+                    print(f"BalanceLedger drifted ({len(problems)} differences); reloading")
+                    for problem in problems[:10]:
+                        print(f"  {problem}")
+                    self._loaded = False
+
+    def _apply(self, expense_id: int, entry: tuple, sign: int, totals: bool = True):
+        """
+        Adds (sign=1) or removes (sign=-1) one expense from the totals.
+
+        Args:
+            expense_id (int): The expense ID (rotates the leftover cents)
+            entry (tuple): (category, amount_cents, payer_id, participant_ids,
+                            participant_weights, date, household_id)
+            sign (int): 1 to add, -1 to remove
+            totals (bool, optional): Update the all-time totals. False only
+                                     feeds the date index. Defaults to True.
+        """
+        category, cents, payer_id, participant_ids, participant_weights, expense_date, household_id = entry
+        n = len(self._order)
+        # Day row of the date index: [paid x n, owed x n, total per household]
+        row = self._day_row(expense_date) if self._days is not None else None
+        if totals:
+            self._total[household_id] += sign * cents
+        if row is not None:
+            row[self._total_column[household_id]] += sign * cents
+
+        if payer_id in self._paid:
+            if totals:
+                self._paid[payer_id] += sign * cents
+                slot = self._budgets[payer_id].setdefault(category, [0, 0])
+                slot[0] += sign * cents
+                slot[1] += sign
+                if slot[1] == 0:
+                    del self._budgets[payer_id][category]
+            if row is not None:
+                row[self._column[payer_id]] += sign * cents
+
+        # Participants outside the expense's household are ignored, like
+        # roommates missing from the list given to compute_balance_vectors()
+        household = self._members.get(household_id, [])
+        weight_of = {}
+        for rm_id, weight in zip(participant_ids, participant_weights):
+            if self._household_of.get(rm_id) == household_id:
+                weight_of.setdefault(rm_id, weight)
+        if weight_of:
+            members = sorted(weight_of)
+            shares = allocate_cents(cents, [weight_of[rm_id] for rm_id in members], expense_id)
+        else:
+            members = household
+            shares = split_cents(cents, len(members), expense_id) if members else []
+
+        for rm_id, share in zip(members, shares):
+            if totals:
+                self._owed[rm_id] += sign * share
+                if not weight_of:
+                    self._shared[rm_id] += sign * share
+            if row is not None:
+                row[n + self._column[rm_id]] += sign * share
+
+    # -----------------------------
+    # Date Index
+    # -----------------------------
+
+    def _day_row(self, expense_date) -> list:
+        """
+        Returns the index row of one date (creating it if needed) and marks
+        the cumulative rows from that date onward as stale.
+        """
+        ordinal = date_ordinal(expense_date)
+        row = self._day_rows.get(ordinal)
+        if row is None:
+            row = self._day_rows[ordinal] = [0] * (2 * len(self._order) + len(self._households))
+            insort(self._days, ordinal)
+        position = bisect_left(self._days, ordinal)
+        if position < self._prefix_valid:
+            self._prefix_valid = position
+        return row
+
+    def _ensure_index(self):
+        """Builds the date index on first use and refreshes stale prefix rows."""
+        self._ensure_loaded()
+        if self._days is None:
+            self._days = []
+            self._day_rows = {}
+            self._prefix = [[0] * (2 * len(self._order) + len(self._households))]
+            self._prefix_valid = 0
+            for expense_id, entry in self._entries.items():
+                self._apply(expense_id, entry, 1, totals=False)
+
+        if self._prefix_valid < len(self._days):
+            # Recompute the cumulative rows after the earliest changed date
+            del self._prefix[self._prefix_valid + 1:]
+            for ordinal in self._days[self._prefix_valid:]:
+                self._prefix.append([a + b for a, b in zip(self._prefix[-1], self._day_rows[ordinal])])
+            self._prefix_valid = len(self._days)
+
+    def _range(self, start_date=None, end_date=None) -> list:
+        """
+        Returns the summed index row for start_date <= date <= end_date.
+
+        Args:
+            start_date (optional): First date included. Defaults to the beginning.
+            end_date (optional): Last date included. Defaults to the end.
+
+        Returns:
+            list: [paid x n, owed x n, total per household] in cents, roommate
+                  columns in roommate ID order, households in ID order
+        """
+        self._ensure_index()
+        low = bisect_left(self._days, date_ordinal(start_date)) if start_date else 0
+        high = bisect_right(self._days, date_ordinal(end_date)) if end_date else len(self._days)
+        if high <= low:
+            return [0] * len(self._prefix[0])
+        return [b - a for a, b in zip(self._prefix[low], self._prefix[high])]
+
+    def _column_values(self, start_date, end_date, block: int) -> dict:
+        """Returns one block (0 paid, 1 owed) of a range as {roommate_id: cents}."""
+        n = len(self._order)
+        values = self._range(start_date, end_date)[block * n:(block + 1) * n]
+        return dict(zip(self._order, values))
+
+    def _ensure_loaded(self):
+        """Loads the ledger if it has not been loaded or was invalidated."""
+        if not self._loaded:
+            self.load()
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+
+    # Every read takes an optional date range. Both bounds are inclusive
+    # 'YYYY-MM-DD' strings (or dates); balances "as of" a date are the range
+    # (None, as_of). Without a range the all-time totals are returned directly.
+
+    def net_balances(self, start_date=None, end_date=None) -> dict:
+        """
+        Returns every roommate's net balance.
+
+        Args:
+            start_date (optional): Only count expenses on or after this date
+            end_date (optional): Only count expenses on or before this date
+
+        Returns:
+            dict: Mapping of roommate ID to net balance in cents.
+                  Positive = is owed money, negative = owes money.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if start_date or end_date:
+                paid = self._column_values(start_date, end_date, 0)
+                owed = self._column_values(start_date, end_date, 1)
+            else:
+                paid, owed = self._paid, self._owed
+            return {rm_id: paid[rm_id] - owed[rm_id] for rm_id in self._order}
+
+    def contributions(self, start_date=None, end_date=None) -> dict:
+        """
+        Returns the total each roommate has paid.
+
+        Args:
+            start_date (optional): Only count expenses on or after this date
+            end_date (optional): Only count expenses on or before this date
+
+        Returns:
+            dict: Mapping of roommate ID to amount paid in cents
+        """
+        with self._lock:
+            self._ensure_loaded()
+            paid = self._column_values(start_date, end_date, 0) if start_date or end_date else self._paid
+            return {rm_id: paid[rm_id] for rm_id in self._order}
+
+    def fair_shares(self, start_date=None, end_date=None) -> dict:
+        """
+        Returns what each roommate owes for the expenses they share.
+
+        Expenses with participants count for those participants (by split
+        weight); expenses without participants are shared by the whole
+        household. Same figures as aggregate_expenses()["fair_shares"].
+
+        Args:
+            start_date (optional): Only count expenses on or after this date
+            end_date (optional): Only count expenses on or before this date
+
+        Returns:
+            dict: Mapping of roommate ID to fair share in cents
+        """
+        with self._lock:
+            self._ensure_loaded()
+            owed = self._column_values(start_date, end_date, 1) if start_date or end_date else self._owed
+            return {rm_id: owed[rm_id] for rm_id in self._order}
+
+    def total_expenses(self, start_date=None, end_date=None, household_id: int = None) -> int:
+        """
+        Returns the sum of all expenses.
+
+        Args:
+            start_date (optional): Only count expenses on or after this date
+            end_date (optional): Only count expenses on or before this date
+            household_id (int, optional): Only count this household's expenses.
+                                          Defaults to every household.
+
+        Returns:
+            int: Total in cents
+        """
+        with self._lock:
+            self._ensure_loaded()
+            households = self._households if household_id is None else [household_id]
+            if start_date or end_date:
+                row = self._range(start_date, end_date)
+                return sum(row[self._total_column[h]] for h in households if h in self._total)
+            return sum(self._total.get(h, 0) for h in households)
+
+    def household_of(self, roommate_id: int) -> int:
+        """
+        Returns the household a roommate lives in.
+
+        Args:
+            roommate_id (int): The roommate ID
+
+        Returns:
+            int: The household ID, or None for an unknown roommate
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return self._household_of.get(roommate_id)
+
+    def personal_budget(self, roommate_id: int, start_date=None, end_date=None) -> dict:
+        """
+        Returns a roommate's spending per category (expenses they paid).
+
+        Categories are not part of the date index, so a date-limited budget
+        scans the cached entries (no database access).
+
+        Args:
+            roommate_id (int): The ID of the roommate who paid
+            start_date (optional): Only count expenses on or after this date
+            end_date (optional): Only count expenses on or before this date
+
+        Returns:
+            dict: Mapping of category name to total amount in cents
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if not (start_date or end_date):
+                budget = self._budgets.get(roommate_id, {})
+                return {category: slot[0] for category, slot in budget.items()}
+
+            low = date_ordinal(start_date) if start_date else None
+            high = date_ordinal(end_date) if end_date else None
+            totals = {}
+            for category, cents, payer_id, _, _, expense_date, _ in self._entries.values():
+                if payer_id != roommate_id:
+                    continue
+                ordinal = date_ordinal(expense_date)
+                if (low is None or ordinal >= low) and (high is None or ordinal <= high):
+                    totals[category] = totals.get(category, 0) + cents
+            return totals
+
+    # -----------------------------
+    # Verification
+    # -----------------------------
+
+    def verify(self) -> list:
+        """
+        Cross-checks the running totals against a full recompute.
+
+        A fresh ledger is loaded from the database and compared field by
+        field; the net balances are also compared with the trigger-maintained
+        roommate_balances table.
+
+        Returns:
+            list: Human-readable descriptions of every difference (empty if
+                  the ledger is exact)
+        """
+        reference = BalanceLedger(verify_updates=False)
+        reference.load()
+        stored = {row[0]: to_cents(row[4]) for row in get_roommate_balances()}
+
+        problems = []
+        with self._lock:
+            self._ensure_loaded()
+            if self._total != reference._total:
+                problems.append(f"total: {self._total} != {reference._total} cents")
+            for label, mine, theirs in (("paid", self._paid, reference._paid),
+                                        ("owed", self._owed, reference._owed),
+                                        ("shared", self._shared, reference._shared)):
+                for rm_id in set(mine) | set(theirs):
+                    if mine.get(rm_id) != theirs.get(rm_id):
+                        problems.append(f"{label} of roommate {rm_id}: "
+                                        f"{mine.get(rm_id)} != {theirs.get(rm_id)} cents")
+            for rm_id in set(self._budgets) | set(reference._budgets):
+                if self._budgets.get(rm_id) != reference._budgets.get(rm_id):
+                    problems.append(f"budget of roommate {rm_id} differs")
+            for rm_id, cents in stored.items():
+                # roommate_balances only counts expenses with participants
+                net = self._paid.get(rm_id, 0) - self._owed.get(rm_id, 0) + self._shared.get(rm_id, 0)
+                if net != cents:
+                    problems.append(f"net of roommate {rm_id}: {net} != {cents} cents in roommate_balances")
+        return problems
+
+
+# Process-wide ledger shared by the report screens
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> BalanceLedger:
+    """
+    Returns the shared ledger, subscribing it to expense changes on first use.
+
+    Returns:
+        BalanceLedger: The process-wide ledger
+    """
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = BalanceLedger()
+            events.subscribe(_ledger.on_expenses_changed)
+        return _ledger
@@ -0,0 +1,179 @@
+# models/money.py
+import math
+
+# Money is handled as a whole number of cents (a plain int) wherever it is
+# aggregated or split, and only converted to/from float dollars at the edges
+# (user input, the REAL column in the database, display). Integer sums are
+# exact, so ledgers balance to the cent without epsilon clean-up.
+Cents = int
+
+# How the per-participant split values of an expense are entered:
+# - equal:   every participant pays the same (values ignored)
+# - percent: percentages adding up to 100 (e.g. 62.5)
+# - shares:  whole share counts (e.g. 2 for a double room)
+# - exact:   dollar amounts adding up to the expense amount
+SPLIT_TYPES = ("equal", "percent", "shares", "exact")
+
+
+def to_cents(amount) -> Cents:
+    """
+    Converts a dollar amount to whole cents.
+
+    Rounds half away from zero on amount * 100, the same rule as SQLite's
+    ROUND(), so the result matches the expenses.amount_cents column.
+
+    Args:
+        amount (float | int | str): Amount in dollars (e.g. 12.34)
+
+    Returns:
+        int: Amount in cents (e.g. 1234)
+    """
+    value = float(amount) * 100
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+
+def from_cents(cents: Cents) -> float:
+    """
+    Converts whole cents back to dollars.
+
+    Args:
+        cents (int): Amount in cents
+
+    Returns:
+        float: Amount in dollars
+    """
+    return int(cents) / 100
+
+
+def format_cents(cents: Cents) -> str:
+    """
+    Formats cents as a currency string without going through a float.
+
+    Args:
+        cents (int): Amount in cents
+
+    Returns:
+        str: Formatted amount (e.g. '$12.34', '-$0.05')
+    """
+    cents = int(cents)
+    sign = "-" if cents < 0 else ""
+    dollars, remainder = divmod(abs(cents), 100)
+    return f"{sign}${dollars}.{remainder:02d}"
+
+
+def split_cents(total: Cents, parts: int, offset: int = 0) -> list[Cents]:
+    """
+    Splits an amount into equal integer shares that add up exactly.
+
+    Largest-remainder method: every share gets total // parts and the
+    leftover cents go one each to `remainder` consecutive shares, starting
+    at position offset % parts and wrapping around. Passing the expense ID as
+    the offset rotates who absorbs the odd cents from one expense to the next.
+
+    Args:
+        total (int): Amount to split, in cents
+        parts (int): Number of shares (must be positive)
+        offset (int, optional): First share to receive a leftover cent. Defaults to 0.
+
+    Returns:
+        list[int]: The shares, in participant order
+
+    Raises:
+        ValueError: If parts is not positive
+    """
+    if parts <= 0:
+        raise ValueError("parts must be positive")
+    sign = -1 if total < 0 else 1
+    base, remainder = divmod(abs(int(total)), parts)
+    start = offset % parts
+    shares = [base] * parts
+    for i in range(remainder):
+        shares[(start + i) % parts] += 1
+    return [sign * share for share in shares]
+
+
+def allocate_cents(total: Cents, weights: list, offset: int = 0) -> list[Cents]:
+    """
+    Splits an amount in proportion to weights, adding up exactly.
+
+    Every share is first rounded down; the leftover cents then go to the
+    shares with the largest remainders. Ties go to consecutive shares
+    starting at position offset % len(weights), so equal weights give the
+    same result as split_cents(total, len(weights), offset). Integer weights
+    are computed exactly, matching the expense_shares view in the database.
+
+    Args:
+        total (int): Amount to split, in cents
+        weights (list): Non-negative weights, at least one positive
+        offset (int, optional): First share to win a tie. Defaults to 0.
+
+    Returns:
+        list[int]: One share per weight
+
+    Raises:
+        ValueError: If no weight is positive
+    """
+    weight_sum = sum(weights)
+    if weight_sum <= 0:
+        raise ValueError("at least one weight must be positive")
+    sign = -1 if total < 0 else 1
+    magnitude = abs(int(total))
+    parts = len(weights)
+
+    if all(isinstance(w, int) for w in weights):
+        shares, remainders = zip(*(divmod(magnitude * w, weight_sum) for w in weights))
+        shares = list(shares)
+    else:
+        exact = [magnitude * w / weight_sum for w in weights]
+        shares = [int(math.floor(value)) for value in exact]
+        remainders = [value - share for value, share in zip(exact, shares)]
+    leftover = magnitude - sum(shares)
+    order = sorted(range(parts), key=lambda i: (-remainders[i], (i - offset) % parts))
+    for i in order[:leftover]:
+        shares[i] += 1
+    return [sign * share for share in shares]
+
+
+def split_weights(split_type: str, values: list, total: Cents) -> list[int]:
+    """
+    Converts the split values entered for an expense into integer weights.
+
+    Weights are what the database stores per participant; a participant's
+    share is always total * weight / sum(weights), split with allocate_cents().
+
+    Args:
+        split_type (str): One of SPLIT_TYPES
+        values (list): One value per participant (ignored for 'equal'):
+                       percentages, share counts or dollar amounts
+        total (int): Expense amount in cents (checked for 'exact')
+
+    Returns:
+        list[int]: Positive weights: 1 each (equal), basis points (percent),
+                   share counts (shares) or cents (exact)
+
+    Raises:
+        ValueError: If the split type is unknown or the values are invalid
+                    (not positive, percentages not adding up to 100, exact
+                    amounts not adding up to the total)
+    """
+    if split_type not in SPLIT_TYPES:
+        raise ValueError(f"Unknown split type: {split_type!r} (expected one of {SPLIT_TYPES})")
+    if split_type == "equal":
+        return [1] * len(values)
+
+    if split_type == "percent":
+        weights = [to_cents(value) for value in values]  # basis points
+        if sum(weights) != 10000:
+            raise ValueError("percentages must add up to 100")
+    elif split_type == "shares":
+        weights = [int(value) for value in values]
+        if any(weight != value for weight, value in zip(weights, values)):
+            raise ValueError("share counts must be whole numbers")
+    else:
+        weights = [to_cents(value) for value in values]
+        if sum(weights) != total:
+            raise ValueError("exact amounts must add up to the expense amount")
+
+    if any(weight <= 0 for weight in weights):
+        raise ValueError("every participant's split value must be positive")
+    return weights
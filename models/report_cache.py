@@ -0,0 +1,160 @@
+# models/report_cache.py
+import functools
+import threading
+from collections import OrderedDict
+
+from models.database.events import change_token
+
+# Reports kept per cache (least recently used are evicted first)
+DEFAULT_MAX_ENTRIES = 64
+
+# Longest list, tuple or dict argument that is frozen into a cache key.
+# Freezing walks the whole argument, so a call passing e.g. the full expense
+# list would cost O(expenses) on every lookup, hit or miss; such calls are
+# computed without the cache. The report screens pass expenses=None and the
+# roommate list, which stays well below this.
+MAX_KEY_ITEMS = 256
+
+
+class _KeyTooLarge(Exception):
+    """Raised by _freeze() for an argument longer than MAX_KEY_ITEMS."""
+
+
+def _freeze(value):
+    """
+    Turns report arguments (lists, dicts, tuples) into a hashable key.
+
+    Raises:
+        _KeyTooLarge: If a list, tuple or dict has more than MAX_KEY_ITEMS items
+    """
+    if isinstance(value, (list, tuple, dict)) and len(value) > MAX_KEY_ITEMS:
+        raise _KeyTooLarge()
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+class ReportCache:
+    """
+    LRU memo of computed reports, keyed on the report parameters.
+
+    Every entry remembers the change token (models.database.events) that was
+    current when it was computed; a lookup with a different token is a miss,
+    so nothing has to be invalidated explicitly after a write. A repeat
+    request with no write in between costs one PRAGMA data_version and one
+    dictionary lookup.
+
+    Cached reports are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_entries (int, optional): Reports kept before the least
+                                         recently used is evicted.
+                                         Defaults to DEFAULT_MAX_ENTRIES.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        Returns the cached value for key, computing it on a miss.
+
+        Args:
+            key: Hashable report parameters
+            compute: Function without arguments that builds the report
+
+        Returns:
+            The cached or freshly computed report
+        """
+        token = change_token()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == token:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (token, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drops every cached report and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: hits, misses, hit_rate (0-1), size and max_entries
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# Process-wide cache shared by the report screens
+_cache = ReportCache()
+
+
+def get_report_cache() -> ReportCache:
+    """
+    Returns the shared report cache.
+
+    Returns:
+        ReportCache: The process-wide cache
+    """
+    return _cache
+
+
+def cached_report(func):
+    """
+    Wraps a report function so repeated calls with the same arguments and
+    no committed write in between return the cached report.
+
+    The key is the function name plus its arguments (lists and dicts are
+    frozen into tuples). Calls with a list, tuple or dict argument longer
+    than MAX_KEY_ITEMS, such as an explicit expense list, bypass the cache
+    so that a lookup never costs O(expenses). The undecorated function
+    stays available as wrapper.uncached.
+
+    Args:
+        func: A report function, e.g. report_generator.generate_summary_report
+
+    Returns:
+        The memoised function
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            key = (func.__name__, _freeze(args), _freeze(kwargs))
+        except _KeyTooLarge:
+            return func(*args, **kwargs)
+        return _cache.get(key, lambda: func(*args, **kwargs))
+
+    wrapper.uncached = func
+    return wrapper
@@ -1,14 +1,37 @@
 # models/report_generator.py
-from models.calculator import (
-    calculate_settlements, 
-    calculate_personal_budget, 
-    calculate_total_contributions, 
-    calculate_total_owed_per_person
-)
-from typing import List, Dict, Any
+from models.calculator import aggregate_expenses, settle_balances
+from models.database.expense_db import get_contributions_by_payer, get_personal_budget, get_total_expenses
+from models.ledger import get_ledger, date_ordinal
+from models.money import format_cents
+from typing import List, Dict, Any, Optional
 
 
-def generate_settlement_report(expenses: List[tuple], roommates: List[tuple]) -> List[Dict[str, Any]]:
+def _filter_by_date(expenses: List[tuple], start_date: Optional[str], end_date: Optional[str]) -> List[tuple]:
+    """
+    Keeps the expenses dated within [start_date, end_date] (date at index 1).
+
+    Args:
+        expenses (List[tuple]): Expense rows
+        start_date (str, optional): First date included ('YYYY-MM-DD')
+        end_date (str, optional): Last date included ('YYYY-MM-DD')
+
+    Returns:
+        List[tuple]: The matching rows (the input list itself if no bound is given)
+    """
+    if not (start_date or end_date):
+        return expenses
+    low = date_ordinal(start_date) if start_date else None
+    high = date_ordinal(end_date) if end_date else None
+    return [
+        exp for exp in expenses
+        if (low is None or date_ordinal(exp[1]) >= low) and (high is None or date_ordinal(exp[1]) <= high)
+    ]
+
+
+def generate_settlement_report(expenses: Optional[List[tuple]], roommates: List[tuple],
+                               mode: str = "greedy", time_budget_ms: Optional[float] = None,
+                               start_date: Optional[str] = None,
+                               end_date: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Generates a formatted settlement report showing who owes money to whom.
     
@@ -18,9 +41,21 @@ def generate_settlement_report(expenses: List[tuple], roommates: List[tuple]) ->
     
     Args:
         expenses (List[tuple]): List of expense tuples from database
-                               (id, date, account, category, amount, note, payer_id)
+                               (id, date, account, category, amount, note, payer_id).
+                               Rows from get_expense_history() are also accepted.
+                               Pass None to settle from the running net balances
+                               of the shared BalanceLedger, which splits each
+                               expense among its actual participants; each
+                               household is then settled on its own, so no
+                               transfer crosses households.
         roommates (List[tuple]): List of roommate tuples from database
                                 (id, name, email, join_date)
+        mode (str, optional): "greedy" (default) or "optimal" to minimise the
+                              number of transfers (see calculator.settle_balances)
+        time_budget_ms (float, optional): Time budget of the "optimal" search
+        start_date (str, optional): Only settle expenses on or after this date
+        end_date (str, optional): Only settle expenses on or before this date;
+                                  alone it gives the balances "as of" that date
     
     Returns:
         List[Dict[str, Any]]: Formatted settlement report ready for UI display.
@@ -29,8 +64,25 @@ def generate_settlement_report(expenses: List[tuple], roommates: List[tuple]) ->
                              - "Owes To": Name of the creditor  
                              - "Amount ($)": Formatted amount owed
     """
-    # Calculate raw settlements using the calculator
-    settlements = calculate_settlements(expenses, roommates)
+    # Calculate raw settlements using the calculator (all in integer cents)
+    if expenses is None:
+        # Fast path: start from the ledger's running balances, O(roommates)
+        # (a date range costs two bisects in the ledger's prefix-sum index)
+        ledger = get_ledger()
+        net_balances = ledger.net_balances(start_date, end_date)
+        # Roommates only settle with their own household
+        households = {}
+        for rm in roommates:
+            if rm[0] in net_balances:
+                households.setdefault(ledger.household_of(rm[0]), {})[rm[0]] = net_balances[rm[0]]
+        settlements = []
+        for household_id in sorted(households):
+            settlements.extend(settle_balances(households[household_id], roommates, mode, time_budget_ms))
+    else:
+        # One fused pass over the rows (see calculator.aggregate_expenses)
+        expenses = _filter_by_date(expenses, start_date, end_date)
+        balances = aggregate_expenses(expenses, roommates)["net"]
+        settlements = settle_balances(balances, roommates, mode, time_budget_ms)
     formatted_report = []
     
     # Format each settlement for display
@@ -38,13 +90,15 @@ def generate_settlement_report(expenses: List[tuple], roommates: List[tuple]) ->
         formatted_report.append({
             "Person Owing": settlement["debtor_name"],
             "Owes To": settlement["creditor_name"],
-            "Amount ($)": f"${settlement['amount']:.2f}"  # Format as currency
+            "Amount ($)": format_cents(settlement["amount"])  # Format as currency
         })
     
     return formatted_report
 
 
-def generate_personal_budget_report(expenses: List[tuple], roommates: List[tuple], user_id: int) -> List[Dict[str, Any]]:
+def generate_personal_budget_report(expenses: Optional[List[tuple]], roommates: List[tuple], user_id: int,
+                                    start_date: Optional[str] = None,
+                                    end_date: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Generates a formatted personal budget report for a specific user.
     
@@ -53,9 +107,13 @@ def generate_personal_budget_report(expenses: List[tuple], roommates: List[tuple
     identifying spending patterns.
     
     Args:
-        expenses (List[tuple]): List of expense tuples from database
+        expenses (List[tuple]): List of expense tuples from database, or None
+                               to total the user's expenses with a SQL GROUP BY
+                               (see expense_db.get_personal_budget)
         roommates (List[tuple]): List of roommate tuples from database
         user_id (int): The ID of the user whose budget report is generated
+        start_date (str, optional): Only include expenses on or after this date
+        end_date (str, optional): Only include expenses on or before this date
     
     Returns:
         List[Dict[str, Any]]: Formatted budget report sorted by amount (descending).
@@ -63,27 +121,27 @@ def generate_personal_budget_report(expenses: List[tuple], roommates: List[tuple
                              - "Category": Expense category name
                              - "Total Amount ($)": Formatted total spent in category
     """
-    # Calculate raw budget data
-    personal_budget_dict = calculate_personal_budget(expenses, roommates, user_id)
-    formatted_report = []
-    
-    # Convert to formatted report entries
-    for category, total in personal_budget_dict.items():
-        formatted_report.append({
+    # Calculate raw budget data in cents (in SQL when no expense list was loaded)
+    if expenses is None:
+        personal_budget_dict = get_personal_budget(user_id, start_date=start_date, end_date=end_date)
+    else:
+        expenses = _filter_by_date(expenses, start_date, end_date)
+        personal_budget_dict = aggregate_expenses(expenses, roommates)["budgets"].get(user_id, {})
+
+    # Sort by amount (highest to lowest) for better readability, then
+    # convert to formatted report entries
+    return [
+        {
             "Category": category,
-            "Total Amount ($)": f"${total:.2f}"  # Format as currency
-        })
-    
-    # Sort by amount (highest to lowest) for better readability
-    formatted_report.sort(
-        key=lambda x: float(x["Total Amount ($)"].replace('$', '')), 
-        reverse=True
-    )
-    
-    return formatted_report
+            "Total Amount ($)": format_cents(total)  # Format as currency
+        }
+        for category, total in sorted(personal_budget_dict.items(), key=lambda item: item[1], reverse=True)
+    ]
 
 
-def generate_summary_report(expenses: List[tuple], roommates: List[tuple]) -> Dict[str, Any]:
+def generate_summary_report(expenses: Optional[List[tuple]], roommates: List[tuple],
+                            start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> Dict[str, Any]:
     """
     Generates a comprehensive summary report of household finances.
     
@@ -95,34 +153,53 @@ def generate_summary_report(expenses: List[tuple], roommates: List[tuple]) -> Di
     Useful for understanding the big picture and identifying financial patterns.
     
     Args:
-        expenses (List[tuple]): List of expense tuples from database
+        expenses (List[tuple]): List of expense tuples from database, or None
+                               to total the expenses and payments in SQL and
+                               read the fair shares from the BalanceLedger
         roommates (List[tuple]): List of roommate tuples from database
+        start_date (str, optional): Only include expenses on or after this date
+        end_date (str, optional): Only include expenses on or before this date
     
     Returns:
         Dict[str, Any]: Summary report containing:
                        - "total_household_expenses": Formatted total of all expenses
                        - "individual_contributions": Dict of names to formatted amounts paid
-                       - "individual_fair_shares": Dict of names to formatted fair share amounts
+                       - "individual_fair_shares": Dict of names to formatted fair share
+                         amounts: each roommate's share of the expenses they take part in
+                         (an expense without participants is shared by the household)
     """
-    # Calculate total household expenses
-    total_expenses = sum(exp[4] for exp in expenses)  # amount at index 4
-    
-    # Calculate individual financial data
-    total_contributions = calculate_total_contributions(expenses, roommates)
-    total_owed = calculate_total_owed_per_person(expenses, roommates)
+    if expenses is None:
+        # No dataset in memory: totals and payments from SQL GROUP BY queries
+        ledger = get_ledger()
+        # Only the expenses of the households the listed roommates live in
+        households = {ledger.household_of(rm[0]) for rm in roommates} - {None}
+        total_expenses = sum(get_total_expenses(household_id, start_date, end_date)
+                             for household_id in households)
+        paid_by = get_contributions_by_payer(start_date=start_date, end_date=end_date)
+        total_contributions = {rm[0]: paid_by.get(rm[0], 0) for rm in roommates}
+        # Participants share their expenses; the household shares the rest
+        fair_shares = ledger.fair_shares(start_date, end_date)
+        total_owed = {rm[0]: fair_shares.get(rm[0], 0) for rm in roommates}
+    else:
+        expenses = _filter_by_date(expenses, start_date, end_date)
+        # Total, contributions and fair shares from one fused pass
+        aggregate = aggregate_expenses(expenses, roommates)
+        total_expenses = aggregate["total"]
+        total_contributions = aggregate["contributions"]
+        total_owed = aggregate["fair_shares"]
 
     # Create mapping from roommate ID to name for display
     roommate_map = {rm[0]: rm[1] for rm in roommates}  # rm[0] = id, rm[1] = name
 
-    # Compile summary report
+    # Compile summary report (amounts are integer cents until formatted here)
     summary = {
-        "total_household_expenses": f"${total_expenses:.2f}",
+        "total_household_expenses": format_cents(total_expenses),
         "individual_contributions": {
-            roommate_map[rm_id]: f"${amount:.2f}" 
+            roommate_map[rm_id]: format_cents(amount)
             for rm_id, amount in total_contributions.items()
         },
         "individual_fair_shares": {
-            roommate_map[rm_id]: f"${amount:.2f}" 
+            roommate_map[rm_id]: format_cents(amount)
             for rm_id, amount in total_owed.items()
         },
     }
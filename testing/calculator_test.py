@@ -0,0 +1,364 @@
+"""Regression checks for the settlement calculator.
+
+Compares models/calculator.py against the original (pre-vectorisation)
+implementation and a straightforward integer-cents reference on a seeded
+random corpus, with and without NumPy.
+
+Run with: `python testing/calculator_test.py`
+"""
+from pathlib import Path
+import random
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import models.calculator as calculator
+from models.money import to_cents, from_cents, format_cents, split_cents, allocate_cents, split_weights
+
+
+def fail(msg):
+    print("[FAIL]", msg)
+    raise SystemExit(2)
+
+
+def ok(msg):
+    print("[OK]", msg)
+
+
+# -----------------------------
+# Reference implementation (original calculator, all roommates share every expense)
+# -----------------------------
+
+def legacy_balances(expenses, roommates):
+    balances = {rm[0]: 0.0 for rm in roommates}
+    for exp in expenses:
+        participant_ids = [rm[0] for rm in roommates]
+        share_per_person = exp[4] / len(participant_ids)
+        balances[exp[6]] += exp[4]
+        for participant_id in participant_ids:
+            balances[participant_id] -= share_per_person
+    return balances
+
+
+def legacy_settlements(expenses, roommates):
+    if not expenses or not roommates:
+        return []
+    return legacy_settle(legacy_balances(expenses, roommates), roommates)
+
+
+def legacy_settle(balances, roommates):
+    roommate_map = {rm[0]: rm[1] for rm in roommates}
+    creditors = {rm_id: bal for rm_id, bal in balances.items() if bal > 0}
+    debtors = {rm_id: abs(bal) for rm_id, bal in balances.items() if bal < 0}
+    settlements = []
+    while creditors and debtors:
+        creditor_id, creditor_balance = max(creditors.items(), key=lambda item: item[1])
+        debtor_id, debtor_balance = max(debtors.items(), key=lambda item: item[1])
+        amount_to_settle = min(creditor_balance, debtor_balance)
+        settlements.append({
+            "debtor_id": debtor_id,
+            "creditor_id": creditor_id,
+            "amount": round(amount_to_settle, 2),
+            "debtor_name": roommate_map[debtor_id],
+            "creditor_name": roommate_map[creditor_id]
+        })
+        creditors[creditor_id] -= amount_to_settle
+        debtors[debtor_id] -= amount_to_settle
+        if creditors[creditor_id] < 0.01:
+            del creditors[creditor_id]
+        if debtors[debtor_id] < 0.01:
+            del debtors[debtor_id]
+    return settlements
+
+
+def cents_reference_balances(expenses, roommates):
+    """Per-expense split_cents()/allocate_cents() loop; participants ordered by roommate ID."""
+    ids = sorted(rm[0] for rm in roommates)
+    paid = {rm_id: 0 for rm_id in ids}
+    owed = {rm_id: 0 for rm_id in ids}
+    for exp in expenses:
+        amount = to_cents(exp[4])
+        if exp[6] in paid:
+            paid[exp[6]] += amount
+        if len(exp) > 10 and exp[10]:
+            members, weights = zip(*sorted(zip(exp[8], exp[10])))
+            shares = allocate_cents(amount, list(weights), exp[0])
+        else:
+            members = sorted(exp[8]) if len(exp) > 8 and exp[8] else ids
+            shares = split_cents(amount, len(members), exp[0])
+        for rm_id, share in zip(members, shares):
+            owed[rm_id] += share
+    return paid, owed
+
+
+def make_corpus(rng, n_roommates, n_expenses):
+    roommates = [(i, f"R{i}", "", "") for i in range(1, n_roommates + 1)]
+    expenses = [
+        (e, "2024-01-01", "", "Cat", round(rng.uniform(0.5, 500), 2), "", rng.randint(1, n_roommates))
+        for e in range(1, n_expenses + 1)
+    ]
+    return expenses, roommates
+
+
+def settlements_match(actual, expected):
+    if len(actual) != len(expected):
+        return False
+    for a, b in zip(actual, expected):
+        if (a["debtor_id"], a["creditor_id"]) != (b["debtor_id"], b["creditor_id"]):
+            return False
+        if a["amount"] != b["amount"]:
+            return False
+    return True
+
+
+def check_regression_corpus(label):
+    rng = random.Random(211)
+    for case in range(200):
+        expenses, roommates = make_corpus(rng, rng.randint(1, 8), rng.randint(0, 300))
+
+        # Within a cent per expense of the original float calculator
+        legacy = legacy_balances(expenses, roommates)
+        roommate_ids, paid, owed = calculator.compute_balance_vectors(expenses, roommates)
+        for i, rm_id in enumerate(roommate_ids):
+            if abs(from_cents(paid[i] - owed[i]) - legacy[rm_id]) > 0.01 * max(1, len(expenses)):
+                fail(f"{label}: balance of {rm_id} drifted from the original on case {case}")
+
+        # Exactly the integer reference, and the shares add up to the total
+        ref_paid, ref_owed = cents_reference_balances(expenses, roommates)
+        if [int(v) for v in owed] != [ref_owed[rm_id] for rm_id in roommate_ids] or \
+                [int(v) for v in paid] != [ref_paid[rm_id] for rm_id in roommate_ids]:
+            fail(f"{label}: cents differ from the split_cents reference on case {case}")
+        if expenses and int(sum(owed)) != sum(to_cents(exp[4]) for exp in expenses):
+            fail(f"{label}: shares do not add up to the expense total on case {case}")
+
+        # Settlements clear every balance to the cent
+        settlements = calculator.calculate_settlements(expenses, roommates)
+        remaining = {rm_id: int(paid[i] - owed[i]) for i, rm_id in enumerate(roommate_ids)}
+        for s in settlements:
+            remaining[s["debtor_id"]] += s["amount"]
+            remaining[s["creditor_id"]] -= s["amount"]
+        if expenses and any(remaining.values()):
+            fail(f"{label}: settlements left {remaining} on case {case}")
+    ok(f"{label}: 200 random corpora balance to the cent")
+
+
+def check_participant_corpus(label):
+    rng = random.Random(212)
+    for case in range(100):
+        expenses, roommates = make_corpus(rng, rng.randint(1, 8), rng.randint(0, 200))
+        ids = [rm[0] for rm in roommates]
+        expenses = [
+            exp + ("", tuple(rng.sample(ids, rng.randint(1, len(ids)))), ())
+            if rng.random() < 0.7 else exp
+            for exp in expenses
+        ]
+        roommate_ids, paid, owed = calculator.compute_balance_vectors(expenses, roommates)
+        ref_paid, ref_owed = cents_reference_balances(expenses, roommates)
+        if [int(v) for v in owed] != [ref_owed[rm_id] for rm_id in roommate_ids]:
+            fail(f"{label}: participant shares differ from the reference on case {case}")
+    ok(f"{label}: participant-aware shares match the split_cents reference")
+
+
+def check_weighted_corpus(label):
+    rng = random.Random(218)
+    for case in range(100):
+        expenses, roommates = make_corpus(rng, rng.randint(1, 8), rng.randint(0, 200))
+        ids = [rm[0] for rm in roommates]
+        mixed = []
+        for exp in expenses:
+            members = rng.sample(ids, rng.randint(1, len(ids)))
+            kind = rng.choice(("equal", "shares", "weights"))
+            if kind == "equal":
+                weights = [1] * len(members)
+            elif kind == "shares":
+                weights = [rng.randint(1, 4) for _ in members]
+            else:  # basis points or exact cents
+                weights = [rng.randint(1, 50000) for _ in members]
+            mixed.append(exp + ("", tuple(members), (), tuple(weights)))
+        roommate_ids, paid, owed = calculator.compute_balance_vectors(mixed, roommates)
+        ref_paid, ref_owed = cents_reference_balances(mixed, roommates)
+        if [int(v) for v in owed] != [ref_owed[rm_id] for rm_id in roommate_ids]:
+            fail(f"{label}: weighted shares differ from the allocate_cents reference on case {case}")
+        if mixed and int(sum(owed)) != sum(to_cents(exp[4]) for exp in mixed):
+            fail(f"{label}: weighted shares do not add up on case {case}")
+    ok(f"{label}: mixed equal/share/percent/exact splits match the allocate_cents reference")
+
+
+def check_aggregate(label):
+    rng = random.Random(219)
+    for case in range(50):
+        expenses, roommates = make_corpus(rng, rng.randint(1, 6), rng.randint(0, 150))
+        ids = [rm[0] for rm in roommates]
+        expenses = [
+            exp[:3] + (rng.choice(("Food", "Rent", "Fun")),) + exp[4:6] + (rng.choice(ids + [None]),)
+            + ("", tuple(rng.sample(ids, rng.randint(1, len(ids)))), ())
+            for exp in expenses
+        ]
+        aggregate = calculator.aggregate_expenses(expenses, roommates)
+        roommate_ids, paid, owed = calculator.compute_balance_vectors(expenses, roommates)
+        expected_net = {rm_id: int(paid[i] - owed[i]) for i, rm_id in enumerate(roommate_ids)}
+        contributions = calculator.calculate_total_contributions(expenses, roommates)
+        fair_shares = calculator.calculate_total_owed_per_person(expenses, roommates)
+        if aggregate["total"] != sum(to_cents(exp[4]) for exp in expenses) or aggregate["net"] != expected_net:
+            fail(f"{label}: fused total/net differ on case {case}")
+        if {k: from_cents(v) for k, v in aggregate["contributions"].items()} != contributions or \
+                {k: from_cents(v) for k, v in aggregate["fair_shares"].items()} != fair_shares:
+            fail(f"{label}: fused contributions/fair shares differ on case {case}")
+        for rm_id in ids:
+            budget = {k: from_cents(v) for k, v in aggregate["budgets"].get(rm_id, {}).items()}
+            if budget != calculator.calculate_personal_budget(expenses, roommates, rm_id):
+                fail(f"{label}: fused budget of {rm_id} differs on case {case}")
+        if sum(aggregate["categories"].values()) != aggregate["total"]:
+            fail(f"{label}: category totals do not add up on case {case}")
+    ok(f"{label}: fused aggregator matches the separate calculations")
+
+
+def check_participants(label):
+    roommates = [(1, "A", "", ""), (2, "B", "", ""), (3, "C", "", ""), (4, "D", "", "")]
+    # History-style rows: participant IDs at index 8; D takes part in nothing
+    expenses = [
+        (1, "2024-01-01", "", "Food", 30.0, "", 1, "A", (1, 2, 3), ("A", "B", "C")),
+        (2, "2024-01-02", "", "Food", 10.0, "", 2, "B", (1, 2), ("A", "B")),
+    ]
+    settlements = calculator.calculate_settlements(expenses, roommates)
+    as_tuples = sorted((s["debtor_id"], s["creditor_id"], s["amount"]) for s in settlements)
+    if as_tuples != [(2, 1, 500), (3, 1, 1000)]:
+        fail(f"{label}: participant-aware settlements wrong: {as_tuples}")
+    owed = calculator.calculate_total_owed_per_person(expenses, roommates)
+    if owed != {1: 15.0, 2: 15.0, 3: 10.0, 4: 0.0}:
+        fail(f"{label}: participant-aware fair shares wrong: {owed}")
+    ok(f"{label}: settlements follow the real participant rows")
+
+
+def check_heap_matcher():
+    rng = random.Random(12)
+    for size in (2, 10, 300):
+        roommates = [(i, f"R{i}", "", "") for i in range(size)]
+        balances = {i: rng.randint(-100000, 100000) for i in range(size - 1)}
+        balances[size - 1] = -sum(balances.values())
+        # Original sorted greedy run on integer cents, where nothing is lost to float error
+        expected = legacy_settle(balances, roommates)
+        if not settlements_match(calculator.settle_balances(balances, roommates), expected):
+            fail(f"heap matcher differs from sorted greedy for {size} members")
+
+    # Thousands of members must settle quickly
+    import time
+    size = 5000
+    roommates = [(i, f"R{i}", "", "") for i in range(size)]
+    balances = {i: rng.randint(-100000, 100000) for i in range(size - 1)}
+    balances[size - 1] = -sum(balances.values())
+    start = time.perf_counter()
+    calculator.settle_balances(balances, roommates)
+    elapsed = time.perf_counter() - start
+    if elapsed > 2.0:
+        fail(f"settling {size} members took {elapsed:.2f}s")
+    ok(f"Heap matcher agrees with sorted greedy; {size} members in {elapsed * 1000:.0f} ms")
+
+
+def net_after(balances, settlements):
+    remaining = dict(balances)
+    for s in settlements:
+        remaining[s["debtor_id"]] += s["amount"]
+        remaining[s["creditor_id"]] -= s["amount"]
+    return remaining
+
+
+def check_optimizer():
+    roommates = [(i, f"R{i}", "", "") for i in range(1, 7)]
+    # Two independent zero-sum groups: {1, 2} and {3, 4, 5, 6}; optimum is 1 + 3 transfers
+    balances = {1: 1000, 2: -1000, 3: 2500, 4: 500, 5: -1200, 6: -1800}
+    optimal = calculator.settle_balances(balances, roommates, mode="optimal")
+    if len(optimal) != 4:
+        fail(f"optimiser found {len(optimal)} transfers, expected 4: {optimal}")
+
+    rng = random.Random(13)
+    for size in (3, 8, 12, 40, 400):
+        roommates = [(i, f"R{i}", "", "") for i in range(size)]
+        # Balances built from small zero-sum groups, shuffled together
+        balances = {}
+        rm_id = 0
+        while rm_id < size:
+            group = list(range(rm_id, min(size, rm_id + rng.randint(2, 4))))
+            amounts = [rng.randint(-50000, 50000) for _ in group[:-1]]
+            amounts.append(-sum(amounts))
+            for member, amount in zip(group, amounts):
+                balances[member] = amount
+            rm_id += len(group)
+        greedy = calculator.settle_balances(balances, roommates)
+        optimal = calculator.settle_balances(balances, roommates, mode="optimal")
+        if len(optimal) > len(greedy):
+            fail(f"optimiser used more transfers than greedy for {size} members")
+        if any(net_after(balances, optimal).values()):
+            fail(f"optimiser left balances unsettled for {size} members")
+
+    # An exhausted budget falls back to the greedy matcher
+    fallback = calculator.settle_balances(balances, roommates, mode="optimal", time_budget_ms=0)
+    if any(net_after(balances, fallback).values()):
+        fail("optimiser fallback left balances unsettled")
+
+    try:
+        calculator.settle_balances(balances, roommates, mode="fastest")
+        fail("unknown settlement mode was accepted")
+    except ValueError:
+        pass
+    ok("Optimiser settles every balance with no more transfers than greedy")
+
+
+def check_money():
+    if [to_cents(v) for v in (12.34, 0.1 + 0.2, 1.005, -2.5, "7")] != [1234, 30, 100, -250, 700]:
+        fail("to_cents rounding is wrong")
+    if format_cents(123456) != "$1234.56" or format_cents(-5) != "-$0.05":
+        fail("format_cents output is wrong")
+    if split_cents(1000, 3) != [334, 333, 333] or split_cents(1001, 3, offset=2) != [334, 333, 334]:
+        fail("split_cents shares are wrong")
+    if split_cents(-5, 2) != [-3, -2]:
+        fail("split_cents mishandles negative amounts")
+    if allocate_cents(100, [1, 1, 1]) != [34, 33, 33] or allocate_cents(1000, [2, 1]) != [667, 333]:
+        fail("allocate_cents shares are wrong")
+    if split_weights("percent", [62.5, 37.5], 999) != [6250, 3750] \
+            or split_weights("exact", [3.1, 6.9], 1000) != [310, 690] \
+            or split_weights("shares", [2, 1], 5) != [2, 1] or split_weights("equal", [None] * 3, 5) != [1, 1, 1]:
+        fail("split_weights converted the split values wrongly")
+    for split_type, values in (("percent", [50, 40]), ("exact", [1, 2]), ("shares", [1.5]), ("shares", [0, 1])):
+        try:
+            split_weights(split_type, values, 1000)
+            fail(f"split_weights accepted {split_type} {values}")
+        except ValueError:
+            pass
+    rng = random.Random(14)
+    for _ in range(500):
+        total = rng.randint(0, 10 ** 7)
+        parts = rng.randint(1, 12)
+        shares = split_cents(total, parts, rng.randint(0, 100))
+        if sum(shares) != total or max(shares) - min(shares) > 1:
+            fail(f"split_cents({total}, {parts}) does not add up")
+        weights = [rng.randint(0, 5) for _ in range(parts)] + [1]
+        if sum(allocate_cents(total, weights)) != total:
+            fail(f"allocate_cents({total}, {weights}) does not add up")
+        offset = rng.randint(0, 100)
+        if allocate_cents(total, [1] * parts, offset) != split_cents(total, parts, offset):
+            fail(f"allocate_cents with equal weights differs from split_cents({total}, {parts}, {offset})")
+    ok("Money helpers round, format and split exactly")
+
+
+def run():
+    check_money()
+    numpy_module = calculator.np
+    labels = ["numpy"] if numpy_module is not None else []
+    labels.append("pure-python")
+
+    for label in labels:
+        calculator.np = numpy_module if label == "numpy" else None
+        check_regression_corpus(label)
+        check_participant_corpus(label)
+        check_weighted_corpus(label)
+        check_aggregate(label)
+        check_participants(label)
+    calculator.np = numpy_module
+    check_heap_matcher()
+    check_optimizer()
+
+    print("\nAll calculator checks passed")
+
+
+if __name__ == '__main__':
+    run()
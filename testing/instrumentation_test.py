@@ -0,0 +1,105 @@
+"""Checks for the DAO instrumentation (models/database/instrumentation.py).
+
+Runs a few DAO calls on a scratch database with a 0 ms slow-query
+threshold, so every call is logged with its query plan.
+
+Run with: `python testing/instrumentation_test.py`
+"""
+from pathlib import Path
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Both are read when the modules are imported
+SCRATCH = Path(tempfile.mkdtemp())
+os.environ["ROOMIESPLIT_DB"] = str(SCRATCH / "instrumentation.db")
+os.environ["ROOMIESPLIT_SLOW_MS"] = "0"
+
+from models.database import instrumentation
+from models.database.db_connection import initialize_database
+from models.database.roomate_db import add_roommate, get_all_roommates
+from models.database.expense_db import add_expenses_bulk, get_expenses_page
+
+
+def fail(msg):
+    print("[FAIL]", msg)
+    raise SystemExit(2)
+
+
+def ok(msg):
+    print("[OK]", msg)
+
+
+def run():
+    initialize_database()
+    add_roommate("Ann", "ann@example.com", "2025-01-01")
+    add_expenses_bulk([(f"2025-01-{day:02d}", "Card", "Groceries", 10.0 + day, "", None)
+                       for day in range(1, 26)])
+
+    instrumentation.configure(enabled=True)
+    instrumentation.reset_stats()
+
+    for _ in range(20):
+        get_all_roommates()
+    rows, cursor = get_expenses_page(limit=10)
+    get_expenses_page(limit=10, cursor=cursor)
+
+    stats = instrumentation.get_stats()
+    roommates = stats.get("roomate_db.get_all_roommates")
+    if not roommates or roommates["calls"] != 20:
+        fail(f"Expected 20 get_all_roommates calls, got {roommates}")
+    if roommates["rows"] != 20:
+        fail(f"Expected 20 roommate rows (1 per call), got {roommates['rows']}")
+    ok("Call and row counts are recorded")
+
+    if not 0 <= roommates["p50_ms"] <= roommates["p95_ms"] <= roommates["p99_ms"] <= roommates["max_ms"]:
+        fail(f"Percentiles out of order: {roommates}")
+    ok("p50 <= p95 <= p99 <= max")
+
+    page = stats.get("expense_db.get_expenses_page")
+    if not page or page["calls"] != 2 or page["rows"] != 20:
+        fail(f"Expected 2 pages of 10 rows, got {page}")
+    if len(rows) != 10:
+        fail(f"Expected a page of 10 expenses, got {len(rows)}")
+    ok("Paged results count their rows, not the (rows, cursor) tuple")
+
+    slow = [entry for entry in instrumentation.get_slow_queries()
+            if entry["name"] == "expense_db.get_expenses_page"]
+    if len(slow) != 2:
+        fail(f"Expected both pages in the slow-query log, got {len(slow)}")
+    if slow[0]["rows"] != 10:
+        fail(f"Slow-query entry has the wrong row count: {slow[0]['rows']}")
+    plans = slow[0]["plans"]
+    if not plans or not all(plan.get("plan") for plan in plans):
+        fail(f"Slow-query entry has no EXPLAIN QUERY PLAN: {plans}")
+    if not any("expenses" in " ".join(plan["plan"]) for plan in plans):
+        fail(f"Query plan does not mention the expenses table: {plans}")
+    ok("Slow-query log has the statements and their query plans")
+
+    path = SCRATCH / "stats.json"
+    document = instrumentation.dump_stats_json(str(path))
+    parsed = json.loads(document)
+    if json.loads(path.read_text(encoding="utf-8")) != parsed:
+        fail("Stats file differs from the returned JSON")
+    if parsed["slow_threshold_ms"] != 0.0:
+        fail(f"Unexpected slow threshold: {parsed['slow_threshold_ms']}")
+    if parsed["queries"]["roomate_db.get_all_roommates"]["calls"] != 20:
+        fail(f"Unexpected stats in the JSON: {parsed['queries']}")
+    if len(parsed["slow_queries"]) != len(instrumentation.get_slow_queries()):
+        fail("JSON slow-query log differs from get_slow_queries()")
+    ok("dump_stats_json() writes the stats and slow-query log")
+
+    instrumentation.reset_stats()
+    instrumentation.configure(enabled=False)
+    get_all_roommates()
+    if instrumentation.get_stats() or instrumentation.get_slow_queries():
+        fail("Calls were recorded while instrumentation was off")
+    ok("Nothing is recorded while disabled")
+
+    print("All instrumentation tests passed")
+
+
+if __name__ == "__main__":
+    run()
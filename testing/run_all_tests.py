@@ -1,4 +1,4 @@
-"""Run both validators and CRUD quick tests.
+"""Run the validators, CRUD, calculator and instrumentation quick tests.
 
 Usage:
   python testing/run_all_tests.py
@@ -31,7 +31,8 @@ def run_test(python_exec, script_path):
 def main():
     python_exec = find_python_executable()
     base = Path(__file__).parent
-    scripts = [base / 'validators_test.py', base / 'crud_test.py']
+    scripts = [base / 'validators_test.py', base / 'crud_test.py', base / 'calculator_test.py',
+               base / 'instrumentation_test.py']
 
     failed = []
     for script in scripts:
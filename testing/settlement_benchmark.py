@@ -0,0 +1,54 @@
+"""Benchmark of the settlement strategies: transfer count against runtime.
+
+Builds households whose balances hide small zero-sum groups (the case where
+the greedy matcher wastes transfers) and settles them with mode="greedy" and
+mode="optimal".
+
+Run with: `python testing/settlement_benchmark.py [budget_ms]`
+"""
+from pathlib import Path
+import random
+import sys
+import time
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.calculator import settle_balances, DEFAULT_OPTIMIZER_BUDGET_MS
+
+SIZES = [4, 8, 12, 14, 50, 500, 5000]
+
+
+def make_balances(rng, size):
+    balances = {}
+    rm_id = 0
+    while rm_id < size:
+        group = list(range(rm_id, min(size, rm_id + rng.randint(2, 4))))
+        amounts = [rng.randint(-50000, 50000) for _ in group[:-1]]
+        amounts.append(-sum(amounts))
+        for member, amount in zip(group, amounts):
+            balances[member] = amount  # cents
+        rm_id += len(group)
+    items = list(balances.items())
+    rng.shuffle(items)
+    return dict(items)
+
+
+def run(budget_ms):
+    rng = random.Random(2024)
+    print(f"{'members':>8} {'greedy':>8} {'ms':>8} {'optimal':>8} {'ms':>8}")
+    for size in SIZES:
+        balances = make_balances(rng, size)
+        roommates = [(rm_id, f"R{rm_id}", "", "") for rm_id in balances]
+
+        start = time.perf_counter()
+        greedy = settle_balances(balances, roommates)
+        greedy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        optimal = settle_balances(balances, roommates, mode="optimal", time_budget_ms=budget_ms)
+        optimal_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>8} {len(greedy):>8} {greedy_ms:>8.1f} {len(optimal):>8} {optimal_ms:>8.1f}")
+
+
+if __name__ == '__main__':
+    run(float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_OPTIMIZER_BUDGET_MS)
@@ -0,0 +1,155 @@
+# utils/household_reports.py
+"""
+Batch job: settlement and summary reports for every household, in parallel.
+
+Households are split into chunks (work units); each worker process loads a
+whole chunk with get_household_snapshots() and builds both reports for every
+household in it. Prints the throughput in households per second.
+
+Usage:
+  python utils/household_reports.py [--workers N] [--chunk-size N] [--mode greedy|optimal]
+  python utils/household_reports.py --synthetic 2000   # benchmark on a scratch database
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.database.db_connection import get_manager, initialize_database
+from models.database.household_db import get_all_households, get_household_snapshots
+from models.report_generator import generate_settlement_report, generate_summary_report
+
+# Households per work unit: large enough to amortise the IPC and query
+# overhead, small enough to keep every worker busy until the end
+DEFAULT_CHUNK_SIZE = 64
+
+
+def _init_worker(db_path: str):
+    """Points the worker's connection manager at the job's database."""
+    get_manager().path = Path(db_path)
+
+
+def _report_chunk(household_ids: list, mode: str) -> dict:
+    """
+    Builds the reports for one chunk of households (runs in a worker).
+
+    Args:
+        household_ids (list): Households in this work unit
+        mode (str): Settlement mode passed to generate_settlement_report()
+
+    Returns:
+        dict: Mapping of household ID to {"settlements": [...], "summary": {...}},
+              or {"error": message} if that household's reports failed
+    """
+    results = {}
+    for household_id, (roommates, history) in get_household_snapshots(household_ids).items():
+        try:
+            results[household_id] = {
+                "settlements": generate_settlement_report(history, roommates, mode=mode),
+                "summary": generate_summary_report(history, roommates),
+            }
+        except Exception as e:
+            results[household_id] = {"error": str(e)}
+    return results
+
+
+def run_household_batch(household_ids: list = None, workers: int = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE, mode: str = "greedy") -> tuple:
+    """
+    Computes settlement and summary reports for many households in parallel.
+
+    Worker processes are started with the 'spawn' method so that none of them
+    inherits the parent's open SQLite connections; each opens its own.
+
+    Args:
+        household_ids (list, optional): Households to process. Defaults to all.
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+        chunk_size (int, optional): Households per work unit. Defaults to DEFAULT_CHUNK_SIZE.
+        mode (str, optional): Settlement mode ("greedy" or "optimal"). Defaults to "greedy".
+
+    Returns:
+        tuple: (results, stats) where results maps household ID to its reports
+               and stats holds households, chunks, workers, seconds and
+               households_per_sec
+    """
+    if household_ids is None:
+        household_ids = [row[0] for row in get_all_households()]
+    chunks = [household_ids[i:i + chunk_size] for i in range(0, len(household_ids), chunk_size)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks) or 1))
+
+    results = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker,
+                             initargs=(str(get_manager().path),)) as pool:
+        for chunk_results in pool.map(_report_chunk, chunks, [mode] * len(chunks)):
+            results.update(chunk_results)
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "households": len(household_ids),
+        "chunks": len(chunks),
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "households_per_sec": round(len(household_ids) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    return results, stats
+
+
+def _create_synthetic_households(count: int, seed: int = 16):
+    """Fills the current database with `count` random households."""
+    from models.database.db_connection import transaction
+
+    rng = random.Random(seed)
+    with transaction() as conn:
+        for h in range(count):
+            household_id = conn.execute("INSERT INTO households (name) VALUES (?)",
+                                        (f"House {h + 1}",)).lastrowid
+            members = [
+                conn.execute("INSERT INTO roommates (name, household_id) VALUES (?, ?)",
+                             (f"H{household_id}-R{i}", household_id)).lastrowid
+                for i in range(rng.randint(2, 6))
+            ]
+            for _ in range(rng.randint(20, 120)):
+                expense_id = conn.execute("""
+                    INSERT INTO expenses (date, account, category, amount, note, payer_id, household_id)
+                    VALUES (?, 'Card', 'Groceries', ?, '', ?, ?)
+                """, (f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                      round(rng.uniform(1, 300), 2), rng.choice(members), household_id)).lastrowid
+                conn.executemany(
+                    "INSERT INTO expense_participants (expense_id, roommate_id) VALUES (?, ?)",
+                    [(expense_id, rm_id) for rm_id in rng.sample(members, rng.randint(1, len(members)))]
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--mode", choices=["greedy", "optimal"], default="greedy")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Benchmark on a scratch database with this many random households")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        scratch = Path(tempfile.mkdtemp()) / "households.db"
+        get_manager().path = scratch
+        initialize_database()
+        _create_synthetic_households(args.synthetic)
+        print(f"Created {args.synthetic} synthetic households in {scratch}")
+    else:
+        initialize_database()
+
+    results, stats = run_household_batch(workers=args.workers, chunk_size=args.chunk_size, mode=args.mode)
+    errors = sum(1 for report in results.values() if "error" in report)
+    print(f"Processed {stats['households']} households in {stats['chunks']} chunks "
+          f"on {stats['workers']} workers: {stats['seconds']}s, "
+          f"{stats['households_per_sec']} households/sec ({errors} failed)")
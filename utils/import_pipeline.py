@@ -0,0 +1,303 @@
+# utils/import_pipeline.py
+"""
+Batch job: import a directory of CSV expense exports (e.g. one per month).
+
+Files are read, normalised and validated in worker processes; each parsed
+chunk goes through a bounded queue to a single writer thread, which inserts
+the rows into the database in large transactions. Prints the time spent in each
+stage and the throughput in rows per second.
+
+Usage:
+  python utils/import_pipeline.py DIRECTORY [--workers N] [--pattern GLOB] [--commit-rows N]
+  python utils/import_pipeline.py --synthetic 24   # benchmark: 24 generated files on a scratch database
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.database.db_connection import get_manager, initialize_database, transaction
+from models.fingerprint import file_checksum
+from utils.load_dataset import (
+    DEFAULT_CHUNK_SIZE, MAX_REPORTED_ERRORS, imported_checksums, insert_records, iter_csv_chunks, log_import
+)
+
+# Rows inserted per transaction by the writer: SQLite pays for a commit
+# (WAL sync) per transaction, so fewer, larger ones are much faster
+DEFAULT_COMMIT_ROWS = 50000
+
+# Parsed batches allowed to wait for the writer; workers pause when the
+# queue is full, which bounds memory use whatever the size of the files
+DEFAULT_QUEUE_SIZE = 16
+
+
+def _parse_file(path: str, chunk_size: int, household_id: int, known: frozenset,
+                batches) -> dict:
+    """
+    Reads and validates one CSV file, queueing it a chunk at a time (runs in a worker).
+
+    Every chunk with valid rows is put on the queue as (path, records) as
+    soon as it is parsed, so the worker never holds more than one chunk.
+    After the last chunk the file's import_log entry (a dict) follows. If
+    the file cannot be read to the end, no log entry is queued; the chunks
+    queued before the error are still inserted, as in import_csv().
+
+    Args:
+        path (str): Path of the CSV file
+        chunk_size (int): Records per batch
+        household_id (int): Household the expenses are added to
+        known (frozenset): Checksums of the files imported before; a
+                           matching file is not parsed
+        batches: Queue shared with the writer (a multiprocessing manager
+                 queue); put() blocks while it is full
+
+    Returns:
+        dict: path, skipped, rows, rejected, errors (first
+              MAX_REPORTED_ERRORS, prefixed with the file name), seconds
+              spent parsing and queue_wait_seconds spent waiting for room
+              in the queue; error holds the message instead if the file
+              could not be read
+    """
+    start = time.perf_counter()
+    result = {"path": path, "skipped": False, "rows": 0, "rejected": 0, "errors": [],
+              "error": None, "queue_wait_seconds": 0.0}
+    name = os.path.basename(path)
+
+    def put(item):
+        waited = time.perf_counter()
+        batches.put(item)
+        result["queue_wait_seconds"] += time.perf_counter() - waited
+
+    try:
+        checksum = file_checksum(path)
+        if checksum in known:
+            result["skipped"] = True
+        else:
+            for rows_read, records, errors in iter_csv_chunks(path, chunk_size, household_id):
+                if records:
+                    put((path, records))
+                result["rows"] += rows_read
+                result["rejected"] += len(errors)
+                room = MAX_REPORTED_ERRORS - len(result["errors"])
+                result["errors"].extend(f"{name}: {message}" for message in errors[:room])
+            put({"household_id": household_id, "path": os.path.abspath(path), "checksum": checksum,
+                 "size": os.path.getsize(path), "rows": result["rows"], "inserted": 0})
+    except (OSError, UnicodeDecodeError, ValueError, csv.Error) as e:
+        result["error"] = f"{name}: {e}"
+    result["seconds"] = time.perf_counter() - start - result["queue_wait_seconds"]
+    return result
+
+
+def _writer(batches, commit_rows: int, stats: dict):
+    """
+    Inserts queued batches, committing every commit_rows rows (runs in a thread).
+
+    Items are (path, records) batches or, after the last batch of a file,
+    its import_log entry (a dict, completed with the rows inserted from
+    that file). Batches of different files may be interleaved. Stops at
+    the None sentinel. After a failed write the remaining
+    items are drained and dropped so the producer never blocks on a full
+    queue; the exception is stored in stats["write_error"].
+
+    Args:
+        batches: Queue of (path, list of INSERT parameter tuples) batches
+                 and import_log entries, then None
+        commit_rows (int): Rows per transaction
+        stats (dict): Updated with inserted, duplicates, transactions and write_seconds
+    """
+    pending = []
+    file_inserted = Counter()  # Rows inserted so far, per file path
+
+    def flush():
+        start = time.perf_counter()
+        inserted = valid = 0
+        with transaction():
+            for item in pending:
+                if isinstance(item, dict):
+                    log_import(dict(item, inserted=file_inserted.pop(item["path"], 0)))
+                else:
+                    path, records = item
+                    count = insert_records(records)
+                    file_inserted[os.path.abspath(path)] += count
+                    inserted += count
+                    valid += len(records)
+        stats["write_seconds"] += time.perf_counter() - start
+        stats["inserted"] += inserted
+        stats["duplicates"] += valid - inserted
+        stats["transactions"] += 1
+        pending.clear()
+
+    pending_rows = 0
+    while True:
+        item = batches.get()
+        if item is None:
+            break
+        if stats["write_error"] is not None:
+            continue
+        pending.append(item)
+        pending_rows += 0 if isinstance(item, dict) else len(item[1])
+        try:
+            if pending_rows >= commit_rows:
+                pending_rows = 0
+                flush()
+        except Exception as e:
+            stats["write_error"] = e
+            pending.clear()
+
+    if pending and stats["write_error"] is None:
+        try:
+            flush()
+        except Exception as e:
+            stats["write_error"] = e
+
+
+def import_directory(directory: str, pattern: str = "*.csv", workers: int = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, commit_rows: int = DEFAULT_COMMIT_ROWS,
+                     queue_size: int = DEFAULT_QUEUE_SIZE, household_id: int = 1) -> dict:
+    """
+    Imports every matching CSV file in a directory.
+
+    Worker processes are started with the 'spawn' method so that none of them
+    inherits the parent's open SQLite connections; they never touch the
+    database. Each worker streams the file it reads to the writer one chunk
+    at a time through a queue of queue_size batches, and pauses while the
+    queue is full. Peak memory therefore depends on the settings, not on
+    the size of the files: at most (queue_size + workers) * chunk_size
+    parsed rows wait for the writer, plus the commit_rows rows of the
+    transaction being written. Each worker also keeps the fingerprints of
+    the file it is reading to number identical rows, roughly 150 bytes per
+    distinct row of that file.
+
+    Invalid rows are skipped and reported as in import_csv(); a file that
+    cannot be read is listed in the stats, and the rows read from it before
+    the error are kept. Like import_csv(), files already in import_log are
+    skipped and rows imported before are ignored, so re-running the job
+    only adds new data.
+
+    Args:
+        directory (str): Directory holding the CSV files
+        pattern (str, optional): Glob for the files to import. Defaults to "*.csv".
+        workers (int, optional): Number of parser processes. Defaults to the CPU count.
+        chunk_size (int, optional): Records per parsed batch. Defaults to DEFAULT_CHUNK_SIZE.
+        commit_rows (int, optional): Rows per write transaction. Defaults to DEFAULT_COMMIT_ROWS.
+        queue_size (int, optional): Batches allowed to wait for the writer. Defaults to DEFAULT_QUEUE_SIZE.
+        household_id (int, optional): Household the expenses are added to. Defaults to 1.
+
+    Returns:
+        dict: files, skipped_files, failed_files, rows, inserted, duplicates,
+              rejected, transactions, workers, errors, and the timings
+              parse_seconds (total worker time), queue_wait_seconds (worker
+              time held up by a full queue), write_seconds, seconds (wall
+              clock) and rows_per_sec
+
+    Raises:
+        FileNotFoundError: If the directory does not exist
+        sqlite3.Error: If a write failed; nothing after the failed
+                       transaction is inserted
+    """
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"No such directory: {directory}")
+    paths = sorted(str(p) for p in Path(directory).glob(pattern) if p.is_file())
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+
+    stats = {
+        "files": len(paths), "skipped_files": 0, "failed_files": [], "rows": 0, "inserted": 0,
+        "duplicates": 0, "rejected": 0,
+        "transactions": 0, "workers": workers, "errors": [],
+        "parse_seconds": 0.0, "queue_wait_seconds": 0.0, "write_seconds": 0.0,
+        "seconds": 0.0, "rows_per_sec": 0.0, "write_error": None,
+    }
+    start = time.perf_counter()
+    known = frozenset(imported_checksums(household_id))
+    context = multiprocessing.get_context("spawn")
+
+    # The workers put their chunks straight on a manager queue, which the
+    # writer thread of this process reads
+    with context.Manager() as manager:
+        batches = manager.Queue(maxsize=max(1, queue_size))
+        writer = threading.Thread(target=_writer, args=(batches, commit_rows, stats), daemon=True)
+        writer.start()
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [pool.submit(_parse_file, path, chunk_size, household_id, known, batches)
+                           for path in paths]
+                for future in as_completed(futures):
+                    result = future.result()
+                    stats["parse_seconds"] += result["seconds"]
+                    stats["queue_wait_seconds"] += result["queue_wait_seconds"]
+                    stats["rows"] += result["rows"]
+                    stats["rejected"] += result["rejected"]
+                    stats["errors"].extend(result["errors"][:MAX_REPORTED_ERRORS - len(stats["errors"])])
+                    if result["error"]:
+                        stats["failed_files"].append(result["error"])
+                    elif result["skipped"]:
+                        stats["skipped_files"] += 1
+        finally:
+            batches.put(None)
+            writer.join()
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed > 0 else 0.0
+    for key in ("parse_seconds", "queue_wait_seconds", "write_seconds"):
+        stats[key] = round(stats[key], 3)
+
+    write_error = stats.pop("write_error")
+    if write_error is not None:
+        raise write_error
+    return stats
+
+
+def _create_synthetic_files(directory: Path, count: int, rows_per_file: int = 20000, seed: int = 22):
+    """Writes `count` monthly CSV exports of random expenses into `directory`."""
+    rng = random.Random(seed)
+    categories = ["Groceries", "Rent", "Utilities", "Transport", "Dining"]
+    for month in range(count):
+        year, mon = 2020 + month // 12, month % 12 + 1
+        with open(directory / f"{year}-{mon:02d}.csv", "w", encoding="utf-8") as f:
+            f.write("Date,Account,Category,Amount,Note\n")
+            for _ in range(rows_per_file):
+                f.write(f"{year}-{mon:02d}-{rng.randint(1, 28):02d},Card,{rng.choice(categories)},"
+                        f"{rng.uniform(1, 300):.2f},\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?")
+    parser.add_argument("--pattern", default="*.csv")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--commit-rows", type=int, default=DEFAULT_COMMIT_ROWS)
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Benchmark on a scratch database with this many generated files")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        scratch = Path(tempfile.mkdtemp())
+        get_manager().path = scratch / "import.db"
+        _create_synthetic_files(scratch, args.synthetic)
+        args.directory = str(scratch)
+        print(f"Created {args.synthetic} synthetic files in {scratch}")
+    elif not args.directory:
+        parser.error("a directory is required unless --synthetic is given")
+    initialize_database()
+
+    stats = import_directory(args.directory, args.pattern, args.workers, args.chunk_size, args.commit_rows)
+    print(f"Imported {stats['inserted']} of {stats['rows']} rows from {stats['files']} files "
+          f"({stats['skipped_files']} unchanged, {stats['duplicates']} rows already imported) "
+          f"on {stats['workers']} workers in {stats['transactions']} transactions: "
+          f"{stats['seconds']}s, {stats['rows_per_sec']} rows/sec")
+    print(f"  parse {stats['parse_seconds']}s (all workers), waiting for the writer "
+          f"{stats['queue_wait_seconds']}s, write {stats['write_seconds']}s")
+    for message in stats["failed_files"] + stats["errors"]:
+        print(f"  skipped {message}")
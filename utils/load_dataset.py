@@ -1,58 +1,329 @@
 # utils/load_dataset.py
-import pandas as pd
+import argparse
+import csv
 import os
-from models.database.db_connection import get_connection  # Add this import
+import sys
+import time
+from collections import Counter
+from datetime import date
+from itertools import islice
 
-def load_dataset(path="assets/data/dataset.csv"):
-    """Load CSV and insert into expenses table"""
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.database.db_connection import connection, transaction
+from models.database.events import publish
+from models.database.migrations import deferred_balances, deferred_search_index
+from models.fingerprint import expense_fingerprint, file_checksum
+
+# Rows read, validated and inserted per chunk (one executemany and one
+# transaction each); only one chunk is held in memory at a time
+DEFAULT_CHUNK_SIZE = 10000
+
+# Invalid rows reported individually; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+# CSV header -> expenses column (headers not listed here are ignored)
+COLUMN_ALIASES = {
+    "INR": "amount",
+    "Amount": "amount",
+    "amount": "amount",
+    "Category": "category",
+    "category": "category",
+    "Account": "account",
+    "account": "account",
+    "Note": "note",
+    "note": "note",
+    "Date": "date",
+    "date": "date",
+}
+
+# Rows already imported (same household and fingerprint) are skipped
+_INSERT_SQL = """
+    INSERT OR IGNORE INTO expenses (date, account, category, amount, note, household_id, fingerprint)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _map_columns(header: list) -> dict:
+    """
+    Finds the position of every known column in the CSV header.
+
+    Args:
+        header (list): The first CSV row
+
+    Returns:
+        dict: Mapping of expenses column name to CSV position
+
+    Raises:
+        ValueError: If the file has no amount column
+    """
+    columns = {}
+    for position, name in enumerate(header):
+        field = COLUMN_ALIASES.get(name.strip())
+        if field and field not in columns:
+            columns[field] = position
+    if "amount" not in columns:
+        raise ValueError(f"CSV has no amount column (header: {header})")
+    return columns
+
+
+def _convert_chunk(rows: list, columns: dict, first_line: int, household_id: int,
+                   seen: Counter = None) -> tuple:
+    """
+    Validates one chunk of CSV rows and converts them to INSERT parameters.
+
+    A row is rejected if its amount is not a non-negative number or its date
+    is not a valid 'YYYY-MM-DD' date. Missing text columns become ''. Every
+    record ends with its fingerprint (see models.fingerprint).
+
+    Args:
+        rows (list): Raw CSV rows (lists of strings)
+        columns (dict): Column positions from _map_columns()
+        first_line (int): File line number of the first row (for messages)
+        household_id (int): Household the expenses are added to
+        seen (Counter, optional): Fingerprints of the rows before this chunk
+                                  in the same file, updated in place.
+                                  Defaults to a new Counter.
+
+    Returns:
+        tuple: (records, errors) where records are INSERT parameter tuples
+               and errors are (line_number, message) pairs
+    """
+    get_date, get_amount = columns.get("date"), columns["amount"]
+    get_account, get_category, get_note = columns.get("account"), columns.get("category"), columns.get("note")
+    seen = Counter() if seen is None else seen
+    records = []
+    errors = []
+
+    for line, row in enumerate(rows, start=first_line):
+        try:
+            amount = float(row[get_amount])
+            if not amount >= 0:
+                raise ValueError(f"negative or invalid amount {row[get_amount]!r}")
+            expense_date = row[get_date].strip() if get_date is not None else ""
+            date.fromisoformat(expense_date)
+            category = row[get_category] if get_category is not None else ""
+            note = row[get_note] if get_note is not None else ""
+            key = expense_fingerprint(expense_date, amount, category, note)
+            occurrence = seen[key]
+            records.append((
+                expense_date,
+                row[get_account] if get_account is not None else "",
+                category,
+                amount,
+                note,
+                household_id,
+                # The first occurrence's fingerprint is the key itself
+                key if not occurrence else expense_fingerprint(expense_date, amount, category, note, occurrence),
+            ))
+            seen[key] = occurrence + 1
+        except (ValueError, IndexError) as e:
+            errors.append((line, str(e) or "missing column"))
+
+    return records, errors
+
+
+def iter_csv_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, household_id: int = 1):
+    """
+    Reads and validates a CSV file of expenses, chunk_size rows at a time.
+
+    Args:
+        path (str): Path of the CSV file
+        chunk_size (int, optional): Rows per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+        household_id (int, optional): Household the expenses are added to. Defaults to 1.
+
+    Yields:
+        tuple: (rows_read, records, errors) for each chunk, with records and
+               errors as returned by _convert_chunk()
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the header has no amount column
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = _map_columns(header)
+        seen = Counter()
+
+        line = 2  # Line 1 is the header
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            records, errors = _convert_chunk(rows, columns, line, household_id, seen)
+            line += len(rows)
+            yield len(rows), records, errors
+
+
+def import_csv(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, progress=None,
+               household_id: int = 1) -> dict:
+    """
+    Streams a CSV file of expenses into the database, one chunk at a time.
+
+    The file is read with the csv module, chunk_size rows at a time; every
+    chunk is validated, then inserted with a single executemany in its own
+    transaction. Peak memory is bounded by the chunk size rather than the
+    file size, and a failure in a later chunk keeps the earlier ones.
+
+    Imports are idempotent. A file whose checksum is already in import_log
+    is skipped without being parsed; otherwise rows that were imported
+    before (e.g. the old part of a file that has grown, or the chunks of an
+    interrupted import) are ignored through the fingerprint index and only
+    the new rows are inserted.
+
+    Args:
+        path (str): Path of the CSV file
+        chunk_size (int, optional): Rows per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+        progress (callable, optional): Called after every chunk with the
+                                       running statistics (see Returns)
+        household_id (int, optional): Household the expenses are added to. Defaults to 1.
+
+    Returns:
+        dict: rows (read), inserted, duplicates (valid rows imported before),
+              rejected, chunks, seconds, rows_per_sec, skipped (True if the
+              unchanged file was skipped) and errors (the first
+              MAX_REPORTED_ERRORS (line, message) pairs)
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the header has no amount column
+    """
+    stats = {"rows": 0, "inserted": 0, "duplicates": 0, "rejected": 0, "chunks": 0,
+             "seconds": 0.0, "rows_per_sec": 0.0, "skipped": False, "errors": []}
+    start = time.perf_counter()
+
+    checksum = file_checksum(path)
+    if checksum in imported_checksums(household_id, [checksum]):
+        stats["skipped"] = True
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        return stats
+
+    for rows_read, records, errors in iter_csv_chunks(path, chunk_size, household_id):
+        inserted = insert_records(records) if records else 0
+
+        stats["rows"] += rows_read
+        stats["inserted"] += inserted
+        stats["duplicates"] += len(records) - inserted
+        stats["rejected"] += len(errors)
+        stats["chunks"] += 1
+        stats["errors"].extend(errors[:MAX_REPORTED_ERRORS - len(stats["errors"])])
+        elapsed = time.perf_counter() - start
+        stats["seconds"] = round(elapsed, 3)
+        stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed > 0 else 0.0
+        if progress is not None:
+            progress(dict(stats))
+
+    log_import({"household_id": household_id, "path": os.path.abspath(path), "checksum": checksum,
+                "size": os.path.getsize(path), "rows": stats["rows"], "inserted": stats["inserted"]})
+    return stats
+
+
+def insert_records(records: list) -> int:
+    """
+    Inserts validated expense records with one executemany.
+
+    The per-row balance and search index triggers are skipped; the new rows
+    are added to roommate_balances and expenses_fts with one set-based
+    statement each when the outermost deferral ends (see deferred_balances()
+    and deferred_search_index()). Joins the caller's transaction if one is
+    open, otherwise commits on its own.
+
+    Args:
+        records (list): INSERT parameter tuples from _convert_chunk()
+
+    Returns:
+        int: Number of records inserted (the others were imported before)
+    """
+    with transaction() as conn, deferred_balances(conn, inserts_only=True), deferred_search_index(conn):
+        inserted = conn.executemany(_INSERT_SQL, records).rowcount
+        if inserted:
+            publish()
+        return inserted
+
+
+def imported_checksums(household_id: int = 1, checksums: list = None) -> set:
+    """
+    Returns the checksums of the files already imported into a household.
+
+    Args:
+        household_id (int, optional): Household to look in. Defaults to 1.
+        checksums (list, optional): Only look these up (one indexed lookup
+                                    each). Defaults to every logged file.
+
+    Returns:
+        set: The logged checksums
+    """
+    with connection() as conn:
+        if checksums is None:
+            rows = conn.execute("SELECT checksum FROM import_log WHERE household_id = ?", (household_id,))
+            return {row[0] for row in rows}
+        return {checksum for checksum in checksums if conn.execute(
+            "SELECT 1 FROM import_log WHERE household_id = ? AND checksum = ?", (household_id, checksum)
+        ).fetchone()}
+
+
+def log_import(entry: dict):
+    """
+    Records a fully imported file in import_log.
+
+    Joins the caller's transaction if one is open, otherwise commits on its own.
+
+    Args:
+        entry (dict): household_id, path, checksum, size, rows and inserted
+    """
+    with transaction() as conn:
+        conn.execute("""
+            INSERT OR IGNORE INTO import_log (household_id, path, checksum, size, rows, inserted)
+            VALUES (:household_id, :path, :checksum, :size, :rows, :inserted)
+        """, entry)
+
+
+def load_dataset(path="assets/data/dataset.csv", chunk_size: int = DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Load CSV and insert into expenses table.
+
+    Args:
+        path (str, optional): CSV path relative to the project directory
+        chunk_size (int, optional): Rows per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+        progress (callable, optional): Progress callback (see import_csv)
+
+    Returns:
+        dict: Import statistics (see import_csv)
+    """
     # Get the absolute path
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     full_path = os.path.join(base_dir, path)
-    
+
     if not os.path.exists(full_path):
         raise FileNotFoundError(f"Dataset file not found at {full_path}")
 
-    df = pd.read_csv(full_path)
-    print(f"Loaded dataset with {len(df)} rows from {full_path}")
-
-    # Standardize column names
-    df = df.rename(columns={
-        "INR": "amount",
-        "Amount": "amount", 
-        "Category": "category",
-        "Account": "account",
-        "Note": "note",
-        "Date": "date"
-    })
+    stats = import_csv(full_path, chunk_size, progress)
+    for line, message in stats["errors"]:
+        print(f"Error in line {line}: {message}")
 
-    conn = get_connection()  # This should work now
-    cur = conn.cursor()
+    if stats["skipped"]:
+        print(f"{full_path} was already imported; nothing to do")
+        return stats
+    print(f"Successfully inserted {stats['inserted']} of {stats['rows']} expenses from {full_path} "
+          f"({stats['duplicates']} already imported, {stats['rejected']} rejected, "
+          f"{stats['rows_per_sec']} rows/sec)")
+    return stats
 
-    inserted_count = 0
-    for _, row in df.iterrows():
-        try:
-            cur.execute("""
-                INSERT INTO expenses (date, account, category, amount, note)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                str(row.get("date", "")),
-                str(row.get("account", "")),
-                str(row.get("category", "")),
-                float(row["amount"]),
-                str(row.get("note", ""))
-            ))
-            inserted_count += 1
-        except Exception as e:
-            print(f"Error inserting row {_}: {e}")
-
-    conn.commit()
-    conn.close()
-    print(f"Successfully inserted {inserted_count} expenses into database")
 
 if __name__ == "__main__":
     from models.database.db_connection import initialize_database
+
+    parser = argparse.ArgumentParser(description="Stream a CSV of expenses into the database")
+    parser.add_argument("path", nargs="?", default="assets/data/dataset.csv")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
     initialize_database()
-    load_dataset("assets/data/dataset.csv")
+    load_dataset(args.path, args.chunk_size,
+                 progress=lambda s: print(f"  {s['rows']} rows read, {s['inserted']} inserted"))
     print("Database initialized and dataset loaded.")
 
 
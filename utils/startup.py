@@ -0,0 +1,147 @@
+# utils/startup.py
+"""
+App start-up: prepare the database and the sample data.
+
+Runs the migrations, adds the sample roommates to an empty database, imports
+the bundled dataset (a no-op when it is unchanged) and assigns random payers
+and participants. The random assignment runs once per database, recorded as
+the 'seeded' app_meta key; later starts never assign payers or participants,
+so expenses imported without a payer stay unassigned until a roommate picks
+one (random sample data must not be mixed into real data). Every check
+is a COUNT or an indexed lookup, so a start costs about the same whatever
+the size of the database.
+
+Usage:
+  python utils/startup.py                     # time a start on the configured database
+  python utils/startup.py --synthetic 100000  # first and second start on a scratch database
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.database.app_meta_db import get_meta, set_meta
+from models.database.db_connection import close_connections, get_manager, initialize_database, transaction
+from models.database.expense_db import count_expenses, get_expense_ids
+from models.database.roomate_db import (
+    add_roommate, assign_random_participants, assign_random_payer, count_roommates
+)
+
+SAMPLE_ROOMMATES = [
+    ("Alice Johnson", "alice@example.com", "2023-09-01"),
+    ("Bob Smith", "bob@example.com", "2023-09-15"),
+    ("Charlie Brown", "charlie@example.com", "2023-10-01"),
+    ("David Wilson", "david@example.com", "2023-10-15"),
+]
+
+DEFAULT_DATASET = "assets/data/dataset.csv"
+
+# Seed of the sample payer/participant assignment, so every fresh database
+# gets the same sample data
+SAMPLE_SEED = 211
+
+
+def initialize_app_data(dataset_path: str = DEFAULT_DATASET, seed=SAMPLE_SEED) -> dict:
+    """
+    Prepares the database for the app and reports how long each step took.
+
+    Args:
+        dataset_path (str, optional): Dataset CSV, relative to the project
+                                      directory. Defaults to DEFAULT_DATASET.
+                                      None skips the import.
+        seed (optional): Seed for the random assignment. Defaults to SAMPLE_SEED.
+
+    Returns:
+        dict: roommates_added, expenses_imported, payers_assigned and
+              participants_assigned (0 unless seeded), seeded (True if the
+              one-time seeding ran in this call) and the timings in seconds: migrate, checks,
+              import, seed and total
+    """
+    stats = {"roommates_added": 0, "expenses_imported": 0, "payers_assigned": 0,
+             "participants_assigned": 0, "seeded": False}
+    start = time.perf_counter()
+
+    initialize_database()
+    stats["migrate"] = time.perf_counter() - start
+
+    step = time.perf_counter()
+    if not count_roommates():
+        for name, email, join_date in SAMPLE_ROOMMATES:
+            add_roommate(name, email, join_date)
+        stats["roommates_added"] = len(SAMPLE_ROOMMATES)
+        print(f"Added {len(SAMPLE_ROOMMATES)} sample roommates")
+    already_seeded = get_meta("seeded") is not None
+    stats["checks"] = time.perf_counter() - step
+
+    # Imports are idempotent: an unchanged file is skipped and a grown one
+    # only adds its new rows
+    step = time.perf_counter()
+    if dataset_path is not None:
+        try:
+            from utils.load_dataset import load_dataset
+            stats["expenses_imported"] = load_dataset(dataset_path)["inserted"]
+        except FileNotFoundError:
+            print("Warning: Expense dataset file not found")
+        except Exception as e:
+            print(f"Warning: Could not load expense dataset: {e}")
+    stats["import"] = time.perf_counter() - step
+
+    # Only the first start assigns payers and participants
+    step = time.perf_counter()
+    if not already_seeded and count_expenses():
+        unpaid_ids = get_expense_ids(without_payer=True)
+        with transaction():
+            if unpaid_ids:
+                assign_random_payer(unpaid_ids, seed=seed)
+            # Separate streams so the two assignments do not depend on each other
+            assign_random_participants(get_expense_ids(), seed=random.Random(seed).random())
+            set_meta("seeded", datetime.now().isoformat(timespec="seconds"))
+        stats["seeded"] = True
+        stats["payers_assigned"] = len(unpaid_ids)
+        stats["participants_assigned"] = count_expenses()
+    stats["seed"] = time.perf_counter() - step
+
+    stats["total"] = time.perf_counter() - start
+    print(f"Start-up data ready in {stats['total'] * 1000:.0f} ms "
+          f"(migrate {stats['migrate'] * 1000:.0f}, checks {stats['checks'] * 1000:.0f}, "
+          f"import {stats['import'] * 1000:.0f}, seed {stats['seed'] * 1000:.0f})")
+    return stats
+
+
+def _create_synthetic_expenses(count: int, seed: int = 25):
+    """Fills the current database with `count` random expenses without payers."""
+    rng = random.Random(seed)
+    with transaction() as conn:
+        conn.executemany(
+            "INSERT INTO expenses (date, account, category, amount, note) VALUES (?, 'Card', ?, ?, '')",
+            [(f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+              rng.choice(["Groceries", "Rent", "Utilities", "Transport", "Dining"]),
+              round(rng.uniform(1, 300), 2)) for _ in range(count)]
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Benchmark on a scratch database with this many random expenses")
+    args = parser.parse_args()
+
+    if not args.synthetic:
+        initialize_app_data()
+        sys.exit(0)
+
+    get_manager().path = Path(tempfile.mkdtemp()) / "startup.db"
+    initialize_database()
+    _create_synthetic_expenses(args.synthetic)
+    print(f"Created {args.synthetic} synthetic expenses in {get_manager().path}")
+
+    for label in ("First start (seeds)", "Cold start (already seeded)"):
+        close_connections()
+        stats = initialize_app_data(dataset_path=None)
+        print(f"{label}: {stats['total']:.3f}s")
@@ -146,11 +146,11 @@ class ExpenseEntryFrame(ttk.Frame):
             self.history_tree.delete(i)
 
         try:
-            from models.database.expense_db import get_all_expenses, get_expense_participants
-            from models.database.roomate_db import get_roommate_by_id, get_all_roommates
+            from models.database.expense_db import get_expense_history
+            from models.database.roomate_db import get_all_roommates
 
-            # Load expenses and roommate data
-            expenses = get_all_expenses()
+            # Load expenses (with payer and participant names) and roommate data
+            expenses = get_expense_history()
             all_roommates = get_all_roommates()
             total_roommates = len(all_roommates)
 
@@ -163,22 +163,15 @@ class ExpenseEntryFrame(ttk.Frame):
                 date = exp[1]
                 category = exp[3]
                 amount = exp[4]
-                payer_id = exp[6]
-
-                # Get payer name for display
-                payer_name = "Unknown"
-                if payer_id:
-                    roommate = get_roommate_by_id(payer_id)
-                    if roommate:
-                        payer_name = roommate[1]
 
-                # Get participant information
-                participants_data = get_expense_participants(expense_id)
-                if participants_data:
-                    participant_names = [p[1] for p in participants_data]
+                # Payer name is resolved by the history query
+                payer_name = exp[7] or "Unknown"
 
+                # Participant names are prefetched by the history query
+                participant_names = exp[9]
+                if participant_names:
                     # Show "All" if all roommates are participants
-                    if len(participants_data) == total_roommates:
+                    if len(participant_names) == total_roommates:
                         participants_str = "All"
                     else:
                         participants_str = ", ".join(participant_names)
@@ -255,23 +248,38 @@ class ExpenseEntryFrame(ttk.Frame):
         """
         Filter expenses based on search text.
 
+        Matching runs in the database's full-text index (note, category,
+        account and payer name, with prefix matching); results are shown
+        best match first.
+
         Args:
             event: Key release event (unused)
         """
-        search_text = self.search_var.get().lower()
+        search_text = self.search_var.get().strip()
 
         if not hasattr(self, 'expenses_data') or not self.expenses_data:
             return
 
+        if search_text:
+            try:
+                from models.database.expense_db import search_expense_ids
+                matching_ids = search_expense_ids(search_text)
+            except Exception as e:
+                print(f"Error searching expenses: {e}")
+                return
+
+            # Look up cached display rows in ranked order
+            rows_by_id = {raw_values[0]: display_values for display_values, raw_values in self.expenses_data}
+            rows = [rows_by_id[expense_id] for expense_id in matching_ids if expense_id in rows_by_id]
+        else:
+            rows = [display_values for display_values, _ in self.expenses_data]
+
         # Clear and repopulate with filtered results
         for i in self.history_tree.get_children():
             self.history_tree.delete(i)
 
-        for display_values, raw_values in self.expenses_data:
-            # Check if search text matches any column
-            matches = any(search_text in str(value).lower() for value in display_values)
-            if matches or not search_text:
-                self.history_tree.insert('', tk.END, values=display_values)
+        for display_values in rows:
+            self.history_tree.insert('', tk.END, values=display_values)
 
     def clear_filter(self):
         """Clear the search filter and refresh the expense list."""
@@ -373,21 +381,19 @@ class ExpenseEntryFrame(ttk.Frame):
             return
 
         try:
-            from models.database.expense_db import add_expense, add_expense_participants
+            from models.database.expense_db import create_expense
 
-            # Create expense record
-            expense_id = add_expense(
+            # Create expense record and participant associations atomically
+            create_expense(
                 date=date_str,
                 account="",
                 category=category,
                 amount=amount,
                 note="",
-                payer_id=payer_id
+                payer_id=payer_id,
+                participant_ids=selected_participant_ids
             )
 
-            # Add participant associations
-            add_expense_participants(expense_id, selected_participant_ids)
-
             # Refresh UI and reset form
             self.refresh_history_list()
             self.clear_form()
@@ -445,19 +451,19 @@ class ExpenseEntryFrame(ttk.Frame):
             success_count = 0
             error_messages = []
 
-            # Delete each selected expense
-            for expense_id in expense_ids:
-                try:
-                    from models.database.expense_db import delete_expense
-                    success = delete_expense(expense_id)
+            # Delete all selected expenses in one transaction
+            try:
+                from models.database.expense_db import delete_expenses
+                outcomes = delete_expenses(expense_ids)
 
+                for expense_id, success in outcomes.items():
                     if success:
                         success_count += 1
                     else:
                         error_messages.append(f"Failed to delete expense ID {expense_id}")
 
-                except Exception as e:
-                    error_messages.append(f"Error deleting expense ID {expense_id}: {str(e)}")
+            except Exception as e:
+                error_messages.append(f"Error deleting expenses: {str(e)}")
 
             # Show operation results
             if success_count == len(expense_ids):
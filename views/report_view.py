@@ -1,14 +1,25 @@
 # views/report_view.py
 import tkinter as tk
+from datetime import datetime
 from tkinter import ttk, messagebox
-from models.database.expense_db import get_all_expenses
 from models.database.roomate_db import get_all_roommates
+from models.report_cache import cached_report, get_report_cache
 from models.report_generator import (
     generate_settlement_report,
     generate_personal_budget_report,
     generate_summary_report
 )
 
+# Repeat clicks with no write in between are served from the report cache
+settlement_report = cached_report(generate_settlement_report)
+personal_budget_report = cached_report(generate_personal_budget_report)
+summary_report = cached_report(generate_summary_report)
+
+
+def load_roommates():
+    """Returns all roommates, cached until the next committed write."""
+    return get_report_cache().get(("roommates",), get_all_roommates)
+
 
 class ReportFrame(ttk.Frame):
     """
@@ -88,6 +99,24 @@ class ReportFrame(ttk.Frame):
         # Configure the column for the combo box to expand
         report_frame.grid_columnconfigure(3, weight=1)
 
+        # Settlement strategy - fewest transfers instead of the greedy matcher
+        self.minimize_transfers_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            report_frame,
+            text="Minimise number of transfers",
+            variable=self.minimize_transfers_var
+        ).grid(row=1, column=0, padx=5, pady=2, sticky=tk.W)
+
+        # Optional date range; leave "From" empty for balances as of the "To" date
+        date_frame = ttk.Frame(report_frame)
+        date_frame.grid(row=1, column=1, columnspan=4, padx=5, pady=2, sticky=tk.W)
+        ttk.Label(date_frame, text="From (YYYY-MM-DD):").pack(side=tk.LEFT)
+        self.start_date_entry = ttk.Entry(date_frame, width=12)
+        self.start_date_entry.pack(side=tk.LEFT, padx=(5, 15))
+        ttk.Label(date_frame, text="To / as of:").pack(side=tk.LEFT)
+        self.end_date_entry = ttk.Entry(date_frame, width=12)
+        self.end_date_entry.pack(side=tk.LEFT, padx=5)
+
         # --- Report Results Display Area ---
         self.results_frame = ttk.LabelFrame(main_frame, text="Report Results", padding=10)
         self.results_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -117,6 +146,41 @@ class ReportFrame(ttk.Frame):
             print(f"Error loading roommates for report: {e}") # Log the error
             messagebox.showerror("Error", f"Failed to load roommates: {e}")
 
+    def get_date_range(self):
+        """
+        Read the optional date range from the entry fields.
+
+        Returns:
+            tuple: (start_date, end_date), each a 'YYYY-MM-DD' string or None,
+                   or None if a date is malformed (an error is shown)
+        """
+        dates = []
+        for entry in (self.start_date_entry, self.end_date_entry):
+            value = entry.get().strip()
+            if value:
+                try:
+                    datetime.strptime(value, '%Y-%m-%d')
+                except ValueError:
+                    messagebox.showerror("Input Error", "Date format should be YYYY-MM-DD.")
+                    return None
+            dates.append(value or None)
+
+        if dates[0] and dates[1] and dates[0] > dates[1]:
+            messagebox.showerror("Input Error", "The start date must not be after the end date.")
+            return None
+        return tuple(dates)
+
+    def describe_range(self, title, date_range):
+        """Append the selected date range to a report title."""
+        start_date, end_date = date_range
+        if start_date and end_date:
+            return f"{title} ({start_date} to {end_date})"
+        if start_date:
+            return f"{title} (from {start_date})"
+        if end_date:
+            return f"{title} (as of {end_date})"
+        return title
+
     def generate_settlement_report(self):
         """
         Generate and display the settlement report.
@@ -125,10 +189,15 @@ class ReportFrame(ttk.Frame):
         based on expense history and fair share calculations.
         """
         try:
-            expenses = get_all_expenses()
-            roommates = get_all_roommates()
-            report_data = generate_settlement_report(expenses, roommates)
-            self.display_report("Settlement Report", report_data)
+            date_range = self.get_date_range()
+            if date_range is None:
+                return
+            roommates = load_roommates()
+            # Settled from the running balances of the shared BalanceLedger
+            mode = "optimal" if self.minimize_transfers_var.get() else "greedy"
+            report_data = settlement_report(None, roommates, mode=mode,
+                                            start_date=date_range[0], end_date=date_range[1])
+            self.display_report(self.describe_range("Settlement Report", date_range), report_data)
 
         except Exception as e:
             print(f"Error generating settlement report: {e}") # Log the error
@@ -144,10 +213,13 @@ class ReportFrame(ttk.Frame):
         - Individual fair shares (theoretical amounts owed)
         """
         try:
-            expenses = get_all_expenses()
-            roommates = get_all_roommates()
-            report_data = generate_summary_report(expenses, roommates)
-            self.display_summary_report(report_data)
+            date_range = self.get_date_range()
+            if date_range is None:
+                return
+            roommates = load_roommates()
+            # Read from the BalanceLedger; no need to load every expense
+            report_data = summary_report(None, roommates, *date_range)
+            self.display_summary_report(report_data, self.describe_range("Summary Report", date_range))
 
         except Exception as e:
             print(f"Error generating summary report: {e}") # Log the error
@@ -166,8 +238,11 @@ class ReportFrame(ttk.Frame):
                 messagebox.showwarning("Selection Error", "Please select a roommate.")
                 return
 
-            expenses = get_all_expenses()
-            roommates = get_all_roommates()
+            date_range = self.get_date_range()
+            if date_range is None:
+                return
+
+            roommates = load_roommates()
 
             # Find roommate ID from selected name
             roommate_id = None
@@ -181,8 +256,9 @@ class ReportFrame(ttk.Frame):
                 return
 
             # Generate and display personal budget report
-            report_data = generate_personal_budget_report(expenses, roommates, roommate_id)
-            self.display_report(f"Personal Budget - {selected_name}", report_data)
+            # Read from the BalanceLedger; no need to load every expense
+            report_data = personal_budget_report(None, roommates, roommate_id, *date_range)
+            self.display_report(self.describe_range(f"Personal Budget - {selected_name}", date_range), report_data)
 
         except Exception as e:
             print(f"Error generating personal report: {e}") # Log the error
@@ -236,7 +312,7 @@ class ReportFrame(ttk.Frame):
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-    def display_summary_report(self, summary_data):
+    def display_summary_report(self, summary_data, title="Summary Report"):
         """
         Display summary report data in a formatted label-based layout.
 
@@ -245,6 +321,7 @@ class ReportFrame(ttk.Frame):
 
         Args:
             summary_data (dict): Dictionary containing summary report information
+            title (str, optional): The report title to display
         """
         # Clear previous results
         for widget in self.results_frame.winfo_children():
@@ -253,7 +330,7 @@ class ReportFrame(ttk.Frame):
         # Display report title
         ttk.Label(
             self.results_frame,
-            text="Summary Report",
+            text=title,
             font=('Arial', 12, 'bold')
         ).pack(pady=5)
 